@@ -0,0 +1,104 @@
+'''
+Specs de extracción de artículos de cada medio (ver extractors.py).
+
+Cada campo es una lista de selectores que se prueban en orden hasta obtener
+un valor. Es la única definición de la extracción: la usan get_all_news
+(SITEMAPS en datos.py) y los get_article_info_* de cada módulo, que se
+construyen con make_article_parser(EXTRACTORS[medio]). Agregar un medio
+solo requiere su spec aquí, su tráfico en outlet_traffic.py y su entrada
+en SITEMAPS.
+'''
+
+EXTRACTORS = {
+    "ElNuevoSiglo": {
+        "title": ["h1"],
+        "subtitle": ["div.field--name-field-free-text h2", "div.field--name-field-free-text h3"],
+        "body": {"css": ["div.field--name-field-free-text p"], "join": "\n\n", "keep_empty": True},
+        "date_published": ["jsonld:datePublished"],
+        "author": ["jsonld:author.name"],
+        "image": ["jsonld:image.url"],
+        "section": "politica",
+        "tags": {"css": ["a[rel=tag]"], "many": True},
+    },
+
+    "LaFM": {
+        "title": ["h1"],
+        "subtitle": None,
+        "body": {"css": ["article.news-content p"], "join": "\n\n", "keep_empty": True},
+        "date_published": ["meta[property=article:published_time]@content"],
+        "author": ["div.author"],
+        "section": "politica",
+        "tags": {"css": ["div.tags a"], "many": True},
+    },
+
+    "LaVoragine": {
+        "title": ["h1"],
+        "subtitle": ["h2.subtitle"],
+        "body": {"css": ["article p"], "join": "\n\n"},
+        "date_published": ["meta[property=article:published_time]@content"],
+        "author": ["meta[name=author]@content", "span.author-name"],
+        "section": "politica",
+        "tags": {"css": ["div.tags a"], "many": True},
+    },
+
+    "CeroSetenta": {
+        "title": {"css": ["h1.entry-title"], "sep": " "},
+        "body": {"css": ["div.entry-content p"], "join": "\n\n"},
+        "date_published": ["div.autor span"],
+        "author": ["div.autor a"],
+        "section": "politica",
+        "tags": {
+            "css": ["div.categorias_bottom a", "div.categorias_top a"],
+            "many": True,
+            "exclude_href": "/politica/",
+        },
+    },
+
+    "SemanarioVoz": {
+        "title": [".tdb-title-text"],
+        "subtitle": ["p.td-post-sub-title", ".tdb-sub-title", ".td-post-sub-title"],
+        "date_published": ["time.entry-date", "meta[property=article:published_time]@content"],
+        "body": {"css": [".td-post-content p"], "join": "\n", "sep": " "},
+        "author": None,
+        "section": "politica",
+        "tags": {"css": [".td-post-tags a", "ul.td-tags a", ".tdb-tags a"], "many": True},
+    },
+
+    "CuestionPublica": {
+        "title": ["h1"],
+        "subtitle": ["section.entry-summary", "div.subtitle", "h2"],
+        "date_published": ["meta[property=article:published_time]@content"],
+        "body": {"css": ["div.entry-content p", "article p"], "join": "\n", "sep": " "},
+        "author": {"css": ["meta[name=author]@content"], "as_list": True},
+        "section": "politica",
+        "tags": {"css": ["div.tags a"], "many": True},
+    },
+
+    "Pacifista": {
+        "title": ["h1", "title"],
+        "subtitle": ["h2.subtitle", "div.subtitle", "p.subtitle", "meta[name=description]@content"],
+        "date_published": ["meta[property=article:published_time]@content", "time"],
+        "body": {
+            "css": ["div.entry-content p", "div.post-content p", "article p"],
+            "join": "\n",
+            "sep": " ",
+        },
+        "author": ["meta[name=author]@content", "a[rel=author]"],
+        "section": "general",
+        "tags": {"css": ["a[rel=tag]"], "many": True},
+    },
+
+    "LaSillaVacia": {
+        "title": ["h1.title", "h1", "title"],
+        "subtitle": ["meta[name=description]@content"],
+        "date_published": ["meta[property=article:published_time]@content", "time[datetime]@datetime"],
+        "body": {
+            "css": [".entry-content p", ".article__body p", "article p"],
+            "join": "\n",
+            "sep": " ",
+        },
+        "author": [".article__author-name"],
+        "section": "politica",
+        "tags": {"css": ["div.field--name-field-tags a"], "many": True},
+    },
+}
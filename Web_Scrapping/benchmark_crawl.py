@@ -0,0 +1,243 @@
+import os
+import sys
+import json
+import math
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+# Sin .env el benchmark corre igual: los headers reales no hacen falta y
+# las bases de los medios con listado apuntan a sus hosts reales, que
+# MockSession redirige al servidor local.
+os.environ.setdefault("HEADER", "{}")
+os.environ.setdefault("URL_LAFM", "https://www.lafm.com.co")
+os.environ.setdefault("URL_CEROSETENTA", "https://cerosetenta.uniandes.edu.co")
+os.environ.setdefault("URL_SEMANARIOVOZ", "https://semanariovoz.com")
+
+import http_client
+import rate_limit
+import mock_sites
+from record_sink import RecordSink
+
+'''
+Benchmark de punta a punta de get_all_news contra los medios simulados
+(mock_sites.py), para medir cambios del planificador, la concurrencia y el
+control de tráfico a escala de producción sin salir a la red.
+
+Levanta el servidor en otro proceso (para que no compita por el GIL con
+el scraper), inyecta una MockSession con http_client.set_session y corre
+get_all_news completo: descubrimiento, descarga, parseo y escritura en un
+sink JSONL temporal (o el DataFrame con --dataframe). Reporta:
+    - artículos por segundo y peticiones por segundo de toda la corrida,
+    - percentiles p50/p90/p99/max de latencia de las peticiones vistas por
+      el cliente (incluye la espera en el pool de conexiones),
+    - por medio: artículos, latencia de fetch (métricas de la corrida),
+      errores, 429 y la tasa y concurrencia finales del AIMD,
+    - lo que sirvió el servidor por código (incluidas las fallas inyectadas).
+
+Las tasas de SITEMAPS están pensadas para los sitios reales y dominan el
+tiempo de la corrida; --rate-scale las multiplica (0 = sin token bucket)
+para medir el planificador en lugar del limitador.
+
+Uso:
+    python benchmark_crawl.py --articles 100000 --limit 0 --workers 32 --rate-scale 0
+    python benchmark_crawl.py --articles 2000 --capacity 15 --error-rate 0.01 --slow-rate 0.01
+    python benchmark_crawl.py --server http://127.0.0.1:8800   # servidor ya levantado
+'''
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(args):
+    """
+    Lanza mock_sites.py en un subproceso y espera a que responda.
+
+    Retorna:
+        tuple[subprocess.Popen, str]: proceso y URL base.
+    """
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mock_sites.py")
+    process = subprocess.Popen(
+        [sys.executable, script, "--port", str(port)] + mock_sites.fault_argv(args)
+    )
+    for _ in range(100):
+        if process.poll() is not None:
+            raise RuntimeError("el servidor simulado terminó al arrancar")
+        try:
+            requests.get(base_url + mock_sites.STATS_PATH, timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"el servidor simulado no respondió en {base_url}")
+
+
+def _scale_rates(sitemaps: dict, factor: float):
+    # Ajusta rate/max_rate de SITEMAPS; retorna los valores originales.
+    original = {medio: (c.get("rate"), c.get("max_rate")) for medio, c in sitemaps.items()}
+    for config in sitemaps.values():
+        if factor == 0:
+            config["rate"] = None
+        elif config.get("rate"):
+            config["rate"] *= factor
+            config["max_rate"] = (config.get("max_rate") or config["rate"]) * factor
+    return original
+
+
+def _restore_rates(sitemaps: dict, original: dict):
+    for medio, (rate, max_rate) in original.items():
+        sitemaps[medio]["rate"] = rate
+        sitemaps[medio]["max_rate"] = max_rate
+
+
+def _latency_summary(latencies: list):
+    # Percentiles por rango más cercano, como metrics.py.
+    values = sorted(latencies)
+    if not values:
+        return {}
+    summary = {
+        f"p{int(q * 100)}": round(values[max(0, math.ceil(q * len(values)) - 1)], 4)
+        for q in (0.5, 0.9, 0.99)
+    }
+    summary["max"] = round(values[-1], 4)
+    summary["mean"] = round(sum(values) / len(values), 4)
+    return summary
+
+
+def run_crawl(base_url: str, limit: int = None, workers: int = 24, pipeline: bool = False,
+              dataframe: bool = False, rate_scale: float = 1.0):
+    """
+    Corre get_all_news contra el servidor simulado.
+
+    Retorna:
+        dict: resultados de la corrida (ver print_report).
+    """
+    from datos import SITEMAPS, get_all_news
+
+    session = mock_sites.MockSession(base_url, pool_maxsize=max(http_client.POOL_MAXSIZE, workers * 2))
+    previous_session = http_client.get_session()
+    original_rates = _scale_rates(SITEMAPS, rate_scale)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_path = os.path.join(tmp, "metricas")
+        start = time.perf_counter()
+        try:
+            if dataframe:
+                df = get_all_news(limit=limit, workers=workers, session=session,
+                                  pipeline=pipeline, metrics_path=metrics_path)
+                articles = len(df)
+            else:
+                with RecordSink(os.path.join(tmp, "corpus.jsonl")) as sink:
+                    counts = get_all_news(limit=limit, workers=workers, session=session, sink=sink,
+                                          pipeline=pipeline, metrics_path=metrics_path)
+                articles = sum(counts.values())
+        finally:
+            elapsed = time.perf_counter() - start
+            http_client.set_session(previous_session)
+            _restore_rates(SITEMAPS, original_rates)
+
+        with open(metrics_path + ".json", encoding="utf-8") as f:
+            summary = json.load(f)
+
+    outlets = {}
+    for medio, outlet in summary["outlets"].items():
+        fetch = outlet["stages"].get("fetch", {})
+        config = SITEMAPS.get(medio, {})
+        limiter = summary.get("rate_limits", {}).get(rate_limit.host_key(config["host"])) if config.get("host") else None
+        outlets[medio] = {
+            "articles": outlet["articles"],
+            "requests": fetch.get("count", 0),
+            "errors": fetch.get("errors", 0),
+            "throttled": fetch.get("status", {}).get("429", 0),
+            "fetch_latency_s": fetch.get("latency_s", {}),
+            "rate_limit": limiter,
+        }
+
+    return {
+        "articles": articles,
+        "duration_s": round(elapsed, 3),
+        "articles_per_sec": round(articles / elapsed, 2) if elapsed > 0 else None,
+        "requests": len(session.latencies),
+        "requests_per_sec": round(len(session.latencies) / elapsed, 2) if elapsed > 0 else None,
+        "request_latency_s": _latency_summary(session.latencies),
+        "expired": summary.get("expired", []),
+        "outlets": outlets,
+        "server": session.server_stats(),
+    }
+
+
+def print_report(results: dict):
+    latency = results["request_latency_s"]
+    print(f"\n🧪 {results['articles']} artículos en {results['duration_s']}s: "
+          f"{results['articles_per_sec']} art/s, {results['requests']} peticiones "
+          f"({results['requests_per_sec']}/s)")
+    if latency:
+        print("   latencia de peticiones: " + ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in latency.items()))
+    if results["expired"]:
+        print(f"   medios cortados por plazo: {', '.join(results['expired'])}")
+
+    print(f"\n{'medio':<16}{'art':>8}{'fetch':>8}{'err':>6}{'429':>6}{'p50 ms':>9}{'p99 ms':>9}{'tasa':>7}{'conc':>6}")
+    for medio, r in results["outlets"].items():
+        fetch = r["fetch_latency_s"]
+        limiter = r["rate_limit"] or {}
+        p50 = f"{fetch['p50'] * 1000:.0f}" if fetch else ""
+        p99 = f"{fetch['p99'] * 1000:.0f}" if fetch else ""
+        print(f"{medio:<16}{r['articles']:>8}{r['requests']:>8}{r['errors']:>6}{r['throttled']:>6}"
+              f"{p50:>9}{p99:>9}{limiter.get('rate', ''):>7}{limiter.get('concurrency', ''):>6}")
+
+    print("\nservidor:")
+    for medio, s in sorted(results["server"].items()):
+        codes = ", ".join(f"{code}={n}" for code, n in sorted(s["status"].items()))
+        print(f"   {medio:<16}{s['requests']:>8} peticiones, {s['bytes'] / 2 ** 20:.1f} MB ({codes})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta contra medios simulados")
+    parser.add_argument("--server", help="URL de un mock_sites.py ya levantado (no se lanza otro)")
+    parser.add_argument("--limit", type=int, default=200, help="artículos por medio (0 = todos)")
+    parser.add_argument("--workers", type=int, default=24, help="hilos de get_all_news")
+    parser.add_argument("--pipeline", action="store_true", help="solapar descubrimiento y descarga")
+    parser.add_argument("--dataframe", action="store_true", help="armar el DataFrame en lugar del sink")
+    parser.add_argument("--rate-scale", type=float, default=1.0,
+                        help="multiplica las tasas de SITEMAPS (0 = sin token bucket)")
+    parser.add_argument("--json", help="guardar los resultados en este archivo")
+    mock_sites.add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    process = None
+    base_url = args.server
+    if base_url is None:
+        process, base_url = start_server(args)
+    try:
+        results = run_crawl(
+            base_url,
+            limit=args.limit or None,
+            workers=args.workers,
+            pipeline=args.pipeline,
+            dataframe=args.dataframe,
+            rate_scale=args.rate_scale,
+        )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
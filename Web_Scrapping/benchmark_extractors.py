@@ -0,0 +1,329 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import requests
+from dotenv import load_dotenv
+
+load_dotenv()
+# Los headers reales solo hacen falta contra los sitios; el benchmark no
+# sale a la red.
+os.environ.setdefault("HEADER", "{}")
+
+import http_client
+import rate_limit
+from parsing import make_soup
+from extractors import compile_spec, extract_timed
+
+'''
+Benchmark offline de los extractores de artículos.
+
+Corre los extractores de cada medio sobre páginas guardadas en
+fixtures/<medio>/ (un .html por artículo y su .json con la URL, los
+headers de la respuesta y el registro esperado), sin tocar la red: las
+páginas se sirven con una sesión falsa inyectada con
+http_client.set_session, así cada extractor corre tal cual, incluido
+resp.text.
+
+Por medio, para el parser compilado desde la spec (article_specs.py, el
+mismo que usan get_all_news y los get_article_info_*), reporta:
+    - artículos por segundo y milisegundos por artículo,
+    - tiempo por campo de la spec (y del recorrido del árbol),
+    - pico de memoria de Python por artículo (tracemalloc, en una pasada
+      aparte para no distorsionar los tiempos),
+    - diferencias contra el registro esperado (golden). Si alguna
+      difiere el script termina con código 1.
+
+Uso:
+    python benchmark_extractors.py [--medio LaFM] [--repeat 20] [--json salida.json]
+    python benchmark_extractors.py --record LaFM URL [URL ...]
+    python benchmark_extractors.py --update-golden [--medio LaFM]
+
+--record descarga artículos reales (una vez, con los HEADER del .env) y
+guarda su HTML y su registro como golden; --update-golden recalcula los
+golden con la spec actual después de un cambio intencional de extracción.
+'''
+
+FIXTURES_DIR = os.getenv(
+    "EXTRACTOR_FIXTURES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+)
+
+class FixtureSession:
+    """
+    Sesión falsa: responde cada URL con su página guardada (404 si no hay).
+
+    Recibe:
+        pages (dict): {url: (ruta del .html, headers)}
+    """
+
+    def __init__(self, pages: dict):
+        self.pages = pages
+
+    def get(self, url, headers=None, **kwargs):
+        resp = requests.Response()
+        resp.url = url
+        page = self.pages.get(url)
+        if page is None:
+            resp.status_code = 404
+            resp._content = b""
+            return resp
+        path, page_headers = page
+        with open(path, "rb") as f:
+            resp._content = f.read()
+        resp.status_code = 200
+        resp.headers.update(page_headers)
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        return resp
+
+
+def load_fixtures(root: str = FIXTURES_DIR, medios: list = None):
+    """
+    Lee los fixtures disponibles.
+
+    Retorna:
+        dict: {medio: [{"url", "html", "json", "headers", "expected"}]}
+    """
+    fixtures = {}
+    if not os.path.isdir(root):
+        return fixtures
+    for medio in sorted(os.listdir(root)):
+        folder = os.path.join(root, medio)
+        if not os.path.isdir(folder) or (medios and medio not in medios):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith(".html"):
+                continue
+            html_path = os.path.join(folder, name)
+            json_path = html_path[:-len(".html")] + ".json"
+            meta = {}
+            if os.path.exists(json_path):
+                with open(json_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+            fixtures.setdefault(medio, []).append({
+                "url": meta.get("url") or f"https://fixtures.local/{medio}/{name}",
+                "html": html_path,
+                "json": json_path,
+                "headers": meta.get("headers") or {"Content-Type": "text/html; charset=utf-8"},
+                "expected": meta.get("expected"),
+            })
+    return fixtures
+
+
+def _extractors(medio: str):
+    # Parser del medio (compilado desde su spec) y la spec.
+    from datos import EXTRACTORS, SITEMAPS
+
+    found = {}
+    if medio in SITEMAPS:
+        found["spec"] = SITEMAPS[medio]["article"]
+    return found, EXTRACTORS.get(medio)
+
+
+def _diff(expected: dict, got):
+    # Campos que no coinciden con el golden.
+    if got is None:
+        return ["<sin registro>"]
+    return [
+        field for field in sorted(set(expected) | set(got))
+        if expected.get(field) != got.get(field)
+    ]
+
+
+def _field_timings(pages: list, spec: dict, repeat: int):
+    # Tiempo por campo de la spec, con el documento ya parseado.
+    compiled = compile_spec(spec)
+    timings = {}
+    parse_s = 0.0
+    for _ in range(repeat):
+        for page in pages:
+            with open(page["html"], "rb") as f:
+                html = f.read().decode("utf-8", "replace")
+            start = time.perf_counter()
+            soup = make_soup(html, only=compiled["parts"])
+            parse_s += time.perf_counter() - start
+            extract_timed(soup, compiled, timings)
+    n = repeat * len(pages)
+    return {
+        "make_soup": round(parse_s / n * 1000, 3),
+        **{field: round(t / n * 1000, 3) for field, t in timings.items()},
+    }
+
+
+def _memory_per_article(parse, pages: list):
+    # Pico de memoria de Python de cada artículo (MB), promedio y máximo.
+    peaks = []
+    tracemalloc.start()
+    try:
+        for page in pages:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            parse(page["url"], None)
+            peaks.append((tracemalloc.get_traced_memory()[1] - base) / 2 ** 20)
+    finally:
+        tracemalloc.stop()
+    return {"mean_mb": round(sum(peaks) / len(peaks), 3), "max_mb": round(max(peaks), 3)}
+
+
+def run_benchmark(fixtures: dict, repeat: int = 10, memory: bool = True):
+    """
+    Corre todos los extractores sobre los fixtures.
+
+    Recibe:
+        fixtures (dict): resultado de load_fixtures.
+        repeat (int): pasadas sobre cada página para medir tiempos.
+        memory (bool): medir memoria por artículo.
+
+    Retorna:
+        dict: {medio: {extractor: {articles, articles_per_sec, ms_per_article,
+        memory, mismatches, fields_ms (solo spec)}}}
+    """
+    pages = {
+        page["url"]: (page["html"], page["headers"])
+        for medio_pages in fixtures.values() for page in medio_pages
+    }
+    previous_session = http_client.get_session()
+    previous_cache = http_client.get_cache()
+    http_client.set_session(FixtureSession(pages))
+    http_client.set_cache(None)
+    rate_limit.reset()
+
+    results = {}
+    try:
+        for medio, medio_pages in fixtures.items():
+            extractors, spec = _extractors(medio)
+            results[medio] = {}
+            for name, parse in extractors.items():
+                mismatches = {}
+                for page in medio_pages:
+                    got = parse(page["url"], None)
+                    if page["expected"] is not None:
+                        diff = _diff(page["expected"], got)
+                        if diff:
+                            mismatches[os.path.basename(page["html"])] = diff
+
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    for page in medio_pages:
+                        parse(page["url"], None)
+                elapsed = time.perf_counter() - start
+                n = repeat * len(medio_pages)
+
+                result = {
+                    "articles": len(medio_pages),
+                    "articles_per_sec": round(n / elapsed, 1),
+                    "ms_per_article": round(elapsed / n * 1000, 3),
+                    "mismatches": mismatches,
+                }
+                if memory:
+                    result["memory"] = _memory_per_article(parse, medio_pages)
+                if name == "spec" and spec is not None:
+                    result["fields_ms"] = _field_timings(medio_pages, spec, repeat)
+                results[medio][name] = result
+    finally:
+        http_client.set_session(previous_session)
+        http_client.set_cache(previous_cache)
+    return results
+
+
+def print_report(results: dict):
+    print(f"{'medio':<16}{'extractor':<10}{'art/s':>10}{'ms/art':>10}{'MB/art':>10}  golden")
+    for medio, extractors in results.items():
+        for name, r in extractors.items():
+            mem = r.get("memory", {}).get("mean_mb", "")
+            golden = "ok" if not r["mismatches"] else f"DIFERENCIAS {r['mismatches']}"
+            print(f"{medio:<16}{name:<10}{r['articles_per_sec']:>10}{r['ms_per_article']:>10}{mem:>10}  {golden}")
+        fields = extractors.get("spec", {}).get("fields_ms")
+        if fields:
+            slowest = sorted(fields.items(), key=lambda kv: kv[1], reverse=True)
+            print(" " * 16 + "ms por campo: " + ", ".join(f"{f}={t}" for f, t in slowest))
+
+
+def record_fixtures(medio: str, urls: list, root: str = FIXTURES_DIR):
+    """
+    Descarga artículos reales del medio y los guarda como fixtures, con el
+    registro de la spec actual como golden (revisarlo antes de subirlo).
+    """
+    from datos import HEADERS, SITEMAPS
+
+    folder = os.path.join(root, medio)
+    os.makedirs(folder, exist_ok=True)
+    start = len([n for n in os.listdir(folder) if n.endswith(".html")])
+    for i, url in enumerate(urls, start + 1):
+        resp = http_client.get(url, headers=HEADERS)
+        if resp.status_code != 200:
+            print(f"Error HTTP {resp.status_code} al acceder a {url}")
+            continue
+        # Se guarda en UTF-8 para que el golden no dependa del charset original.
+        html = resp.text
+        base = os.path.join(folder, f"articulo-{i}")
+        with open(base + ".html", "w", encoding="utf-8") as f:
+            f.write(html)
+        meta = {"url": url, "headers": {"Content-Type": "text/html; charset=utf-8"}}
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        print(f"Guardado {base}.html")
+    update_golden(load_fixtures(root, [medio]))
+
+
+def update_golden(fixtures: dict):
+    """
+    Recalcula el registro esperado de cada fixture con la spec actual.
+    """
+    pages = {
+        page["url"]: (page["html"], page["headers"])
+        for medio_pages in fixtures.values() for page in medio_pages
+    }
+    previous_session = http_client.get_session()
+    http_client.set_session(FixtureSession(pages))
+    try:
+        for medio, medio_pages in fixtures.items():
+            parse = _extractors(medio)[0]["spec"]
+            for page in medio_pages:
+                meta = {"url": page["url"], "headers": page["headers"], "expected": parse(page["url"], None)}
+                with open(page["json"], "w", encoding="utf-8") as f:
+                    json.dump(meta, f, ensure_ascii=False, indent=2)
+                    f.write("\n")
+            print(f"Golden de {medio}: {len(medio_pages)} artículos")
+    finally:
+        http_client.set_session(previous_session)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark offline de los extractores de artículos")
+    parser.add_argument("--medio", action="append", help="medio a medir (se puede repetir)")
+    parser.add_argument("--repeat", type=int, default=10, help="pasadas por página")
+    parser.add_argument("--no-memory", action="store_true", help="no medir memoria")
+    parser.add_argument("--json", help="guardar los resultados en este archivo")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="carpeta de fixtures")
+    parser.add_argument("--update-golden", action="store_true", help="recalcular los golden")
+    parser.add_argument("--record", nargs="+", metavar=("MEDIO", "URL"), help="guardar artículos reales")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record_fixtures(args.record[0], args.record[1:], args.fixtures)
+        return 0
+
+    fixtures = load_fixtures(args.fixtures, args.medio)
+    if not fixtures:
+        print(f"No hay fixtures en {args.fixtures}")
+        return 1
+
+    if args.update_golden:
+        update_golden(fixtures)
+        return 0
+
+    results = run_benchmark(fixtures, repeat=args.repeat, memory=not args.no_memory)
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failed = any(r["mismatches"] for extractors in results.values() for r in extractors.values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
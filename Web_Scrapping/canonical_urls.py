@@ -0,0 +1,133 @@
+import re
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+
+'''
+Forma canónica de las URLs de artículos.
+
+El mismo artículo aparece en varios sitemaps hijos o con variantes: con
+query strings de campañas, con fragmento, con o sin barra final, por
+http o por https. Todas las funciones de descubrimiento pasan sus URLs por
+aquí (sitemaps._Collector, los listados de cada medio y el planificador),
+así cada artículo se descarga una sola vez y aparece una sola vez en el
+corpus.
+
+    - canonicalize(url): URL que se descarga y se guarda: https, host en
+      minúsculas sin puerto por defecto, ruta sin "//" ni segmentos "." /
+      "..", escapes %xx normalizados, sin fragmento y sin query (ninguno de
+      los medios identifica sus artículos por la query; con
+      keep_query=True se conservan los parámetros que no son de rastreo,
+      ordenados).
+    - url_key(url): identidad para deduplicar: la URL canónica sin barra
+      final. No se usa para descargar, porque cada sitio redirige a su
+      propia forma (con o sin barra) y eso costaría una petición extra.
+'''
+
+# Parámetros de rastreo que nunca cambian el contenido.
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "igshid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "ref", "ref_src", "cmpid", "share", "amp",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+_UNRESERVED = set("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~")
+_ESCAPE = re.compile(r"%[0-9a-fA-F]{2}")
+_DEFAULT_PORTS = {80, 443}
+
+
+def _normalize_escape(match):
+    # %7e -> ~ (carácter no reservado); el resto en mayúsculas (%c3 -> %C3).
+    char = chr(int(match.group(0)[1:], 16))
+    return char if char in _UNRESERVED else match.group(0).upper()
+
+
+def _normalize_path(path: str):
+    path = _ESCAPE.sub(_normalize_escape, path or "/")
+    trailing = path.endswith("/")
+    segments = []
+    for segment in path.split("/"):
+        if segment in ("", "."):
+            continue
+        if segment == "..":
+            if segments:
+                segments.pop()
+            continue
+        segments.append(segment)
+    path = "/" + "/".join(segments)
+    return path + "/" if trailing and segments else path
+
+
+def _normalize_query(query: str):
+    params = [
+        (k, v) for k, v in parse_qsl(query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlencode(sorted(params))
+
+
+def canonicalize(url: str, base: str = None, keep_query: bool = False):
+    """
+    Forma canónica de una URL de artículo.
+
+    Recibe:
+        url (str): URL absoluta o relativa.
+        base (str): URL contra la que se resuelven las relativas.
+        keep_query (bool): conservar la query (sin parámetros de rastreo y
+            ordenada); por defecto se descarta.
+
+    Retorna:
+        str: URL canónica. Las que no son http(s) o no se pueden
+        interpretar se retornan sin cambios.
+    """
+    url = url.strip()
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https"):
+        return url
+
+    try:
+        port = parts.port
+    except ValueError:
+        return url
+    host = (parts.hostname or "").rstrip(".")
+    netloc = host if port is None or port in _DEFAULT_PORTS else f"{host}:{port}"
+    query = _normalize_query(parts.query) if keep_query and parts.query else ""
+    return urlunsplit(("https", netloc, _normalize_path(parts.path), query, ""))
+
+
+def _key(canonical: str):
+    # Barra final fuera (salvo la raíz "https://host/").
+    base, sep, query = canonical.partition("?")
+    if base.endswith("/") and base.count("/") > 3:
+        base = base[:-1]
+    return base + sep + query
+
+
+def url_key(url: str, keep_query: bool = False):
+    """
+    Identidad de una URL para deduplicar: canónica y sin barra final.
+    """
+    return _key(canonicalize(url, keep_query=keep_query))
+
+
+def canonical_pair(url: str, base: str = None):
+    """
+    (canonicalize(url), url_key(url)) canonicalizando una sola vez.
+    """
+    canonical = canonicalize(url, base)
+    return canonical, _key(canonical)
+
+
+def unique_urls(urls, base: str = None):
+    """
+    URLs canónicas sin duplicados (por url_key), en el orden original; de
+    cada artículo queda la primera variante vista.
+    """
+    seen = set()
+    unique = []
+    for url in urls:
+        url, key = canonical_pair(url, base)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
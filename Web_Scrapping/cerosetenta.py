@@ -1,6 +1,10 @@
-import requests
+import http_client
+from scheduler import run_outlet
 import pandas as pd
-from bs4 import BeautifulSoup
+from parsing import make_soup
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
+from canonical_urls import unique_urls
 import os
 from dotenv import load_dotenv
 
@@ -12,12 +16,12 @@ def get_urls_politica_CeroSetenta(url_base: str, headers: dict):
     """
     Obtiene todas las URLs de noticias de política de CeroSetenta desde la página de política.
     """
-    resp = requests.get(url_base, headers=headers)
+    resp = http_client.get(url_base, headers=headers)
     if resp.status_code != 200:
         print(f"Error HTTP {resp.status_code} al acceder a {url_base}")
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = make_soup(resp.text)
 
     # Extraer todos los <a> que tengan <h2> dentro (títulos de artículos)
     urls = []
@@ -26,82 +30,55 @@ def get_urls_politica_CeroSetenta(url_base: str, headers: dict):
         if a and a["href"].startswith(url_CeroSetenta):
             urls.append(a["href"])
 
-    # Quitar duplicados
-    urls = list(dict.fromkeys(urls))
+    # Forma canónica y sin duplicados (variantes con query, #, barra final)
+    urls = unique_urls(urls)
     return urls
 
 
-def get_article_info_CeroSetenta(url: str):
-    """
-    Descarga un artículo de CeroSetenta y extrae:
-    title, body, date_published, author, section, tags.
-    """
-    resp = requests.get(url)
-    if resp.status_code != 200:
-        print(f"Error {resp.status_code} al acceder a {url}")
-        return None
-
-    soup = BeautifulSoup(resp.text, "html.parser")
+# Parser de artículos: la spec del medio en article_specs.py, la misma que
+# usa get_all_news (ver extractors.make_article_parser).
+get_article_info_CeroSetenta = make_article_parser(EXTRACTORS["CeroSetenta"])
 
-    # Título
-    title_tag = soup.find("h1", class_="entry-title")
-    title = title_tag.get_text(" ", strip=True) if title_tag else None
 
-    # Autor
-    autor_box = soup.find("div", class_="autor")
-    author_tag = autor_box.find("a") if autor_box else None
-    author = author_tag.get_text(strip=True) if author_tag else None
-
-    # Fecha
-    fecha_tag = autor_box.find("span") if autor_box else None
-    date_published = fecha_tag.get_text(strip=True) if fecha_tag else None
-
-    # Cuerpo
-    body_container = soup.find("div", class_="entry-content")
-    if body_container:
-        parrafos = [p.get_text(strip=True) for p in body_container.find_all("p")]
-        body = "\n\n".join(parrafos) if parrafos else None
-    else:
-        body = None
-
-    # Tags (excluyendo política)
-    tags_container = soup.find("div", class_="categorias_bottom") or soup.find("div", class_="categorias_top")
-    tags = None
-    if tags_container:
-        tags = [
-            a.get_text(strip=True)
-            for a in tags_container.find_all("a")
-            if not a.get("href", "").endswith("/politica/")
-        ]
-
-    # Sección fija
-    section = "politica"
-
-    return {
-        "url": url,
-        "title": title,
-        "body": body,
-        "date_published": date_published,
-        "author": author,
-        "section": section,
-        "tags": tags,
-    }
-
-
-def get_news_CeroSetenta(url_base: str, headers: dict, limit: int = None):
+def get_news_urls_CeroSetenta(
+    url_base: str,
+    headers: dict,
+    limit: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    on_url=None
+    ):
     """
-    Obtiene un DataFrame con los artículos de política de CeroSetenta.
+    Obtiene las URLs de artículos que procesa get_news_CeroSetenta:
+    descubrimiento, filtros y límite.
+
+    La página de listado no trae fechas de modificación, por lo que
+    since/until no aplican a este medio y se ignoran. En modo pipeline
+    (on_url) las URLs se entregan apenas se lee la página de listado.
     """
+
     urls = get_urls_politica_CeroSetenta(url_base, headers)
 
+    # Modo incremental: descartar URLs ya procesadas
+    if seen_store is not None:
+        urls = seen_store.filter_new(urls)
+
     if limit:
         urls = urls[:limit]
 
-    data = []
-    for url in urls:
-        info = get_article_info_CeroSetenta(url)
-        if info:
-            data.append(info)
+    # Modo pipeline: entregar las URLs a la descarga de artículos
+    if on_url is not None:
+        for u in urls:
+            on_url(u)
+
+    return urls
+
+
+def to_dataframe_CeroSetenta(data: list):
+    """
+    Convierte los registros de get_article_info_CeroSetenta en un DataFrame limpio.
+    """
 
     df = pd.DataFrame(data)
 
@@ -113,3 +90,52 @@ def get_news_CeroSetenta(url_base: str, headers: dict, limit: int = None):
         df["body"] = df["body"].apply(lambda x: x.replace("\n", " ") if isinstance(x, str) else "")
 
     return df
+
+
+def get_news_CeroSetenta(
+    url_base: str,
+    headers: dict,
+    limit: int = None,
+    concurrency: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    pipeline: bool = False
+    ):
+    """
+    Obtiene un DataFrame con los artículos de política de CeroSetenta.
+    """
+
+    if pipeline:
+        # Descubrimiento y descarga de artículos solapados (cola acotada)
+        data = run_outlet(
+            "CeroSetenta",
+            get_article_info_CeroSetenta,
+            headers,
+            discover=lambda on_url: get_news_urls_CeroSetenta(
+                url_base,
+                headers,
+                limit=limit,
+                seen_store=seen_store,
+                since=since,
+                until=until,
+                on_url=on_url
+            ),
+            concurrency=concurrency
+        )
+    else:
+        urls = get_news_urls_CeroSetenta(
+            url_base,
+            headers,
+            limit=limit,
+            seen_store=seen_store,
+            since=since,
+            until=until
+        )
+
+        data = run_outlet("CeroSetenta", get_article_info_CeroSetenta, headers, urls=urls, concurrency=concurrency)
+
+    if seen_store is not None:
+        seen_store.add_many([r["url"] for r in data], "CeroSetenta")
+
+    return to_dataframe_CeroSetenta(data)
@@ -0,0 +1,199 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+'''
+Puntos de control de una corrida de get_all_news y cola de URLs fallidas.
+
+El checkpoint guarda, por medio, las URLs descubiertas y el estado de cada
+una (pendiente / hecha). Si la corrida muere, la siguiente con el mismo
+archivo no vuelve a descubrir los medios ya descubiertos y solo descarga
+las URLs pendientes; los artículos ya escritos están en el .part del
+RecordSink, que se reanuda.
+
+Las URLs que fallan (error HTTP, excepción o sin registro) pasan a la
+tabla `failed`, que sobrevive al final de la corrida. Una pasada posterior
+con replay_failed=True reintenta solo esas URLs; las que se recuperan
+salen de la cola (mark_recovered) sin registrarse en el progreso.
+'''
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+class CrawlCheckpoint:
+    """
+    Almacén sqlite del progreso de una corrida.
+
+    Recibe:
+        path (str): ruta del archivo sqlite (se crea si no existe).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS outlets (
+                medio TEXT PRIMARY KEY,
+                discovered_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS progress (
+                url TEXT PRIMARY KEY,
+                medio TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                done INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_progress_medio ON progress(medio, done, seq);
+            CREATE TABLE IF NOT EXISTS failed (
+                url TEXT PRIMARY KEY,
+                medio TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                error TEXT,
+                failed_at TEXT NOT NULL
+            );
+            """
+        )
+        self._db.commit()
+
+    # ---------- Descubrimiento ----------
+
+    def is_discovered(self, medio: str):
+        """
+        Indica si el descubrimiento del medio ya terminó en esta corrida.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT discovered_at FROM outlets WHERE medio = ?", (medio,)
+            ).fetchone()
+        return row is not None and row[0] is not None
+
+    def add_urls(self, medio: str, urls: list):
+        """
+        Registra URLs descubiertas como pendientes (en orden).
+        """
+        with self._lock:
+            start = self._db.execute(
+                "SELECT COALESCE(MAX(seq), -1) + 1 FROM progress WHERE medio = ?", (medio,)
+            ).fetchone()[0]
+            self._db.executemany(
+                "INSERT OR IGNORE INTO progress (url, medio, seq) VALUES (?, ?, ?)",
+                [(u, medio, start + i) for i, u in enumerate(urls)]
+            )
+            self._db.commit()
+
+    def mark_discovered(self, medio: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO outlets (medio, discovered_at) VALUES (?, ?)",
+                (medio, _now())
+            )
+            self._db.commit()
+
+    # ---------- Progreso ----------
+
+    def pending(self, medio: str):
+        """
+        URLs del medio que aún no se descargan, en orden de descubrimiento.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url FROM progress WHERE medio = ? AND done = 0 ORDER BY seq",
+                (medio,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def is_done(self, url: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT done FROM progress WHERE url = ?", (url,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def mark_done(self, url: str, medio: str):
+        """
+        Marca una URL como descargada y la saca de la cola de fallidas.
+        """
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO progress (url, medio, seq, done) VALUES (?, ?, -1, 1)
+                ON CONFLICT(url) DO UPDATE SET done = 1
+                """,
+                (url, medio)
+            )
+            self._db.execute("DELETE FROM failed WHERE url = ?", (url,))
+            self._db.commit()
+
+    def mark_recovered(self, url: str):
+        """
+        Saca de la cola de fallidas una URL que se recuperó en una pasada
+        de replay_failed. No toca el progreso: la corrida de replay no es
+        una corrida del checkpoint y no debe dejar URLs marcadas como
+        hechas para la siguiente.
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM failed WHERE url = ?", (url,))
+            self._db.commit()
+
+    def mark_written(self, urls):
+        """
+        Marca como hechas URLs que ya estaban escritas en la salida (por
+        ejemplo las que encontró RecordSink al reanudar un .part).
+        """
+        urls = list(urls)
+        with self._lock:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                self._db.execute(
+                    f"UPDATE progress SET done = 1 WHERE url IN ({placeholders})", chunk
+                )
+            self._db.commit()
+
+    def mark_failed(self, url: str, medio: str, error: str = None):
+        """
+        Agrega (o actualiza) una URL en la cola de fallidas. Cuenta como
+        procesada para la corrida actual.
+        """
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT INTO failed (url, medio, attempts, error, failed_at)
+                VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    attempts = attempts + 1,
+                    error = excluded.error,
+                    failed_at = excluded.failed_at
+                """,
+                (url, medio, error, _now())
+            )
+            self._db.execute("UPDATE progress SET done = 1 WHERE url = ?", (url,))
+            self._db.commit()
+
+    def finish(self):
+        """
+        Cierra la corrida: borra el progreso (la cola de fallidas se conserva).
+        """
+        with self._lock:
+            self._db.execute("DELETE FROM progress")
+            self._db.execute("DELETE FROM outlets")
+            self._db.commit()
+
+    # ---------- Cola de fallidas ----------
+
+    def failed(self, medio: str = None):
+        """
+        URLs fallidas (de un medio o de todos), de la más antigua a la más
+        reciente.
+        """
+        query = "SELECT url FROM failed"
+        params = ()
+        if medio is not None:
+            query += " WHERE medio = ?"
+            params = (medio,)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY failed_at", params).fetchall()
+        return [r[0] for r in rows]
@@ -0,0 +1,61 @@
+import os
+import threading
+
+import pytest
+
+# Las pruebas corren sin .env: los headers reales no hacen falta y las
+# bases de los medios con listado apuntan a sus hosts reales, que
+# MockSession redirige al servidor simulado. Se fijan antes de que
+# cualquier prueba importe datos o los módulos de los medios.
+os.environ.setdefault("HEADER", "{}")
+os.environ.setdefault("URL_LAFM", "https://www.lafm.com.co")
+os.environ.setdefault("URL_CEROSETENTA", "https://cerosetenta.uniandes.edu.co")
+os.environ.setdefault("URL_SEMANARIOVOZ", "https://semanariovoz.com")
+
+import http_client
+import rate_limit
+import mock_sites
+
+'''
+Fixtures compartidas de las pruebas.
+
+    - mock_sites_server: fábrica que levanta mock_sites en un puerto libre
+      (MockSites(**kwargs), sin latencia por defecto), inyecta su
+      MockSession en http_client y retorna la sesión. Al terminar la
+      prueba se apaga el servidor y se restaura la sesión anterior.
+    - no_rate_limits: quita los "rate" de SITEMAPS durante la prueba, para
+      que get_all_news no espere al token bucket de los sitios reales.
+'''
+
+
+@pytest.fixture
+def mock_sites_server():
+    servers = []
+    previous = http_client.get_session()
+
+    def start(session_class=mock_sites.MockSession, **kwargs):
+        kwargs.setdefault("latency_ms", 0)
+        kwargs.setdefault("seed", 1)
+        server = mock_sites.make_server(mock_sites.MockSites(**kwargs), port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        session = session_class(f"http://127.0.0.1:{server.server_address[1]}")
+        http_client.set_session(session)
+        return session
+
+    yield start
+
+    http_client.set_session(previous)
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def no_rate_limits(monkeypatch):
+    import datos
+
+    for config in datos.SITEMAPS.values():
+        monkeypatch.setitem(config, "rate", None)
+    yield
+    rate_limit.reset()
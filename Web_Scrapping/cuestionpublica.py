@@ -1,171 +1,97 @@
-import requests
+from scheduler import run_outlet
 import pandas as pd
-import xml.etree.ElementTree as ET
-from bs4 import BeautifulSoup
-import os
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
 from dotenv import load_dotenv
 
-load_dotenv()
+from sitemaps import get_sitemap_entries
 
-url_CuestionPublica_loc     = os.getenv('URL_CUESTIONPUBLICA_LOC')
-url_CuestionPublica_sitemap = os.getenv('URL_CUESTIONPUBLICA_SITEMAP')
-url_CuestionPublica_url     = os.getenv('URL_CUESTIONPUBLICA_URL')
+load_dotenv()
 
-def get_urls_politica_CuestionPublica(sitemap_index_url: str, headers: dict):
+def get_urls_politica_CuestionPublica(
+    sitemap_index_url: str,
+    headers: dict,
+    since=None,
+    until=None,
+    url_filter=None,
+    limit: int = None,
+    on_url=None
+    ):
     """
     Lee el sitemap_index, filtra los sitemaps que contienen posts,
-    y devuelve todas las URLs de artículos.
-    """
+    y devuelve las URLs de artículos con su lastmod.
 
-    resp = requests.get(sitemap_index_url, headers=headers)
-    if resp.status_code != 200:
-        print(f"Error HTTP {resp.status_code} al acceder al sitemap index.")
-        return []
+    Los sitemaps se leen en streaming y varios a la vez
+    (SITEMAP_PARALLELISM): los de posts con lastmod anterior a
+    `since` no se descargan, y una vez reunidas `limit` URLs que pasan
+    `url_filter` no se piden los que ya no pueden aportar artículos más
+    recientes. Los duplicados se descartan durante la lectura.
 
-    root = ET.fromstring(resp.content)
+    Con on_url (modo pipeline) cada URL se entrega apenas se lee.
 
-    # Extraer URLs de cada sitemap
-    sitemap_urls = [
-        sm.find(url_CuestionPublica_loc).text
-        for sm in root.findall(url_CuestionPublica_sitemap)
-    ]
+    Retorna:
+        list[tuple[str, datetime]]: pares (url, lastmod), del más reciente
+        al más antiguo.
+    """
 
     # Filtrar solo los sitemaps relevantes
-    post_sitemaps = [
-        u for u in sitemap_urls
-        if "post" in u.lower() or "cuestion" in u.lower()
-    ]
-
-    urls_finales = []
-
-    # Procesar cada sitemap de posts
-    for sm_url in post_sitemaps:
-        resp2 = requests.get(sm_url, headers=headers)
-        if resp2.status_code != 200:
-            continue
-
-        post_root = ET.fromstring(resp2.content)
-
-        urls = [
-            url_tag.find(url_CuestionPublica_loc).text
-            for url_tag in post_root.findall(url_CuestionPublica_url)
-        ]
+    urls_finales = get_sitemap_entries(
+        sitemap_index_url,
+        headers,
+        since=since,
+        until=until,
+        index_filter=lambda u: "post" in u.lower() or "cuestion" in u.lower(),
+        url_filter=url_filter,
+        limit=limit,
+        on_url=on_url
+    )
 
-        urls_finales.extend(urls)
+    return urls_finales
 
-    # quitar duplicados
-    urls_finales = list(dict.fromkeys(urls_finales))
 
-    return urls_finales
+# Parser de artículos: la spec del medio en article_specs.py, la misma que
+# usa get_all_news (ver extractors.make_article_parser).
+get_article_info_CuestionPublica = make_article_parser(EXTRACTORS["CuestionPublica"])
 
 
-def get_article_info_CuestionPublica(url: str, headers: dict):
+def get_news_urls_CuestionPublica(
+    sitemap_index_url: str,
+    headers: dict,
+    limit: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    on_url=None
+    ):
     """
-    Descarga y parsea una noticia de Cuestión Pública,
-    con los campos: title, subtitle, date_published, body, author, section, tags.
+    Obtiene las URLs de artículos que procesa get_news_CuestionPublica:
+    descubrimiento, filtros y límite (los más recientes primero).
     """
 
-    resp = requests.get(url, headers=headers)
-    if resp.status_code != 200:
-        print(f"Error HTTP {resp.status_code} en {url}")
-        return None
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # -------------------------
-    # TÍTULO
-    # -------------------------
-    titulo_tag = soup.find("h1")
-    title = titulo_tag.get_text(strip=True) if titulo_tag else None
-
-    # -------------------------
-    # FECHA (primer meta:published_time)
-    # -------------------------
-    meta_fecha = soup.find("meta", {"property": "article:published_time"})
-    date_published = meta_fecha.get("content") if meta_fecha else None
-
-    # -------------------------
-    # AUTOR
-    # -------------------------
-    meta_author = soup.find("meta", {"name": "author"})
-    if meta_author:
-        author = [meta_author.get("content")]
-    else:
-        author = None
-
-    # -------------------------
-    # SUBTÍTULO
-    # Puede estar en <section class="entry-summary"> o similar
-    # -------------------------
-    subtitle_tag = (
-        soup.find("section", class_="entry-summary")
-        or soup.find("div", class_="subtitle")
-        or soup.find("h2")
+    # Modo incremental: descartar URLs ya procesadas mientras se lee el sitemap
+    def es_nueva(u):
+        return seen_store is None or u not in seen_store
+
+    entries = get_urls_politica_CuestionPublica(
+        sitemap_index_url,
+        headers,
+        since=since,
+        until=until,
+        url_filter=es_nueva,
+        limit=limit,
+        on_url=on_url
     )
-    subtitle = subtitle_tag.get_text(strip=True) if subtitle_tag else None
-
-    # -------------------------
-    # CUERPO
-    # -------------------------
-    body_div = soup.find("div", class_="entry-content")
-    if not body_div:
-        body_div = soup.find("article")
-
-    if body_div:
-        paragraphs = [
-            p.get_text(" ", strip=True)
-            for p in body_div.find_all("p")
-            if p.get_text(strip=True)
-        ]
-        body = "\n".join(paragraphs) if paragraphs else None
-    else:
-        body = None
 
-    # -------------------------
-    # TAGS
-    # puede estar en <div class="tags"> o <ul>
-    # -------------------------
-    tags_div = soup.find("div", class_="tags")
-    if tags_div:
-        tags = [a.get_text(strip=True) for a in tags_div.find_all("a")]
-    else:
-        tags = None
-
-    # -------------------------
-    # SECCIÓN FIJA
-    # -------------------------
-    section = "politica"
+    urls = [u for u, _ in entries]
 
-    return {
-        "url": url,
-        "title": title,
-        "subtitle": subtitle,
-        "date_published": date_published,
-        "body": body,
-        "author": author,
-        "section": section,
-        "tags": tags,
-    }
+    return urls
 
 
-def get_news_CuestionPublica(sitemap_index_url: str, headers: dict, limit: int = None):
+def to_dataframe_CuestionPublica(data: list):
     """
-    Obtiene varias noticias desde Cuestión Pública usando el sitemap,
-    las parsea y regresa un DataFrame.
+    Convierte los registros de get_article_info_CuestionPublica en un DataFrame limpio.
     """
 
-    urls = get_urls_politica_CuestionPublica(sitemap_index_url, headers)
-
-    if limit:
-        urls = urls[:limit]
-
-    data = []
-
-    for u in urls:
-        info = get_article_info_CuestionPublica(u, headers)
-        if info:
-            data.append(info)
-
     df = pd.DataFrame(data)
 
     # -------------------------
@@ -182,3 +108,53 @@ def get_news_CuestionPublica(sitemap_index_url: str, headers: dict, limit: int =
         )
 
     return df
+
+
+def get_news_CuestionPublica(
+    sitemap_index_url: str,
+    headers: dict,
+    limit: int = None,
+    concurrency: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    pipeline: bool = False
+    ):
+    """
+    Obtiene varias noticias desde Cuestión Pública usando el sitemap,
+    las parsea y regresa un DataFrame.
+    """
+
+    if pipeline:
+        # Descubrimiento y descarga de artículos solapados (cola acotada)
+        data = run_outlet(
+            "CuestionPublica",
+            get_article_info_CuestionPublica,
+            headers,
+            discover=lambda on_url: get_news_urls_CuestionPublica(
+                sitemap_index_url,
+                headers,
+                limit=limit,
+                seen_store=seen_store,
+                since=since,
+                until=until,
+                on_url=on_url
+            ),
+            concurrency=concurrency
+        )
+    else:
+        urls = get_news_urls_CuestionPublica(
+            sitemap_index_url,
+            headers,
+            limit=limit,
+            seen_store=seen_store,
+            since=since,
+            until=until
+        )
+
+        data = run_outlet("CuestionPublica", get_article_info_CuestionPublica, headers, urls=urls, concurrency=concurrency)
+
+    if seen_store is not None:
+        seen_store.add_many([r["url"] for r in data], "CuestionPublica")
+
+    return to_dataframe_CuestionPublica(data)
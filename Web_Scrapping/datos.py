@@ -1,21 +1,53 @@
 import os
 import time
 import json
+import threading
 import pandas as pd
 import requests
 from dotenv import load_dotenv
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+import http_client
+import rate_limit
+import metrics
+import profiling
+from http_cache import HTTPCache
+from html_archive import HTMLArchive, ArchiveSession
+from seen_store import SeenStore
+from scheduler import run_url_scheduler
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
+from outlet_traffic import TRAFFIC
+from record_sink import RecordSink
+from checkpoint import CrawlCheckpoint
+from dedup import deduplicate
+
 # Importación de tus funciones individuales
-from el_nuevo_siglo import get_news_ElNuevoSiglo
+from el_nuevo_siglo import (
+    get_news_ElNuevoSiglo, get_news_urls_ElNuevoSiglo, to_dataframe_ElNuevoSiglo
+)
 #from semana import get_news_Semana
-from lafm import get_news_LaFM
-from lavoragine import get_news_LaVoragine
-from cerosetenta import get_news_CeroSetenta
-from semanariovoz import get_news_SemanarioVoz
-from cuestionpublica import get_news_CuestionPublica
-from elpacifista import get_news_Pacifista
-from lasillavacia import get_news_LaSilla
+from lafm import (
+    get_news_LaFM, get_news_urls_LaFM, to_dataframe_LaFM
+)
+from lavoragine import (
+    get_news_LaVoragine, get_news_urls_LaVoragine, to_dataframe_LaVoragine
+)
+from cerosetenta import (
+    get_news_CeroSetenta, get_news_urls_CeroSetenta, to_dataframe_CeroSetenta
+)
+from semanariovoz import (
+    get_news_SemanarioVoz, get_news_urls_SemanarioVoz, to_dataframe_SemanarioVoz
+)
+from cuestionpublica import (
+    get_news_CuestionPublica, get_news_urls_CuestionPublica, to_dataframe_CuestionPublica
+)
+from elpacifista import (
+    get_news_Pacifista, get_news_urls_Pacifista, to_dataframe_Pacifista
+)
+from lasillavacia import (
+    get_news_LaSilla, get_news_urls_LaSilla, to_dataframe_LaSilla
+)
 
 
 load_dotenv()
@@ -27,78 +59,142 @@ load_dotenv()
 
 HEADERS = json.loads(os.getenv("HEADER"))
 
+# Plazos de reloj por defecto (segundos; vacío = sin plazo).
+RUN_DEADLINE = os.getenv("CRAWL_RUN_DEADLINE")
+OUTLET_DEADLINE = os.getenv("CRAWL_OUTLET_DEADLINE")
+
+# Deduplicación del DataFrame final: "flag", "drop" o vacío (ver dedup.py).
+DEDUP = os.getenv("CRAWL_DEDUP")
+
+# "func":        get_news_* completo del medio (uso individual).
+# "urls":        descubrimiento de URLs (sitemap/listado + filtros + límite).
+# "article":     parser de un artículo, compilado desde EXTRACTORS
+#                (article_specs.py; los get_article_info_* de cada módulo
+#                usan la misma spec).
+# "to_df":       normalización de los registros a DataFrame.
+# "host", "rate", "max_rate", "concurrency", "max_concurrency": control de
+#                tráfico del medio, desde TRAFFIC (outlet_traffic.py; los
+#                get_news_* sueltos usan los mismos topes).
+# "deadline":    (opcional) plazo en segundos del medio; reemplaza a
+#                outlet_deadline de get_all_news.
 SITEMAPS = {
     "ElNuevoSiglo": {
         "func": get_news_ElNuevoSiglo,
+        "urls": get_news_urls_ElNuevoSiglo,
+        "article": make_article_parser(EXTRACTORS["ElNuevoSiglo"]),
+        "to_df": to_dataframe_ElNuevoSiglo,
         "args": {"sitemap_urls": [
             "https://www.elnuevosiglo.com.co/sitemap.xml?page=1",
             "https://www.elnuevosiglo.com.co/sitemap.xml?page=2"
         ]},
-        "espectro": "derecha"
+        "espectro": "derecha",
+        **TRAFFIC["ElNuevoSiglo"],
     },
 
     "LaFM": {
         "func": get_news_LaFM,
+        "urls": get_news_urls_LaFM,
+        "article": make_article_parser(EXTRACTORS["LaFM"]),
+        "to_df": to_dataframe_LaFM,
         "args": {"url_base": "https://www.lafm.com.co/politica"},
-        "espectro": "derecha"
+        "espectro": "derecha",
+        **TRAFFIC["LaFM"],
     },
 
     "LaVoragine": {
         "func": get_news_LaVoragine,
+        "urls": get_news_urls_LaVoragine,
+        "article": make_article_parser(EXTRACTORS["LaVoragine"]),
+        "to_df": to_dataframe_LaVoragine,
         "args": {"sitemap_url": "https://voragine.co/post-sitemap.xml"},
-        "espectro": "izquierda"
+        "espectro": "izquierda",
+        **TRAFFIC["LaVoragine"],
     },
 
     "CeroSetenta": {
         "func": get_news_CeroSetenta,
+        "urls": get_news_urls_CeroSetenta,
+        "article": make_article_parser(EXTRACTORS["CeroSetenta"]),
+        "to_df": to_dataframe_CeroSetenta,
         "args": {"url_base": "https://cerosetenta.uniandes.edu.co/tema/politica/"},
-        "espectro": "izquierda"
+        "espectro": "izquierda",
+        **TRAFFIC["CeroSetenta"],
     },
 
     "SemanarioVoz": {
         "func": get_news_SemanarioVoz,
+        "urls": get_news_urls_SemanarioVoz,
+        "article": make_article_parser(EXTRACTORS["SemanarioVoz"]),
+        "to_df": to_dataframe_SemanarioVoz,
         "args": {"url_base": "https://semanariovoz.com/category/politica/"},
-        "espectro": "izquierda"
+        "espectro": "izquierda",
+        **TRAFFIC["SemanarioVoz"],
     },
 
     "CuestionPublica": {
         "func": get_news_CuestionPublica,
+        "urls": get_news_urls_CuestionPublica,
+        "article": make_article_parser(EXTRACTORS["CuestionPublica"]),
+        "to_df": to_dataframe_CuestionPublica,
         "args": {"sitemap_index_url": "https://cuestionpublica.com/sitemap_index.xml"},
-        "espectro": "centro"
+        "espectro": "centro",
+        **TRAFFIC["CuestionPublica"],
     },
 
     "Pacifista": {
         "func": get_news_Pacifista,
+        "urls": get_news_urls_Pacifista,
+        "article": make_article_parser(EXTRACTORS["Pacifista"]),
+        "to_df": to_dataframe_Pacifista,
         "args": {"sitemap_url": "https://pacifista.tv/post-sitemap.xml"},
-        "espectro": "centro"
+        "espectro": "centro",
+        **TRAFFIC["Pacifista"],
     },
 
     "LaSillaVacia": {
         "func": get_news_LaSilla,
+        "urls": get_news_urls_LaSilla,
+        "article": make_article_parser(EXTRACTORS["LaSillaVacia"]),
+        "to_df": to_dataframe_LaSilla,
         "args": {"sitemap_index_url": "https://www.lasillavacia.com/sitemap_index.xml"},
-        "espectro": "centro"
+        "espectro": "centro",
+        **TRAFFIC["LaSillaVacia"],
     },
 }
 
+# Parsers del modo metadata_only: solo la cabecera (JSON-LD y <meta>).
+METADATA_PARSERS = {
+    medio: make_article_parser(spec, metadata_only=True)
+    for medio, spec in EXTRACTORS.items()
+}
+
 def run_with_retry(func, kwargs, limit, retries=3, sleep_base=2):
     """
     Ejecuta una función con reintentos.
 
+    Los errores transitorios de cada petición ya se reintentan en
+    http_client.get; aquí se cubren las fallas del descubrimiento completo
+    de un medio (por ejemplo un sitemap malformado).
+
     Args:
-        func (callable): función de scraping del medio.
+        func (callable): función de scraping (o de descubrimiento) del medio.
         kwargs (dict): argumentos base del medio.
         limit (int): límite de artículos.
         retries (int): reintentos.
         sleep_base (int): espera creciente exponencial.
 
     Returns:
-        pd.DataFrame o None
+        resultado de func (pd.DataFrame o list[str]) o None
     """
     for i in range(retries):
         try:
             print(f"Intentando {func.__name__}, intento {i+1}/{retries}")
             df = func(limit=limit, headers=HEADERS, **kwargs)
             return df
+        except http_client.DeadlineExceeded:
+            # Sin tiempo para otro intento.
+            print(f"⏱️ Plazo agotado en {func.__name__}")
+            return None
         except Exception as e:
             print(f"Error en {func.__name__}: {e}")
             time.sleep(sleep_base * (i+1))
@@ -108,13 +204,157 @@ def run_with_retry(func, kwargs, limit, retries=3, sleep_base=2):
 
 
 
-def get_all_news(limit=200, workers=5):
+def configure_rate_limits():
+    """
+    Crea el limitador de cada medio con "rate" en SITEMAPS (ver rate_limit).
+
+    Returns:
+        dict: {medio: rate_limit.HostLimiter}
+    """
+    rate_limit.reset()
+    limiters = {}
+    for medio, config in SITEMAPS.items():
+        if config.get("rate") and config.get("host"):
+            limiters[medio] = rate_limit.configure(
+                config["host"],
+                rate=config["rate"],
+                max_rate=config.get("max_rate"),
+                concurrency=config.get("concurrency", 1),
+                max_concurrency=config.get("max_concurrency"),
+            )
+    return limiters
+
+
+def _pipeline_discover(func, kwargs, limit):
+    """
+    Arma la función discover(on_url) de un medio para el modo pipeline.
+    """
+    def discover(on_url):
+        return run_with_retry(func, {**kwargs, "on_url": on_url}, limit)
+    return discover
+
+
+def _checkpointed_discover(checkpoint, medio, discover):
+    """
+    Envuelve discover(on_url) para registrar cada URL en el checkpoint.
+
+    Si el medio ya se había descubierto por completo, se entregan sus URLs
+    pendientes sin volver a leer el sitemap; si no, se descubre de nuevo y
+    se omiten las URLs que ya se descargaron.
+    """
+    def wrapped(on_url):
+        if checkpoint.is_discovered(medio):
+            for url in checkpoint.pending(medio):
+                on_url(url)
+            return
+
+        def record(url):
+            checkpoint.add_urls(medio, [url])
+            if not checkpoint.is_done(url):
+                on_url(url)
+
+        if discover(record) is not None:
+            checkpoint.mark_discovered(medio)
+    return wrapped
+
+
+def get_all_news(
+    limit=200,
+    workers=5,
+    session=None,
+    cache_dir=None,
+    archive_dir=None,
+    replay_archive=None,
+    seen_path=None,
+    since=None,
+    until=None,
+    pipeline=False,
+    metadata_only=False,
+    sink=None,
+    checkpoint_path=None,
+    replay_failed=False,
+    run_deadline=RUN_DEADLINE,
+    outlet_deadline=OUTLET_DEADLINE,
+    metrics_path=metrics.METRICS_PATH,
+    profile_dir=profiling.PROFILE_DIR,
+    dedup=DEDUP
+    ):
     """
     Ejecuta scraping de todos los medios definidos en SITEMAPS.
 
     Args:
         limit (int): límite de artículos por medio.
-        workers (int): número de hilos en paralelo.
+        workers (int): número total de hilos. El descubrimiento corre un
+            trabajo por medio y luego las URLs de todos los medios se reparten
+            entre estos hilos (scheduler.run_url_scheduler), con el tope
+            de concurrencia de cada medio: arranca en "concurrency" y el
+            control AIMD de rate_limit lo ajusta hasta "max_concurrency".
+        session (requests.Session): sesión HTTP compartida por todos los
+            scrapers. Si es None se usa la de http_client (keep-alive y
+            pool de conexiones por host).
+        cache_dir (str): carpeta de la caché HTTP en disco. Las corridas
+            siguientes revalidan sitemaps y artículos con ETag /
+            Last-Modified y reutilizan el cuerpo guardado ante un 304.
+            Si es None se usa HTTP_CACHE_DIR (si está definida).
+        archive_dir (str): carpeta del archivo de HTML crudo
+            (html_archive.HTMLArchive): cada página descargada se guarda
+            comprimida con su URL, código, headers y fecha. Si es None se
+            usa HTML_ARCHIVE_DIR (si está definida).
+        replay_archive (str): re-extracción sin red. En lugar de descubrir
+            y descargar, se vuelven a parsear con los extractores actuales
+            todos los artículos archivados en esta carpeta (limit no
+            aplica). No usa la caché ni escribe en el archivo.
+        seen_path (str): modo incremental. Ruta del registro sqlite de URLs
+            ya procesadas (seen_store.SeenStore); solo se descargan URLs
+            nuevas y el DataFrame retornado es el delta de esta corrida
+            (ver append_to_csv).
+        since, until (datetime | str): ventana de <lastmod> para los medios
+            con sitemap. Los sitemaps hijos anteriores a `since` no se
+            descargan y `limit` toma los artículos más recientes.
+        pipeline (bool): solapar descubrimiento y descarga. Las URLs pasan
+            por una cola acotada por medio (scheduler.PIPELINE_QUEUE_SIZE)
+            y se descargan apenas se leen del sitemap; `limit` toma las
+            primeras en orden de lectura en vez de las más recientes.
+        metadata_only (bool): corrida rápida de indexación. De cada
+            artículo se descarga solo la cabecera (title, subtitle,
+            date_published, author, tags desde JSON-LD y <meta>) y body
+            queda vacío; la página completa solo se lee si a la cabecera le
+            falta algún campo. Estas URLs no se marcan en seen_path, para
+            que una corrida completa posterior sí descargue su cuerpo.
+        sink (record_sink.RecordSink): escritura en streaming. Cada
+            artículo se normaliza y se escribe en el sink apenas se parsea
+            (en orden de llegada) y no se arma ningún DataFrame; la memoria
+            queda constante. Quien crea el sink lo cierra (close()).
+        checkpoint_path (str): archivo sqlite de checkpoint
+            (checkpoint.CrawlCheckpoint). Requiere sink, creado con
+            resume=True. Si la corrida anterior con el mismo archivo se
+            interrumpió, se retoma donde quedó: los medios ya descubiertos
+            no se vuelven a descubrir y solo se descargan las URLs
+            pendientes. Las URLs que fallan quedan en una cola persistente.
+        replay_failed (bool): en lugar de una corrida normal, reintenta
+            solo la cola de URLs fallidas de checkpoint_path.
+        run_deadline (float): plazo en segundos de toda la corrida
+            (CRAWL_RUN_DEADLINE por defecto; None = sin plazo).
+        outlet_deadline (float): plazo en segundos de cada medio, contado
+            desde el inicio de la corrida (CRAWL_OUTLET_DEADLINE o
+            "deadline" en SITEMAPS). Al vencerse se corta el descubrimiento
+            y las descargas del medio y se retorna lo obtenido hasta ahí.
+            Con checkpoint las URLs sin descargar quedan pendientes para la
+            siguiente corrida.
+        metrics_path (str): al terminar se escriben "<metrics_path>.json"
+            y "<metrics_path>.prom" con las métricas por medio y etapa de
+            la corrida (ver metrics.py). Por defecto CRAWL_METRICS_PATH;
+            sin ella (o con None) no se escribe nada.
+        profile_dir (str): perfilado opcional (PROFILE_DIR por defecto).
+            Guarda perfiles de CPU por etapa y por extractor de cada medio,
+            instantáneas de memoria y pico de RSS por fase (descubrimiento,
+            artículos, normalización) en una subcarpeta (ver profiling.py).
+        dedup (str): detección de casi duplicados (MinHash/LSH, ver
+            dedup.py) sobre el DataFrame final: "flag" agrega las columnas
+            dup_cluster e is_duplicate; "drop" además deja un artículo por
+            cluster (el publicado primero). Imprime los clusters con los
+            medios involucrados. Con sink no aplica: se corre después con
+            `python dedup.py <corpus>`. CRAWL_DEDUP por defecto.
 
     Returns:
         pd.DataFrame: dataframe consolidado con:
@@ -128,38 +368,333 @@ def get_all_news(limit=200, workers=5):
             - tags
             - medio
             - espectro_politico
+        Con sink retorna dict {medio: artículos escritos}.
+    """
+
+    start = time.monotonic()
+    deadline = start + float(run_deadline) if run_deadline else None
+
+    def outlet_deadline_for(config):
+        seconds = config.get("deadline", outlet_deadline)
+        return start + float(seconds) if seconds else None
+
+    if session is not None:
+        http_client.set_session(session)
+
+    if cache_dir is not None:
+        http_client.set_cache(HTTPCache(cache_dir))
+
+    if archive_dir is not None:
+        http_client.set_archive(HTMLArchive(archive_dir))
+
+    seen_store = SeenStore(seen_path) if seen_path else None
+
+    checkpoint = CrawlCheckpoint(checkpoint_path) if checkpoint_path else None
+    if checkpoint is not None and sink is None:
+        raise ValueError("checkpoint_path requiere un sink: los artículos deben quedar en disco")
+    if replay_failed and checkpoint is None:
+        raise ValueError("replay_failed requiere checkpoint_path")
+    if dedup and dedup not in ("flag", "drop"):
+        # Antes de descargar nada, no al final de la corrida.
+        raise ValueError(f"dedup debe ser 'flag' o 'drop', no {dedup!r}")
+    if replay_archive is not None and (replay_failed or pipeline):
+        raise ValueError("replay_archive no se combina con replay_failed ni con pipeline")
+
+    if checkpoint is not None:
+        # Artículos escritos justo antes de la interrupción que no
+        # alcanzaron a marcarse como hechos.
+        checkpoint.mark_written(getattr(sink, "resumed_urls", ()))
+
+    # En la re-extracción todas las respuestas salen del archivo; al
+    # terminar (también si la corrida falla) se restauran la sesión, la
+    # caché y el archivo anteriores.
+    replay = None
+    restore = None
+    if replay_archive is not None:
+        replay = HTMLArchive(replay_archive)
+        restore = (http_client.get_session(), http_client.get_cache(), http_client.get_archive())
+        http_client.set_session(ArchiveSession(replay))
+        http_client.set_cache(None)
+        http_client.set_archive(None)
+
+    try:
+        # Cada corrida empieza con el presupuesto de reintentos completo por medio
+        # y con la tasa y concurrencia iniciales de cada medio (sin límite de
+        # tasa al re-extraer: no hay red).
+        http_client.reset_retry_budgets()
+        if replay is not None:
+            rate_limit.reset()
+            limiters = {}
+        else:
+            limiters = configure_rate_limits()
+
+        collector = metrics.CrawlMetrics()
+        metrics.set_active(collector)
+        profiling.start(profile_dir, "scraping")
+
+        def article_parser(medio, config):
+            return METADATA_PARSERS[medio] if metadata_only else config["article"]
+
+        # 1) Descubrimiento de URLs: un trabajo por medio.
+        jobs = {}
+
+        def discovery_kwargs(config):
+            return {**config["args"], "seen_store": seen_store, "since": since, "until": until}
+
+        def job(medio, config, **source):
+            return {
+                **source,
+                "parse": article_parser(medio, config),
+                "headers": HEADERS,
+                "cap": limiters[medio].concurrency_limit if medio in limiters else config.get("concurrency", 1),
+                "deadline": outlet_deadline_for(config),
+            }
+
+        if replay_failed:
+            # Solo la cola de fallidas, sin descubrir nada.
+            for medio, config in SITEMAPS.items():
+                jobs[medio] = job(medio, config, urls=checkpoint.failed(medio))
+
+        elif replay is not None:
+            # Los artículos que se descargaron bien, según el archivo.
+            for medio, config in SITEMAPS.items():
+                jobs[medio] = job(medio, config, urls=replay.urls(medio, stage="fetch"))
+
+        elif pipeline:
+            # Cada medio entrega sus URLs al planificador a medida que las lee.
+            for medio, config in SITEMAPS.items():
+                discover = _pipeline_discover(config["urls"], discovery_kwargs(config), limit)
+                if checkpoint is not None:
+                    discover = _checkpointed_discover(checkpoint, medio, discover)
+                jobs[medio] = job(medio, config, discover=discover)
+
+        else:
+            # Con checkpoint, los medios ya descubiertos en una corrida
+            # interrumpida retoman sus URLs pendientes.
+            resumed = {
+                medio for medio in SITEMAPS
+                if checkpoint is not None and checkpoint.is_discovered(medio)
+            }
+
+            def discover(medio, config):
+                # El descubrimiento respeta el plazo del medio y el de la corrida.
+                with http_client.deadline(deadline), http_client.deadline(outlet_deadline_for(config)):
+                    with metrics.context(medio, "sitemap"), metrics.stage("discover", items=0):
+                        urls = run_with_retry(config["urls"], discovery_kwargs(config), limit)
+                metrics.add(medio, "discover", items=len(urls or []))
+                return urls
+
+            with profiling.phase("descubrimiento"), ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    medio: executor.submit(discover, medio, config)
+                    for medio, config in SITEMAPS.items()
+                    if medio not in resumed
+                }
+
+                for medio, config in SITEMAPS.items():
+                    if medio in resumed:
+                        urls = checkpoint.pending(medio)
+                    else:
+                        urls = futures[medio].result()
+                        if checkpoint is not None and urls is not None:
+                            checkpoint.add_urls(medio, urls)
+                            checkpoint.mark_discovered(medio)
+                            urls = checkpoint.pending(medio)
+                    jobs[medio] = job(medio, config, urls=urls or [])
+
+        # 2) Artículos: todas las URLs comparten el mismo presupuesto de hilos
+        #    (en modo pipeline, mientras el descubrimiento sigue corriendo).
+        if sink is not None:
+            with profiling.phase("articulos"):
+                counts, expired = _stream_to_sink(jobs, workers, sink, seen_store, metadata_only, checkpoint, deadline,
+                                                  replay_failed=replay_failed)
+            if checkpoint is not None and not replay_failed:
+                if expired:
+                    # La siguiente corrida con el mismo checkpoint los retoma.
+                    print(f"⏱️ Medios cortados por plazo ({', '.join(sorted(expired))}): se conserva su progreso en {checkpoint_path}")
+                else:
+                    checkpoint.finish()
+            _finish_run(collector, metrics_path, expired)
+            return counts
+
+        expired = set()
+        with profiling.phase("articulos"):
+            records = run_url_scheduler(
+                jobs,
+                workers=workers,
+                deadline=deadline,
+                on_skip=lambda medio, urls: expired.add(medio)
+            )
+
+        # 3) Normalización por medio.
+        final_dataframes = []
+
+        with profiling.phase("normalizacion"):
+            for medio, config in SITEMAPS.items():
+                if seen_store is not None and not metadata_only:
+                    seen_store.add_many([r["url"] for r in records[medio]], medio)
+
+                with metrics.stage("normalize", items=len(records[medio]), medio=medio):
+                    df = config["to_df"](records[medio])
+                metrics.article(medio, len(records[medio]))
+                if df is not None and not df.empty:
+                    df["medio"] = medio
+                    df["espectro_politico"] = config["espectro"]
+                    final_dataframes.append(df)
+                else:
+                    print(f"⚠️ {medio} no devolvió datos.")
+
+        _finish_run(collector, metrics_path, expired)
+
+        if not final_dataframes:
+            print("❌ No se obtuvo ningún dataframe.")
+            return pd.DataFrame()
+
+        df_final = pd.concat(final_dataframes, ignore_index=True)
+        if dedup:
+            df_final = deduplicate(df_final, action=dedup)
+        return df_final
+    finally:
+        _end_run(replay, restore)
+
+
+def _end_run(replay=None, restore=None):
+    """
+    Deshace el estado global de la corrida aunque get_all_news termine con
+    una excepción: desactiva el colector de métricas, detiene el perfilado
+    (y escribe sus perfiles), confirma el índice del archivo de HTML crudo
+    y, tras una re-extracción, restaura la sesión, la caché y el archivo
+    anteriores.
     """
+    metrics.set_active(None)
+    profiling.stop()
+    if replay is not None:
+        replay.close()
+        session, cache, archive = restore
+        http_client.set_session(session)
+        http_client.set_cache(cache)
+        http_client.set_archive(archive)
+    archive = http_client.get_archive()
+    if archive is not None:
+        archive.flush()
 
-    tasks = []
-    final_dataframes = []
 
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        for medio, config in SITEMAPS.items():
-            func = config["func"]
-            kwargs = config["args"]
-            espectro = config["espectro"]
+def _finish_run(collector, path, expired=()):
+    """
+    Cierra las métricas de la corrida (las escribe en JSON y Prometheus).
+    """
+    collector.finish()
+    collector.extra["rate_limits"] = rate_limit.stats()
+    collector.extra["expired"] = sorted(expired)
+    if not path:
+        return
+    try:
+        json_path, prom_path = collector.write(path)
+        summary = collector.summary()
+        print(f"📊 {summary['articles']} artículos en {summary['duration_s']}s "
+              f"({summary['articles_per_sec']}/s); métricas en {json_path} y {prom_path}")
+    except OSError as e:
+        print(f"Error escribiendo métricas en {path}: {e}")
+
+
+def _stream_to_sink(jobs, workers, sink, seen_store, metadata_only, checkpoint=None, deadline=None,
+                    replay_failed=False):
+    """
+    Variante de los pasos 2 y 3 de get_all_news que escribe cada artículo
+    en el sink apenas se parsea. La URL se marca como vista (y como hecha
+    en el checkpoint) después de escribirla, de modo que una corrida
+    interrumpida la vuelve a pedir. Los artículos fallidos van a la cola
+    de fallidas del checkpoint. Con replay_failed los recuperados solo
+    salen de la cola de fallidas (mark_recovered).
 
-            future = executor.submit(run_with_retry, func, kwargs, limit)
-            tasks.append((medio, espectro, future))
+    Retorna (artículos escritos por medio, medios cortados por plazo).
+    """
+    counts = {medio: 0 for medio in jobs}
+    expired = set()
+    lock = threading.Lock()
 
-        for medio, espectro, future in tasks:
-            df = future.result()
-            if df is not None and not df.empty:
-                df["medio"] = medio
-                df["espectro_politico"] = espectro
-                final_dataframes.append(df)
+    def on_record(medio, record):
+        record = {
+            **record,
+            "medio": medio,
+            "espectro_politico": SITEMAPS[medio]["espectro"],
+        }
+        with metrics.stage("normalize", medio=medio):
+            sink.write(record)
+        metrics.article(medio)
+        with lock:
+            counts[medio] += 1
+        if seen_store is not None and not metadata_only:
+            seen_store.add_many([record["url"]], medio)
+        if checkpoint is not None:
+            if replay_failed:
+                checkpoint.mark_recovered(record["url"])
             else:
-                print(f"⚠️ {medio} no devolvió datos.")
+                checkpoint.mark_done(record["url"], medio)
+
+    def on_error(medio, url, error):
+        if checkpoint is not None:
+            checkpoint.mark_failed(url, medio, error)
+
+    def on_skip(medio, urls):
+        with lock:
+            expired.add(medio)
 
-    if not final_dataframes:
-        print("❌ No se obtuvo ningún dataframe.")
-        return pd.DataFrame()
+    run_url_scheduler(
+        jobs,
+        workers=workers,
+        on_record=on_record,
+        on_error=on_error,
+        deadline=deadline,
+        on_skip=on_skip
+    )
 
-    df_final = pd.concat(final_dataframes, ignore_index=True)
-    return df_final
+    for medio, n in counts.items():
+        if not n:
+            print(f"⚠️ {medio} no devolvió datos.")
+    return counts, expired
+
+
+def append_to_csv(df, path="noticias_consolidadas.csv"):
+    """
+    Anexa un DataFrame delta (modo incremental) a un CSV consolidado.
+
+    Si el archivo ya existe se respeta el orden de sus columnas; si no
+    existe se crea con encabezado.
+
+    Args:
+        df (pd.DataFrame): artículos nuevos.
+        path (str): ruta del CSV consolidado.
+    """
+    if df.empty:
+        print("Sin artículos nuevos.")
+        return
+
+    if os.path.exists(path):
+        columns = pd.read_csv(path, nrows=0).columns
+        df = df.reindex(columns=columns)
+        df.to_csv(path, mode="a", header=False, index=False, encoding="utf-8")
+    else:
+        df.to_csv(path, index=False, encoding="utf-8")
+
+    print(f"{len(df)} artículos nuevos anexados a {path}")
 
 
 if __name__ == "__main__":
-    df = get_all_news(limit=300, workers=6)
-    df.to_csv("noticias_consolidadas.csv", index=False, encoding="utf-8")
-    print("Archivo generado: noticias_consolidadas.csv")
+    seen_path = os.getenv("SEEN_URLS_DB")
+    checkpoint_path = os.getenv("CHECKPOINT_DB")
+    # .csv, .jsonl o .parquet (ver record_sink).
+    output = os.getenv("CORPUS_PATH", "noticias_consolidadas.csv")
+
+    # En modo incremental se anexan solo los artículos nuevos; con
+    # checkpoint una corrida interrumpida continúa sobre el mismo .part.
+    with RecordSink(output, append=bool(seen_path), resume=bool(checkpoint_path)) as sink:
+        get_all_news(
+            limit=300,
+            workers=24,
+            seen_path=seen_path,
+            sink=sink,
+            checkpoint_path=checkpoint_path
+        )
+
+    print(f"{sink.count} artículos escritos en {output}")
@@ -0,0 +1,339 @@
+import os
+import re
+import sys
+import json
+import zlib
+import argparse
+import unicodedata
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from record_sink import read_corpus
+
+load_dotenv()
+
+'''
+Detección de artículos casi duplicados con MinHash y LSH.
+
+Las notas de agencia replicadas (o apenas editadas) aparecen en varios
+medios, y el sitemap de Pacifista trae páginas de spam casi idénticas;
+ambas inflan el corpus y sesgan el análisis por espectro_politico. Esta
+etapa corre sobre el DataFrame de get_all_news (o sobre el corpus escrito
+por el sink, con `python dedup.py corpus.parquet`):
+
+    1. El body se normaliza (minúsculas, sin tildes) y se parte en
+       shingles de DEDUP_SHINGLE palabras, cada uno con un hash de 32 bits.
+    2. Cada artículo recibe una firma MinHash de DEDUP_NUM_PERM
+       permutaciones: la fracción de posiciones iguales entre dos firmas
+       estima la similitud de Jaccard entre sus conjuntos de shingles.
+    3. LSH: la firma se corta en bandas; dos artículos son candidatos si
+       coinciden en alguna banda completa. Las bandas se eligen para que el
+       umbral efectivo quede por debajo de DEDUP_THRESHOLD (se prefiere no
+       perder duplicados) y cada candidato se confirma con la similitud
+       estimada de las firmas completas.
+    4. Los confirmados se unen en clusters (union-find). De cada cluster se
+       conserva el artículo publicado primero y el resto se marca (o se
+       elimina).
+
+Cada artículo se compara solo con el primero de cada cubeta en la que cae,
+así el costo es lineal en el número de artículos (no por pares) aunque una
+plantilla de spam llene una cubeta con miles de páginas.
+'''
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.7"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_SHINGLE = int(os.getenv("DEDUP_SHINGLE", "3"))
+DEDUP_SEED = int(os.getenv("DEDUP_SEED", "1"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_WORD = re.compile(r"\w+")
+_LATEST = pd.Timestamp.max.tz_localize("UTC")
+
+
+def shingles(text: str, k: int = DEDUP_SHINGLE):
+    """
+    Hashes (uint32) de los shingles de k palabras del texto normalizado.
+
+    Un texto con menos de k palabras es un único shingle.
+
+    Retorna:
+        np.ndarray sin repetidos (vacío si el texto no tiene palabras).
+    """
+    if not isinstance(text, str):
+        return np.empty(0, dtype=np.uint64)
+    # Sin tildes: NFKD separa la letra de su acento y el acento se descarta.
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode()
+    words = _WORD.findall(text)
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+
+    hashes = np.fromiter((zlib.crc32(w.encode()) for w in words), dtype=np.uint64, count=len(words))
+    k = min(k, len(hashes))
+    n = len(hashes) - k + 1
+    # Hash polinomial de cada ventana de k palabras.
+    combined = np.zeros(n, dtype=np.uint64)
+    for j in range(k):
+        combined = (combined * np.uint64(1000003) + hashes[j:j + n]) & _MAX_HASH
+    return np.unique(combined)
+
+
+class MinHasher:
+    """
+    Firmas MinHash con permutaciones (a * x + b) mod p.
+
+    Recibe:
+        num_perm (int): largo de la firma.
+        seed (int): semilla de las permutaciones (firmas comparables solo
+            con la misma semilla).
+    """
+
+    def __init__(self, num_perm: int = DEDUP_NUM_PERM, seed: int = DEDUP_SEED):
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self.a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)[:, None]
+        self.b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64)[:, None]
+
+    def signature(self, hashes: np.ndarray):
+        """
+        Firma de un conjunto de hashes de shingles (None si está vacío).
+        """
+        if len(hashes) == 0:
+            return None
+        # El desborde de uint64 es intencional (como en datasketch).
+        with np.errstate(over="ignore"):
+            permuted = ((self.a * hashes[None, :] + self.b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def lsh_params(threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM):
+    """
+    Bandas y filas por banda para el umbral.
+
+    El umbral efectivo de LSH es (1/b)^(1/r); se toman las bandas de más
+    filas cuyo umbral no supera `threshold`, para que los duplicados reales
+    casi siempre queden como candidatos. Las posiciones de la firma que no
+    completan una banda solo cuentan en la confirmación.
+
+    Retorna:
+        tuple[int, int]: (bandas, filas).
+    """
+    best = (num_perm, 1)
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        if (1 / bands) ** (1 / rows) <= threshold:
+            best = (bands, rows)
+    return best
+
+
+def _find(parent: list, i: int):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_duplicates(
+    df: pd.DataFrame,
+    threshold: float = DEDUP_THRESHOLD,
+    num_perm: int = DEDUP_NUM_PERM,
+    shingle: int = DEDUP_SHINGLE,
+    text_column: str = "body"
+    ):
+    """
+    Agrupa los artículos casi duplicados del DataFrame.
+
+    Recibe:
+        df (pd.DataFrame): artículos (al menos text_column; url, title,
+            medio y date_published se usan en el reporte y para elegir
+            qué artículo se conserva).
+        threshold (float): similitud de Jaccard mínima entre duplicados.
+        num_perm (int): largo de la firma MinHash.
+        shingle (int): palabras por shingle.
+        text_column (str): columna con el texto a comparar.
+
+    Retorna:
+        list[dict]: un dict por cluster (ver cluster_report), del más
+        grande al más pequeño.
+    """
+    hasher = MinHasher(num_perm)
+    bands, rows = lsh_params(threshold, num_perm)
+    texts = df[text_column].tolist()
+
+    signatures = [hasher.signature(shingles(text, shingle)) for text in texts]
+
+    parent = list(range(len(texts)))
+    similarity = {}
+    buckets = {}
+    for i, sig in enumerate(signatures):
+        if sig is None:
+            continue
+        for band in range(bands):
+            key = (band, sig[band * rows:(band + 1) * rows].tobytes())
+            first = buckets.setdefault(key, i)
+            if first == i or _find(parent, first) == _find(parent, i):
+                continue
+            # Solo contra el primero de la cubeta: costo lineal.
+            score = float(np.mean(signatures[first] == sig))
+            if score >= threshold:
+                similarity[i] = max(similarity.get(i, 0.0), score)
+                root_i, root_first = _find(parent, i), _find(parent, first)
+                if root_i != root_first:
+                    parent[max(root_i, root_first)] = min(root_i, root_first)
+
+    groups = {}
+    for i, sig in enumerate(signatures):
+        if sig is not None:
+            groups.setdefault(_find(parent, i), []).append(i)
+    groups = [members for members in groups.values() if len(members) > 1]
+
+    return cluster_report(df, groups, similarity)
+
+
+def cluster_report(df: pd.DataFrame, groups: list, similarity: dict = None):
+    """
+    Describe cada cluster y elige el artículo que se conserva: el de
+    date_published más antigua (o el primero, sin fecha).
+
+    Retorna:
+        list[dict]: {cluster, size, medios, cross_outlet, similarity,
+        keep, duplicates (posiciones), urls, title}.
+    """
+    similarity = similarity or {}
+    dates = (
+        pd.to_datetime(df["date_published"], errors="coerce", utc=True, format="mixed")
+        if "date_published" in df.columns else pd.Series([pd.NaT] * len(df))
+    )
+    medios = df["medio"].tolist() if "medio" in df.columns else [None] * len(df)
+    urls = df["url"].tolist() if "url" in df.columns else [None] * len(df)
+    titles = df["title"].tolist() if "title" in df.columns else [None] * len(df)
+
+    clusters = []
+    for members in groups:
+        members = sorted(set(members))
+        # Sin fecha cuenta como la más reciente.
+        keep = min(members, key=lambda i: (dates.iloc[i] if not pd.isna(dates.iloc[i]) else _LATEST, i))
+        outlets = sorted({m for m in (medios[i] for i in members) if m is not None})
+        clusters.append({
+            "size": len(members),
+            "medios": outlets,
+            "cross_outlet": len(outlets) > 1,
+            "similarity": round(min(similarity.get(i, 1.0) for i in members), 3),
+            "keep": keep,
+            "duplicates": [i for i in members if i != keep],
+            "urls": [urls[i] for i in members],
+            "title": titles[keep],
+        })
+
+    clusters.sort(key=lambda c: (-c["size"], c["keep"]))
+    for n, cluster in enumerate(clusters):
+        cluster["cluster"] = n
+    return clusters
+
+
+def deduplicate(
+    df: pd.DataFrame,
+    action: str = "flag",
+    threshold: float = DEDUP_THRESHOLD,
+    report_path: str = None,
+    **kwargs
+    ):
+    """
+    Etapa de deduplicación después de get_all_news.
+
+    Recibe:
+        df (pd.DataFrame): corpus consolidado.
+        action (str): "flag" agrega las columnas dup_cluster (número de
+            cluster o vacío) e is_duplicate; "drop" además elimina los
+            duplicados (se conserva uno por cluster).
+        threshold (float): similitud de Jaccard mínima.
+        report_path (str): si se pasa, guarda los clusters en JSON.
+        **kwargs: num_perm, shingle, text_column (ver find_duplicates).
+
+    Retorna:
+        pd.DataFrame
+    """
+    if action not in ("flag", "drop"):
+        raise ValueError(f"action debe ser 'flag' o 'drop', no {action!r}")
+    if df.empty:
+        return df
+
+    clusters = find_duplicates(df, threshold=threshold, **kwargs)
+    print_report(clusters, len(df))
+
+    cluster_of = pd.array([pd.NA] * len(df), dtype="Int64")
+    duplicate = np.zeros(len(df), dtype=bool)
+    for cluster in clusters:
+        cluster_of[[cluster["keep"], *cluster["duplicates"]]] = cluster["cluster"]
+        duplicate[cluster["duplicates"]] = True
+
+    df = df.copy()
+    df["dup_cluster"] = cluster_of
+    df["is_duplicate"] = duplicate
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(_jsonable(clusters), f, ensure_ascii=False, indent=2)
+
+    if action == "drop":
+        df = df[~df["is_duplicate"]].reset_index(drop=True)
+    return df
+
+
+def _jsonable(clusters: list):
+    # Las posiciones del DataFrame no sirven fuera de la corrida: se
+    # reportan las URLs.
+    return [
+        {k: v for k, v in cluster.items() if k not in ("keep", "duplicates")}
+        for cluster in clusters
+    ]
+
+
+def print_report(clusters: list, total: int = None, top: int = 10):
+    duplicates = sum(len(c["duplicates"]) for c in clusters)
+    cross = [c for c in clusters if c["cross_outlet"]]
+    of_total = f" de {total}" if total is not None else ""
+    print(f"🔁 {duplicates} duplicados{of_total} en {len(clusters)} clusters "
+          f"({len(cross)} entre medios)")
+
+    by_medio = {}
+    for cluster in clusters:
+        for medio in cluster["medios"]:
+            by_medio[medio] = by_medio.get(medio, 0) + 1
+    if by_medio:
+        print("   clusters por medio: " + ", ".join(f"{m}={n}" for m, n in sorted(by_medio.items())))
+
+    for cluster in clusters[:top]:
+        title = (cluster["title"] or "")[:70]
+        print(f"   #{cluster['cluster']}: {cluster['size']} artículos, sim≥{cluster['similarity']}, "
+              f"{', '.join(cluster['medios'])} — {title}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detecta artículos casi duplicados en el corpus")
+    parser.add_argument("corpus", help="archivo escrito por get_all_news (.csv, .jsonl o .parquet)")
+    parser.add_argument("--drop", action="store_true", help="eliminar duplicados (por defecto solo se marcan)")
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD)
+    parser.add_argument("--out", help="archivo de salida (por defecto <corpus>_dedup.<ext>)")
+    parser.add_argument("--report", help="guardar los clusters en este JSON")
+    args = parser.parse_args(argv)
+
+    df = read_corpus(args.corpus)
+    df = deduplicate(df, action="drop" if args.drop else "flag",
+                     threshold=args.threshold, report_path=args.report)
+
+    root, ext = os.path.splitext(args.corpus)
+    out = args.out or f"{root}_dedup{ext}"
+    if out.endswith(".parquet"):
+        df.to_parquet(out, index=False)
+    elif out.endswith((".jsonl", ".ndjson")):
+        df.to_json(out, orient="records", lines=True, force_ascii=False)
+    else:
+        df.to_csv(out, index=False, encoding="utf-8")
+    print(f"{len(df)} artículos escritos en {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,15 @@
-import requests
+import http_client
+from scheduler import run_outlet
 import pandas as pd
 
 import xml.etree.ElementTree as ET
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
 from datetime import datetime
-import json
+
+from sitemaps import parse_lastmod, to_datetime, in_window, get_sitemap_entries
 
 '''
 Construimos las funciones del Scrapping
@@ -24,7 +28,7 @@ def get_sitemap(url: str, headers: dict):
         o None si falla
     """
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
+        resp = http_client.get(url, headers=headers)
 
         if resp.status_code != 200:
             print(f"Error HTTP {resp.status_code} al acceder a {url}")
@@ -42,15 +46,17 @@ def get_sitemap(url: str, headers: dict):
         return None
 
 
-def get_urls_sitemap(soup: BeautifulSoup):
+def get_urls_sitemap(soup: BeautifulSoup, since=None, until=None):
     """
-    Obtiene todas las URLs <loc> dentro de un sitemap XML.
+    Obtiene todas las URLs <loc> dentro de un sitemap XML, con su <lastmod>.
 
     Recibe:
         soup (BeautifulSoup): Objeto XML parseado
+        since, until (datetime | str): ventana de lastmod (opcionales)
 
     Retorna:
-        list[str]: Lista de URLs encontradas, o None si falla.
+        list[tuple[str, datetime]]: Lista de pares (url, lastmod) encontrados,
+        o None si falla.
     """
 
     if soup is None:
@@ -58,7 +64,13 @@ def get_urls_sitemap(soup: BeautifulSoup):
         return None
 
     try:
-        urls = [loc.get_text(strip=True) for loc in soup.find_all("loc")]
+        since, until = to_datetime(since), to_datetime(until)
+        urls = []
+        for loc in soup.find_all("loc"):
+            lastmod_tag = loc.find_next_sibling("lastmod")
+            lastmod = parse_lastmod(lastmod_tag.get_text(strip=True)) if lastmod_tag else None
+            if in_window(lastmod, since, until):
+                urls.append((loc.get_text(strip=True), lastmod))
 
         # Evitar devolver listas vacías
         if not urls:
@@ -72,98 +84,82 @@ def get_urls_sitemap(soup: BeautifulSoup):
         return None
 
 
-def get_article_info(url: str, headers: dict):
+# Parser de artículos: la spec del medio en article_specs.py, la misma que
+# usa get_all_news (ver extractors.make_article_parser).
+get_article_info = make_article_parser(EXTRACTORS["ElNuevoSiglo"])
+
+
+'''
+Construimos la función main
+'''
+
+def get_news_urls_ElNuevoSiglo(
+    sitemap_urls: list,
+    headers: dict,
+    section_filter: str = "politica",
+    limit: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    on_url=None
+    ):
     """
-    Descarga un artículo de El Nuevo Siglo y extrae:
-    - título
-    - subtítulo (None si no existe)
-    - cuerpo (solo de div.field--name-field-free-text)
-    - fecha
-    - autor
-    - imagen
-    - sección (si aplica)
-    - tags (None si no existen)
+    Obtiene las URLs de artículos que procesa get_news_ElNuevoSiglo:
+    descubrimiento, filtros y límite (los más recientes primero).
     """
 
-    try:
-        resp = requests.get(url=url, headers=headers)
-        if resp.status_code != 200:
-            print(f"Error {resp.status_code} al acceder a {url}")
-            return None
+    # Filtrar URLs por sección (y en modo incremental, descartar las ya
+    # procesadas) mientras se leen los sitemaps en streaming
+    def es_de_seccion(u):
+        return (
+            section_filter.lower() in u.lower()
+            and (seen_store is None or u not in seen_store)
+        )
 
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        # ---------- TÍTULO ----------
-        title_tag = soup.find("h1")
-        title = title_tag.get_text(strip=True) if title_tag else None
-
-        # ---------- SUBTÍTULO ----------
-        subtitle_tag = None
-        article_main = soup.find("div", class_="field--name-field-free-text")
-        if article_main:
-            # Buscar solo h2 o h3 dentro del artículo
-            subtitle_tag = article_main.find(["h2","h3"])
-        subtitle = subtitle_tag.get_text(strip=True) if subtitle_tag else None
-
-        # ---------- CUERPO ----------
-        if article_main:
-            parrafos = article_main.find_all("p")
-            body = "\n\n".join([p.get_text(strip=True) for p in parrafos]) if parrafos else None
-        else:
-            body = None
-
-        # ---------- JSON-LD (fecha, autor, imagen) ----------
-        date_published = None
-        author = None
-        image = None
-        json_ld_tag = soup.find("script", type="application/ld+json")
-        if json_ld_tag:
-            try:
-                data = json.loads(json_ld_tag.string)
-                article_data = data["@graph"][0] if "@graph" in data else data
-                date_published = article_data.get("datePublished")
-                if "author" in article_data:
-                    author = article_data["author"].get("name")
-                if "image" in article_data:
-                    image = article_data["image"].get("url")
-            except:
-                pass
-
-        # ---------- TAGS ----------
-        tag_container = soup.find_all("a", rel="tag")
-        tags = [t.get_text(strip=True) for t in tag_container] if tag_container else None
-
-        # ---------- SECCIÓN ----------
-        section = "politica"  # como ya filtramos por política
-
-        return {
-            "url": url,
-            "title": title,
-            "subtitle": subtitle,
-            "body": body,
-            "date_published": date_published,
-            "author": author,
-            "image": image,
-            "section": section,
-            "tags": tags,
-        }
+    # Obtener las URLs de todos los sitemaps
+    entries = get_sitemap_entries(
+        sitemap_urls,
+        headers,
+        since=since,
+        until=until,
+        url_filter=es_de_seccion,
+        limit=limit,
+        on_url=on_url
+    )
 
-    except Exception as e:
-        print(f"Error procesando {url}: {e}")
-        return None
+    filtered_urls = [u for u, _ in entries]
 
-    
+    return filtered_urls
 
 
-'''
-Construimos la función main
-'''
+def to_dataframe_ElNuevoSiglo(data: list):
+    """
+    Convierte los registros de get_article_info en un DataFrame limpio.
+    """
+
+    # Crear DataFrame
+    df = pd.DataFrame(data)
+
+    # Preprocesamiento para CSV
+    if 'tags' in df.columns:
+        df['tags'] = df['tags'].apply(lambda x: ", ".join(x) if isinstance(x, list) else "")
+
+    if 'body' in df.columns:
+        df['body'] = df['body'].apply(lambda x: x.replace("\n", " ") if isinstance(x, str) else "")
+
+    return df
+
 
 def get_news_ElNuevoSiglo(
     sitemap_urls: list,
     headers: dict,
     section_filter: str = "politica",
-    limit: int = None
+    limit: int = None,
+    concurrency: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    pipeline: bool = False
     ):
     """
     Procesa noticias de El Nuevo Siglo desde una lista de sitemaps
@@ -180,6 +176,18 @@ def get_news_ElNuevoSiglo(
         Palabra clave para filtrar por sección (en la URL).
     limit : int
         Número máximo de artículos a procesar (opcional).
+    concurrency : int
+        Tope fijo de descargas simultáneas de artículos; por defecto el
+        control de tráfico del medio (outlet_traffic.py, scheduler.run_outlet).
+    seen_store : SeenStore
+        Registro de URLs ya procesadas (modo incremental, opcional).
+    since, until : datetime | str
+        Ventana de <lastmod> de los sitemaps (opcional). Las URLs se
+        ordenan de la más reciente a la más antigua antes de aplicar limit.
+    pipeline : bool
+        Solapar descubrimiento y descarga: los artículos empiezan a bajarse
+        apenas aparecen en el sitemap (orden del documento en lugar de
+        más recientes primero).
 
     Retorna
     -------
@@ -189,39 +197,38 @@ def get_news_ElNuevoSiglo(
         Listas convertidas a strings y saltos de línea reemplazados.
     """
 
-    all_article_urls = []
-
-    # Obtener todas las URLs de los sitemaps
-    for sm_url in sitemap_urls:
-        soup = get_sitemap(sm_url, headers)
-        if soup:
-            urls = get_urls_sitemap(soup)
-            if urls:
-                all_article_urls.extend(urls)
-
-    # Filtrar URLs por sección
-    filtered_urls = [
-        u for u in all_article_urls 
-        if section_filter.lower() in u.lower()
-    ]
-
-    if limit:
-        filtered_urls = filtered_urls[:limit]
-
-    data = []
-    for url in filtered_urls:
-        info = get_article_info(url, headers)
-        if info:
-            data.append(info)
-
-    # Crear DataFrame
-    df = pd.DataFrame(data)
-
-    # Preprocesamiento para CSV
-    if 'tags' in df.columns:
-        df['tags'] = df['tags'].apply(lambda x: ", ".join(x) if isinstance(x, list) else "")
-
-    if 'body' in df.columns:
-        df['body'] = df['body'].apply(lambda x: x.replace("\n", " ") if isinstance(x, str) else "")
-
-    return df
+    if pipeline:
+        # Descubrimiento y descarga de artículos solapados (cola acotada)
+        data = run_outlet(
+            "ElNuevoSiglo",
+            get_article_info,
+            headers,
+            discover=lambda on_url: get_news_urls_ElNuevoSiglo(
+                sitemap_urls,
+                headers,
+                section_filter=section_filter,
+                limit=limit,
+                seen_store=seen_store,
+                since=since,
+                until=until,
+                on_url=on_url
+            ),
+            concurrency=concurrency
+        )
+    else:
+        filtered_urls = get_news_urls_ElNuevoSiglo(
+            sitemap_urls,
+            headers,
+            section_filter=section_filter,
+            limit=limit,
+            seen_store=seen_store,
+            since=since,
+            until=until
+        )
+
+        data = run_outlet("ElNuevoSiglo", get_article_info, headers, urls=filtered_urls, concurrency=concurrency)
+
+    if seen_store is not None:
+        seen_store.add_many([r["url"] for r in data], "ElNuevoSiglo")
+
+    return to_dataframe_ElNuevoSiglo(data)
@@ -1,184 +1,159 @@
-import requests
+from scheduler import run_outlet
 import pandas as pd
-from bs4 import BeautifulSoup
-import xml.etree.ElementTree as ET
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
 
-import os
 from dotenv import load_dotenv
 
-load_dotenv()
+from sitemaps import get_sitemap_entries
 
-namespace = os.getenv('URL_ElPACIFISTA')
+load_dotenv()
 
 
-def get_urls_Pacifista(sitemap_url: str, headers: dict):
+def get_urls_Pacifista(
+    sitemap_url: str,
+    headers: dict,
+    since=None,
+    until=None,
+    url_filter=None,
+    limit: int = None,
+    on_url=None
+    ):
     """
     Descarga y parsea el sitemap de Pacifista.tv y retorna todas las URLs
     correspondientes a artículos válidos.
 
-    1. Descarga el XML del sitemap.
-    2. Extrae los <loc>.
-    3. Filtra:
+    1. Lee el XML del sitemap en streaming.
+    2. Extrae los <loc> con su <lastmod> (ventana since/until opcional).
+    3. Filtra, a medida que lee:
         - imágenes
         - archivos estáticos
         - elementos que no sean artículos
+        - lo que descarte url_filter (opcional)
+    4. Conserva como máximo `limit` URLs (las más recientes).
+
+    Con on_url (modo pipeline) cada URL se entrega apenas se lee.
 
     Retorna:
-        list[str]: lista de URLs limpias.
+        list[tuple[str, datetime]]: pares (url, lastmod) limpios, del más
+        reciente al más antiguo.
     """
-    resp = requests.get(sitemap_url, headers=headers)
-
-    if resp.status_code != 200:
-        print(f"Error HTTP {resp.status_code} al acceder a {sitemap_url}")
-        return []
-
-    try:
-        root = ET.fromstring(resp.content)
-    except Exception as e:
-        print("Error parseando XML:", e)
-        return []
-
-#    namespace = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
-
-    urls = [
-    url_tag.find(f"{namespace}loc").text
-    for url_tag in root.findall(f"{namespace}url")
-]
 
-    clean_urls = []
-    for u in urls:
+    def es_articulo(u):
         u_l = u.lower()
 
         # Filtrar imágenes o assets
         if "/wp-content/" in u_l:
-            continue
+            return False
         if u_l.endswith((".jpg", ".png", ".jpeg", ".gif", ".webp")):
-            continue
+            return False
 
         # Evitar spam en cirílico (patrones comunes %d0%, %d1%, %d2%)
         if "%d0%" in u_l or "%d1%" in u_l or "%d2%" in u_l:
-            continue
+            return False
 
         # Evitar palabras rusas
         if ("став" in u_l or "спорт" in u_l or "казин" in u_l 
             or "букм" in u_l or "онлайн" in u_l):
-            continue
+            return False
 
         # Evitar caracteres NO ASCII (cirílico real)
         try:
             u.encode("ascii")
         except UnicodeEncodeError:
-            continue
+            return False
 
         # Filtrar para que solo queden secciones reales del medio
         if not any(
             x in u_l for x in 
             ["actualidad", "memoria", "violencias", "derechos", "post", "podcast", "blog"]
         ):
-            continue
-
-        clean_urls.append(u)
+            return False
+
+        return url_filter is None or url_filter(u)
+
+    clean_urls = get_sitemap_entries(
+        sitemap_url,
+        headers,
+        since=since,
+        until=until,
+        url_filter=es_articulo,
+        limit=limit,
+        on_url=on_url
+    )
 
     return clean_urls
 
 
-def get_article_info_Pacifista(url: str, headers: dict):
+# Parser de artículos: la spec del medio en article_specs.py, la misma que
+# usa get_all_news (ver extractors.make_article_parser).
+get_article_info_Pacifista = make_article_parser(EXTRACTORS["Pacifista"])
+
+
+def get_news_urls_Pacifista(
+    sitemap_url: str,
+    headers: dict,
+    limit: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    on_url=None
+    ):
     """
-    Descarga y parsea una noticia de Pacifista.tv.
-
-    Extrae:
-        - title
-        - subtitle (si existe)
-        - date_published
-        - body (texto completo)
-        - author
-        - tags
-        - sección (Pacifista no tiene secciones, se retorna 'general')
-
-    La estructura del HTML de Pacifista no es estable, por lo que se incluyen
-    múltiples estrategias de fallback para cada elemento.
+    Obtiene las URLs de artículos que procesa get_news_Pacifista:
+    descubrimiento, filtros y límite (los más recientes primero).
     """
-    resp = requests.get(url, headers=headers)
-
-    if resp.status_code != 200:
-        print(f"Error HTTP {resp.status_code} al acceder a {url}")
-        return None
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    
-    # TÍTULO
-    title_tag = soup.find("h1")
-    if not title_tag:
-        title_tag = soup.find("title")
-    title = title_tag.get_text(strip=True) if title_tag else None
-
-    # SUBTÍTULO
-    subtitle_tag = (
-        soup.find("h2", class_="subtitle")
-        or soup.find("div", class_="subtitle")
-        or soup.find("p", class_="subtitle")
+
+    # Modo incremental: descartar URLs ya procesadas mientras se lee el sitemap
+    def es_nueva(u):
+        return seen_store is None or u not in seen_store
+
+    entries = get_urls_Pacifista(
+        sitemap_url,
+        headers,
+        since=since,
+        until=until,
+        url_filter=es_nueva,
+        limit=limit,
+        on_url=on_url
     )
 
-    if subtitle_tag:
-        subtitle = subtitle_tag.get_text(strip=True)
-    else:
-        meta_desc = soup.find("meta", attrs={"name": "description"})
-        subtitle = meta_desc["content"].strip() if meta_desc else None
+    urls = [u for u, _ in entries]
 
-    # FECHA
-    meta_date = soup.find("meta", attrs={"property": "article:published_time"})
-    if meta_date and meta_date.get("content"):
-        date_published = meta_date["content"]
-    else:
-        time_tag = soup.find("time")
-        date_published = time_tag.get_text(strip=True) if time_tag else None
+    return urls
 
-    # AUTOR
-    meta_author = soup.find("meta", attrs={"name": "author"})
-    if meta_author and meta_author.get("content"):
-        author = meta_author["content"].strip()
-    else:
-        a_author = soup.find("a", rel="author")
-        author = a_author.get_text(strip=True) if a_author else None
-
-    # CUERPO
-    container = (
-        soup.find("div", class_="entry-content")
-        or soup.find("div", class_="post-content")
-        or soup.find("article")
-    )
 
-    if container:
-        parrafos = [
-            p.get_text(" ", strip=True)
-            for p in container.find_all("p")
-            if p.get_text(strip=True)
-        ]
-        body = "\n".join(parrafos) if parrafos else None
-    else:
-        body = None
+def to_dataframe_Pacifista(data: list):
+    """
+    Convierte los registros de get_article_info_Pacifista en un DataFrame limpio.
+    """
 
-    # TAGS
-    tag_elements = soup.find_all("a", rel="tag")
-    tags = [t.get_text(strip=True) for t in tag_elements] if tag_elements else None
+    df = pd.DataFrame(data)
 
-    # Sección fija
-    section = "general"
+    # Normalización de columnas
+    if "tags" in df.columns:
+        df["tags"] = df["tags"].apply(
+            lambda x: ", ".join(x) if isinstance(x, list) else ""
+        )
 
-    return {
-        "url": url,
-        "title": title,
-        "subtitle": subtitle,
-        "date_published": date_published,
-        "body": body,
-        "author": author,
-        "section": section,
-        "tags": tags,
-    }
+    if "body" in df.columns:
+        df["body"] = df["body"].apply(
+            lambda x: x.replace("\n", " ") if isinstance(x, str) else ""
+        )
+
+    return df
 
 
-def get_news_Pacifista(sitemap_url: str, headers: dict, limit: int = None):
+def get_news_Pacifista(
+    sitemap_url: str,
+    headers: dict,
+    limit: int = None,
+    concurrency: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    pipeline: bool = False
+    ):
     """
     Procesa el sitemap de Pacifista.tv y retorna un DataFrame con varias noticias.
 
@@ -193,29 +168,36 @@ def get_news_Pacifista(sitemap_url: str, headers: dict, limit: int = None):
         pandas.DataFrame
     """
 
-    urls = get_urls_Pacifista(sitemap_url, headers)
-
-    if limit:
-        urls = urls[:limit]
-
-    data = []
-
-    for url in urls:
-        info = get_article_info_Pacifista(url, headers)
-        if info:
-            data.append(info)
-
-    df = pd.DataFrame(data)
-
-    # Normalización de columnas
-    if "tags" in df.columns:
-        df["tags"] = df["tags"].apply(
-            lambda x: ", ".join(x) if isinstance(x, list) else ""
+    if pipeline:
+        # Descubrimiento y descarga de artículos solapados (cola acotada)
+        data = run_outlet(
+            "Pacifista",
+            get_article_info_Pacifista,
+            headers,
+            discover=lambda on_url: get_news_urls_Pacifista(
+                sitemap_url,
+                headers,
+                limit=limit,
+                seen_store=seen_store,
+                since=since,
+                until=until,
+                on_url=on_url
+            ),
+            concurrency=concurrency
         )
-
-    if "body" in df.columns:
-        df["body"] = df["body"].apply(
-            lambda x: x.replace("\n", " ") if isinstance(x, str) else ""
+    else:
+        urls = get_news_urls_Pacifista(
+            sitemap_url,
+            headers,
+            limit=limit,
+            seen_store=seen_store,
+            since=since,
+            until=until
         )
 
-    return df
+        data = run_outlet("Pacifista", get_article_info_Pacifista, headers, urls=urls, concurrency=concurrency)
+
+    if seen_store is not None:
+        seen_store.add_many([r["url"] for r in data], "Pacifista")
+
+    return to_dataframe_Pacifista(data)
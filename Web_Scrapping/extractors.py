@@ -0,0 +1,452 @@
+import os
+import re
+import json
+import time
+
+import http_client
+import metrics
+from parsing import make_soup
+from dotenv import load_dotenv
+
+load_dotenv()
+
+'''
+Motor declarativo de extracción de artículos.
+
+Cada medio se describe con una "spec": un dict {campo: reglas} en el orden
+de las columnas del registro. Las reglas de un campo son selectores CSS
+simples que se prueban en orden hasta obtener un valor no vacío:
+
+    "title": ["h1.title", "h1", "title"]
+
+Sintaxis de un selector:
+    "tag.clase[attr=valor][attr]"   elemento (todas las partes opcionales)
+    "contenedor interno"            primer `interno` dentro del contenedor
+    "...@attr"                      lee el atributo en lugar del texto
+    "jsonld:ruta.al.campo"          campo del primer <script ld+json>
+
+Un campo también puede ser un valor fijo (str o None) o un dict con
+opciones:
+    css (list):        selectores, como arriba.
+    sep (str):         separador de get_text (por defecto "").
+    many (bool):       lista con el texto de todos los elementos.
+    join (str):        une el texto de todos los elementos (p. ej. los
+                       párrafos del cuerpo) con este separador.
+    keep_empty (bool): con join, conserva los elementos sin texto (p. ej.
+                       los párrafos vacíos de publicidad de La FM).
+    exclude_href (str): con many, descarta enlaces cuyo href termina así.
+    as_list (bool):    envuelve el valor en una lista.
+
+compile_spec() traduce los selectores una sola vez (al importar datos.py).
+En cada artículo solo se construyen los subárboles que la spec consulta
+(parsing.make_soup) y se ubican todos los selectores en un único recorrido
+del árbol; después cada campo lee solo dentro de su elemento.
+
+Modo metadata_only (make_article_parser): para indexar rápido sin el
+cuerpo. Se descarga el artículo en streaming solo hasta </head>, se corta
+la conexión y se leen título, descripción, fecha, autor, imagen y tags de
+JSON-LD y <meta> (HEAD_SPEC). Solo si la cabecera no trae alguno de los
+campos que la spec del medio sabe leer se termina la descarga y se parsea
+el documento con la spec completa. Con la caché HTTP activa el corte se
+mantiene: la caché solo guarda la página si se leyó entera (HTTPCache.tee).
+'''
+
+HEAD_CHUNK_SIZE = int(os.getenv("HEAD_CHUNK_SIZE", str(16 * 1024)))
+
+JSONLD_ARTICLE_TYPES = ("Article", "NewsArticle", "ReportageNewsArticle", "BlogPosting")
+
+# Reglas de la cabecera del documento, comunes a todos los medios (metadatos
+# estándar de Open Graph, JSON-LD y <meta>). Las usa el modo metadata_only.
+HEAD_SPEC = {
+    "title": [
+        "jsonld:headline",
+        "meta[property=og:title]@content",
+        "title",
+    ],
+    "subtitle": [
+        "jsonld:description",
+        "meta[property=og:description]@content",
+        "meta[name=description]@content",
+    ],
+    "date_published": [
+        "jsonld:datePublished",
+        "meta[property=article:published_time]@content",
+    ],
+    "author": [
+        "jsonld:author.name",
+        "meta[name=author]@content",
+    ],
+    "image": [
+        "jsonld:image.url",
+        "meta[property=og:image]@content",
+    ],
+    "tags": {"css": ["meta[property=article:tag]@content"], "many": True},
+}
+
+_HEAD_END = re.compile(rb"</head\s*>|<body[\s>]", re.IGNORECASE)
+_COMPOUND = re.compile(r"^([\w-]+)?((?:\.[\w-]+)*)((?:\[[^\]]+\])*)$")
+_ATTRIBUTE = re.compile(r"\[([\w:-]+)(?:=[\"']?([^\]\"']*)[\"']?)?\]")
+_JSONLD = ("script", (), (("type", "application/ld+json"),))
+
+
+def _compile_compound(text: str):
+    m = _COMPOUND.match(text)
+    if not m or not text:
+        raise ValueError(f"Selector no soportado: {text!r}")
+    name, classes, attrs = m.groups()
+    classes = tuple(c for c in classes.split(".") if c)
+    # findall devuelve "" como valor cuando el atributo va sin "=valor"
+    attrs = tuple((k, v or True) for k, v in _ATTRIBUTE.findall(attrs))
+    return (name, classes, attrs)
+
+
+def _matches(tag, compound):
+    name, classes, attrs = compound
+    if name is not None and tag.name != name:
+        return False
+    if classes:
+        tag_classes = tag.get("class") or []
+        if not all(c in tag_classes for c in classes):
+            return False
+    for attr, expected in attrs:
+        value = tag.get(attr)
+        if value is None:
+            return False
+        if expected is True:
+            continue
+        if isinstance(value, list):
+            if expected not in value:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def compile_selector(text: str):
+    """
+    Traduce un selector de la spec a un dict con su elemento base.
+
+    Retorna:
+        dict con "base" (tag, clases, atributos), "inner" (o None),
+        "attr" (o None) y "jsonld" (ruta o None).
+    """
+    if text.startswith("jsonld:"):
+        return {"base": _JSONLD, "inner": None, "attr": None,
+                "jsonld": text[len("jsonld:"):].split(".")}
+
+    attr = None
+    if "@" in text:
+        text, attr = text.rsplit("@", 1)
+
+    parts = text.split()
+    if len(parts) > 2:
+        raise ValueError(f"Selector no soportado: {text!r}")
+
+    return {
+        "base": _compile_compound(parts[0]),
+        "inner": _compile_compound(parts[1]) if len(parts) == 2 else None,
+        "attr": attr,
+        "jsonld": None,
+    }
+
+
+def compile_spec(spec: dict):
+    """
+    Compila la spec de un medio.
+
+    Recibe:
+        spec (dict): {campo: reglas}, ver la descripción del módulo.
+
+    Retorna:
+        dict con:
+            fields: lista de (campo, valor fijo u opciones compiladas).
+            bases: elementos que se ubican en el recorrido del árbol
+                (indexados por etiqueta en by_name / any_name).
+            collect: bases de las que se necesitan todos los elementos.
+            parts: reglas para parsing.make_soup (solo esos subárboles).
+    """
+    bases = []
+    fields = []
+
+    for field, rules in spec.items():
+        if rules is None or isinstance(rules, str):
+            fields.append((field, {"const": rules}))
+            continue
+
+        options = dict(rules) if isinstance(rules, dict) else {"css": rules}
+        selectors = []
+        for text in options.pop("css"):
+            sel = compile_selector(text)
+            if sel["base"] not in bases:
+                bases.append(sel["base"])
+            sel["slot"] = bases.index(sel["base"])
+            selectors.append(sel)
+        options["selectors"] = selectors
+        fields.append((field, options))
+
+    parts = []
+    by_name = {}
+    any_name = []
+    for slot, (name, classes, attrs) in enumerate(bases):
+        wanted = dict(attrs)
+        if classes:
+            wanted["class"] = list(classes)
+        parts.append((name, wanted))
+        if name is None:
+            any_name.append((slot, bases[slot]))
+        else:
+            by_name.setdefault(name, []).append((slot, bases[slot]))
+
+    # Bases de las que se leen todos los elementos (many/join sin contenedor).
+    collect = {
+        sel["slot"]
+        for _, options in fields if "selectors" in options
+        for sel in options["selectors"]
+        if sel["inner"] is None and (options.get("many") or "join" in options)
+    }
+
+    return {
+        "fields": fields,
+        "bases": bases,
+        "parts": parts,
+        "by_name": by_name,
+        "any_name": any_name,
+        "collect": collect,
+    }
+
+
+def _locate(soup, compiled: dict):
+    # Único recorrido del árbol: cada elemento se compara solo con las bases
+    # de su etiqueta (más las que no fijan etiqueta). De las bases que no
+    # leen todos sus elementos basta con el primero.
+    found = [[] for _ in compiled["bases"]]
+    by_name, any_name, collect = compiled["by_name"], compiled["any_name"], compiled["collect"]
+    pending = len(found)
+
+    for tag in soup.descendants:
+        if tag.name is None:
+            # Texto, comentarios, etc.
+            continue
+        for candidates in (by_name.get(tag.name, ()), any_name):
+            for slot, base in candidates:
+                if found[slot] and slot not in collect:
+                    continue
+                if _matches(tag, base):
+                    if not found[slot]:
+                        pending -= 1
+                    found[slot].append(tag)
+        if not pending and not collect:
+            break
+
+    return found
+
+
+def _is_article(node):
+    types = node.get("@type") if isinstance(node, dict) else None
+    types = [types] if isinstance(types, str) else types or []
+    return any(t in JSONLD_ARTICLE_TYPES for t in types)
+
+
+def _jsonld(element, path: list, cache: dict):
+    if "data" not in cache:
+        try:
+            data = json.loads(element.string or "")
+            if "@graph" in data:
+                # Yoast y similares: se prefiere el nodo del artículo.
+                graph = data["@graph"]
+                data = next((n for n in graph if _is_article(n)), graph[0])
+            cache["data"] = data
+        except (ValueError, TypeError, KeyError, IndexError, AttributeError):
+            cache["data"] = None
+
+    value = cache["data"]
+    for key in path:
+        if isinstance(value, list):
+            value = value[0] if value else None
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _read(element, sel: dict, sep: str):
+    if sel["attr"]:
+        value = element.get(sel["attr"])
+        return value.strip() if isinstance(value, str) else value
+    return element.get_text(sep, strip=True)
+
+
+def _elements(sel: dict, found: list, collect: bool):
+    matches = found[sel["slot"]]
+    if sel["inner"] is None:
+        return matches if collect else matches[:1]
+    if not matches:
+        return []
+
+    # Recorrido directo del contenedor: más barato que find_all con filtro.
+    inner = sel["inner"]
+    elements = []
+    for tag in matches[0].descendants:
+        if tag.name is not None and _matches(tag, inner):
+            elements.append(tag)
+            if not collect:
+                break
+    return elements
+
+
+def _value(options: dict, found: list, jsonld_cache: dict):
+    sep = options.get("sep", "")
+    collect = options.get("many") or "join" in options
+    exclude = options.get("exclude_href")
+
+    for sel in options["selectors"]:
+        elements = _elements(sel, found, collect)
+        if not elements:
+            continue
+
+        if sel["jsonld"] is not None:
+            value = _jsonld(elements[0], sel["jsonld"], jsonld_cache)
+        elif collect:
+            if exclude:
+                elements = [e for e in elements if not e.get("href", "").endswith(exclude)]
+            value = [_read(e, sel, sep) for e in elements]
+            value = [v or "" for v in value] if options.get("keep_empty") else [v for v in value if v]
+            if "join" in options:
+                value = options["join"].join(value)
+        else:
+            value = _read(elements[0], sel, sep)
+
+        if value:
+            return [value] if options.get("as_list") else value
+
+    return None
+
+
+def extract(soup, compiled: dict):
+    """
+    Extrae todos los campos de un artículo ya parseado.
+
+    Recibe:
+        soup (BeautifulSoup): documento (idealmente parseado con
+            only=compiled["parts"]).
+        compiled (dict): resultado de compile_spec.
+
+    Retorna:
+        dict {campo: valor} en el orden de la spec.
+    """
+    found = _locate(soup, compiled)
+    jsonld_cache = {}
+    record = {}
+    for field, options in compiled["fields"]:
+        if "const" in options:
+            record[field] = options["const"]
+        else:
+            record[field] = _value(options, found, jsonld_cache)
+    return record
+
+
+def extract_timed(soup, compiled: dict, timings: dict):
+    """
+    Igual que extract(), acumulando en `timings` los segundos de cada campo
+    (y de "_locate", el recorrido del árbol). Lo usa benchmark_extractors.
+    """
+    start = time.perf_counter()
+    found = _locate(soup, compiled)
+    now = time.perf_counter()
+    timings["_locate"] = timings.get("_locate", 0.0) + now - start
+
+    jsonld_cache = {}
+    record = {}
+    for field, options in compiled["fields"]:
+        start = now
+        if "const" in options:
+            record[field] = options["const"]
+        else:
+            record[field] = _value(options, found, jsonld_cache)
+        now = time.perf_counter()
+        timings[field] = timings.get(field, 0.0) + now - start
+    return record
+
+
+def _read_head(chunks):
+    # Lee hasta el cierre de <head> (o el inicio de <body>).
+    buf = b""
+    for chunk in chunks:
+        start = max(0, len(buf) - 16)
+        buf += chunk
+        m = _HEAD_END.search(buf, start)
+        if m:
+            return buf, buf[:m.start()]
+    return buf, buf
+
+
+def make_article_parser(spec: dict, metadata_only: bool = False):
+    """
+    Construye el parser de artículos de un medio a partir de su spec.
+
+    Recibe:
+        spec (dict): {campo: reglas}.
+        metadata_only (bool): leer solo la cabecera del documento (sin
+            cuerpo, body=None); ver la descripción del módulo.
+
+    Retorna:
+        callable(url, headers) -> dict | None, con la misma firma que los
+        get_article_info_* (se puede usar como "article" en SITEMAPS).
+    """
+    compiled = compile_spec(spec)
+
+    def parse_article(url: str, headers: dict = None):
+        resp = http_client.get(url, headers=headers)
+        if resp.status_code != 200:
+            print(f"Error HTTP {resp.status_code} al acceder a {url}")
+            return None
+
+        with metrics.stage("parse"):
+            soup = make_soup(resp.text, only=compiled["parts"])
+            return {"url": url, **extract(soup, compiled)}
+
+    if not metadata_only:
+        parse_article.compiled = compiled
+        return parse_article
+
+    # Campos de la spec que se pueden sacar de la cabecera y campos que,
+    # si faltan en ella, obligan a leer el documento completo.
+    readable = [
+        field for field, options in compiled["fields"]
+        if field != "body" and "selectors" in options
+    ]
+    head = compile_spec({f: HEAD_SPEC[f] for f in readable if f in HEAD_SPEC})
+
+    def parse_metadata(url: str, headers: dict = None):
+        resp = http_client.get(url, headers=headers, stream=True)
+        try:
+            if resp.status_code != 200:
+                print(f"Error HTTP {resp.status_code} al acceder a {url}")
+                return None
+
+            encoding = resp.encoding or "utf-8"
+            chunks = resp.iter_content(chunk_size=HEAD_CHUNK_SIZE)
+            buf, head_html = _read_head(chunks)
+
+            with metrics.stage("parse"):
+                values = extract(make_soup(head_html.decode(encoding, "replace"), only=head["parts"]), head)
+            missing = [f for f in readable if not values.get(f)]
+            if missing:
+                rest = b"".join(chunks)
+                with metrics.stage("parse", items=0):
+                    html = (buf + rest).decode(encoding, "replace")
+                    full = extract(make_soup(html, only=compiled["parts"]), compiled)
+                values.update({f: full[f] for f in missing})
+        finally:
+            resp.close()
+
+        record = {"url": url}
+        for field, options in compiled["fields"]:
+            if "const" in options:
+                record[field] = options["const"]
+            else:
+                record[field] = values.get(field)
+        return record
+
+    parse_metadata.compiled = compiled
+    return parse_metadata
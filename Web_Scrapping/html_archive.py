@@ -0,0 +1,552 @@
+import os
+import sys
+import zlib
+import gzip
+import uuid
+import sqlite3
+import hashlib
+import argparse
+import threading
+import requests
+from datetime import datetime, timezone
+from requests.structures import CaseInsensitiveDict
+from dotenv import load_dotenv
+
+from canonical_urls import url_key
+
+load_dotenv()
+
+'''
+Archivo comprimido del HTML crudo de cada página descargada.
+
+Cuando se corrige un extractor, el dataset se reconstruye desde este
+archivo en lugar de volver a rastrear los medios: get_all_news(
+replay_archive=...) vuelve a parsear los artículos archivados sin salir a
+la red (ver ArchiveSession).
+
+Formato al estilo WARC: segmentos de solo anexar
+<directorio>/segment-00000.warc.gz, ... Cada registro es un miembro gzip
+independiente (un "response" WARC/1.1 con la URL, la fecha de descarga, el
+código, los headers y el cuerpo), así que se puede leer uno solo
+descomprimiendo desde su offset, y los segmentos se leen con cualquier
+herramienta de WARC o con zcat. Al llegar a ARCHIVE_SEGMENT_MB se abre el
+siguiente segmento.
+
+    <directorio>/segment-NNNNN.warc.gz   registros
+    <directorio>/index.sqlite            url -> (segmento, offset, largo)
+
+El índice guarda además el medio y la etapa (metrics.context: "sitemap"
+para el descubrimiento, "fetch" para los artículos) y el digest SHA-1 del
+cuerpo. Si una URL ya está archivada con el mismo código y el mismo
+cuerpo, no se vuelve a escribir. La búsqueda por URL usa
+canonical_urls.url_key (con query) y retorna la descarga más reciente.
+
+Los cuerpos se guardan ya decodificados (sin Content-Encoding). Solo se
+archivan las respuestas leídas completas: los sitemaps y las cabeceras del
+modo metadata_only se leen en streaming y no entran.
+
+El índice se confirma cada ARCHIVE_COMMIT_EVERY registros y al cerrar; si
+el proceso muere antes, al abrir el archivo se indexan los registros del
+final del último segmento (y se descarta un registro escrito a medias).
+rebuild_index() reconstruye el índice completo desde los segmentos.
+'''
+
+SEGMENT_MB = int(os.getenv("ARCHIVE_SEGMENT_MB", "256"))
+COMMIT_EVERY = int(os.getenv("ARCHIVE_COMMIT_EVERY", "100"))
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".warc.gz"
+
+# El cuerpo se guarda decodificado y con su propio largo.
+_DROP_HEADERS = {"content-encoding", "transfer-encoding", "content-length"}
+
+_WARC_DATE = "%Y-%m-%dT%H:%M:%S.%fZ"
+_SCAN_CHUNK = 1024 * 1024
+
+
+def _warc_date(timestamp: float):
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime(_WARC_DATE)
+
+
+def _parse_date(value: str):
+    return datetime.strptime(value, _WARC_DATE).replace(tzinfo=timezone.utc).timestamp()
+
+
+def _parse_headers(block: bytes):
+    # "Nombre: valor" por línea (la primera línea ya se quitó).
+    headers = CaseInsensitiveDict()
+    for line in block.decode("utf-8", "replace").split("\r\n"):
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip()] = value.strip()
+    return headers
+
+
+def _encode_record(url: str, status: int, reason: str, headers: dict, content: bytes,
+                   fetched_at: float, medio: str = None, stage: str = None):
+    # Registro WARC "response" comprimido como un miembro gzip propio.
+    http_headers = "".join(
+        f"{k}: {v}\r\n" for k, v in headers.items() if k.lower() not in _DROP_HEADERS
+    )
+    block = (
+        f"HTTP/1.1 {status} {reason or ''}\r\n{http_headers}"
+        f"Content-Length: {len(content)}\r\n\r\n"
+    ).encode("utf-8") + content
+
+    fields = [
+        ("WARC-Type", "response"),
+        ("WARC-Record-ID", f"<urn:uuid:{uuid.uuid4()}>"),
+        ("WARC-Date", _warc_date(fetched_at)),
+        ("WARC-Target-URI", url),
+        ("WARC-Payload-Digest", "sha1:" + hashlib.sha1(content).hexdigest()),
+        ("X-Crawl-Medio", medio),
+        ("X-Crawl-Stage", stage),
+        ("Content-Type", "application/http; msgtype=response"),
+        ("Content-Length", len(block)),
+    ]
+    header = "WARC/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in fields if v is not None) + "\r\n"
+    return gzip.compress(header.encode("utf-8") + block + b"\r\n\r\n", compresslevel=6)
+
+
+def _decode_record(data: bytes):
+    # Registro WARC descomprimido -> dict.
+    warc_end = data.index(b"\r\n\r\n")
+    warc = _parse_headers(data[:warc_end].split(b"\r\n", 1)[1])
+    block = data[warc_end + 4:warc_end + 4 + int(warc["Content-Length"])]
+
+    http_end = block.index(b"\r\n\r\n")
+    status_line, _, http_headers = block[:http_end].partition(b"\r\n")
+    parts = status_line.decode("utf-8", "replace").split(" ", 2)
+    return {
+        "url": warc["WARC-Target-URI"],
+        "status": int(parts[1]),
+        "reason": parts[2] if len(parts) > 2 else "",
+        "headers": _parse_headers(http_headers),
+        "content": block[http_end + 4:],
+        "fetched_at": _parse_date(warc["WARC-Date"]),
+        "digest": warc.get("WARC-Payload-Digest", "").replace("sha1:", "") or None,
+        "medio": warc.get("X-Crawl-Medio"),
+        "stage": warc.get("X-Crawl-Stage"),
+    }
+
+
+def _scan(path: str, start: int = 0):
+    """
+    Recorre los miembros gzip de un segmento desde `start`.
+
+    Retorna:
+        iterator[tuple[int, int, dict]]: (offset, largo, registro). Se
+        detiene en el primer miembro incompleto o dañado.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        pending = b""
+        while True:
+            decompressor = zlib.decompressobj(wbits=31)
+            parts = []
+            fed = 0
+            data = pending or f.read(_SCAN_CHUNK)
+            try:
+                while data:
+                    parts.append(decompressor.decompress(data))
+                    fed += len(data)
+                    if decompressor.eof:
+                        break
+                    data = f.read(_SCAN_CHUNK)
+                if not decompressor.eof:
+                    return
+                record = _decode_record(b"".join(parts))
+            except (zlib.error, ValueError, KeyError, IndexError):
+                return
+            pending = decompressor.unused_data
+            length = fed - len(pending)
+            yield offset, length, record
+            offset += length
+
+
+class HTMLArchive:
+    """
+    Archivo de respuestas HTTP en segmentos WARC comprimidos con índice.
+
+    Recibe:
+        directory (str): carpeta del archivo (se crea si no existe).
+        segment_bytes (int): tamaño a partir del cual se abre otro segmento.
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = SEGMENT_MB * 1024 * 1024):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._db = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"),
+            check_same_thread=False
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                status INTEGER NOT NULL,
+                digest TEXT,
+                medio TEXT,
+                stage TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_key ON records(key)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_medio ON records(medio, stage)")
+        self._db.commit()
+
+        segments = self.segments()
+        self._segment = segments[-1] if segments else self._segment_name(0)
+        self._recover()
+        self._file = open(self._path(self._segment), "ab")
+
+    def _segment_name(self, n: int):
+        return f"{SEGMENT_PREFIX}{n:05d}{SEGMENT_SUFFIX}"
+
+    def _path(self, segment: str):
+        return os.path.join(self.directory, segment)
+
+    def segments(self):
+        """
+        Nombres de los segmentos en orden.
+        """
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+
+    def _indexed_end(self, segment: str):
+        row = self._db.execute(
+            "SELECT MAX(offset + length) FROM records WHERE segment = ?", (segment,)
+        ).fetchone()
+        return row[0] or 0
+
+    def _insert(self, segment: str, offset: int, length: int, record: dict):
+        self._db.execute(
+            """
+            INSERT INTO records
+                (key, url, segment, offset, length, status, digest, medio, stage, fetched_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                url_key(record["url"], keep_query=True), record["url"], segment, offset, length,
+                record["status"], record["digest"], record["medio"], record["stage"],
+                record["fetched_at"],
+            )
+        )
+
+    def _recover(self):
+        # Indexa los registros del último segmento que no alcanzaron a
+        # confirmarse y corta un registro escrito a medias.
+        path = self._path(self._segment)
+        if not os.path.exists(path):
+            return
+        end = self._indexed_end(self._segment)
+        size = os.path.getsize(path)
+        if size <= end:
+            return
+
+        recovered = 0
+        for offset, length, record in _scan(path, end):
+            self._insert(self._segment, offset, length, record)
+            end = offset + length
+            recovered += 1
+        self._db.commit()
+        if end < size:
+            with open(path, "r+b") as f:
+                f.truncate(end)
+        print(f"🗄️ Archivo {self.directory}: {recovered} registros recuperados"
+              + (f", {size - end} bytes incompletos descartados" if end < size else ""))
+
+    def store(self, url: str, resp, medio: str = None, stage: str = None):
+        """
+        Anexa una respuesta al archivo.
+
+        Recibe:
+            url (str): URL pedida (clave de búsqueda).
+            resp (requests.Response): respuesta ya leída (sin stream).
+            medio, stage (str): contexto de la descarga (metrics.context).
+
+        Retorna:
+            bool: False si la URL ya estaba archivada con el mismo código y
+            el mismo cuerpo (no se escribe de nuevo).
+        """
+        content = resp.content or b""
+        digest = hashlib.sha1(content).hexdigest()
+        key = url_key(url, keep_query=True)
+        fetched_at = datetime.now(timezone.utc).timestamp()
+
+        # Consulta previa para no comprimir un duplicado; la que decide es
+        # la de abajo, en la misma sección que la escritura y el índice, así
+        # dos hilos con la misma respuesta no la archivan dos veces.
+        with self._lock:
+            if self._is_latest(key, resp.status_code, digest):
+                return False
+
+        data = _encode_record(url, resp.status_code, resp.reason, resp.headers, content,
+                              fetched_at, medio, stage)
+
+        with self._lock:
+            if self._is_latest(key, resp.status_code, digest):
+                return False
+            if self._file.tell() and self._file.tell() + len(data) > self.segment_bytes:
+                self._rotate()
+            offset = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            self._insert(self._segment, offset, len(data), {
+                "url": url, "status": resp.status_code, "digest": digest,
+                "medio": medio, "stage": stage, "fetched_at": fetched_at,
+            })
+            self._pending += 1
+            if self._pending >= COMMIT_EVERY:
+                self._commit()
+        return True
+
+    def _is_latest(self, key: str, status: int, digest: str):
+        # Si la descarga más reciente de key tiene este código y cuerpo.
+        # Se llama con self._lock tomado.
+        row = self._db.execute(
+            "SELECT status, digest FROM records WHERE key = ? ORDER BY rowid DESC LIMIT 1", (key,)
+        ).fetchone()
+        return row == (status, digest)
+
+    def _rotate(self):
+        # Se llama con self._lock tomado.
+        self._commit()
+        self._file.close()
+        n = int(self._segment[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+        self._segment = self._segment_name(n)
+        self._file = open(self._path(self._segment), "ab")
+
+    def _commit(self):
+        # Se llama con self._lock tomado.
+        self._db.commit()
+        self._pending = 0
+
+    def flush(self):
+        """
+        Confirma en el índice los registros escritos.
+        """
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._file.close()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def lookup(self, url: str):
+        """
+        Ubicación de la descarga más reciente de url.
+
+        Retorna:
+            dict {url, segment, offset, length, status, medio, stage,
+            fetched_at} o None si no está archivada.
+        """
+        with self._lock:
+            row = self._db.execute(
+                """
+                SELECT url, segment, offset, length, status, medio, stage, fetched_at
+                FROM records WHERE key = ? ORDER BY rowid DESC LIMIT 1
+                """,
+                (url_key(url, keep_query=True),)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("url", "segment", "offset", "length", "status", "medio", "stage", "fetched_at"), row))
+
+    def read(self, segment: str, offset: int, length: int):
+        """
+        Lee un registro por su ubicación.
+
+        Retorna:
+            dict {url, status, reason, headers, content, fetched_at, digest,
+            medio, stage}
+        """
+        with open(self._path(segment), "rb") as f:
+            f.seek(offset)
+            return _decode_record(gzip.decompress(f.read(length)))
+
+    def get(self, url: str):
+        """
+        Registro más reciente de url (ver read), o None.
+        """
+        entry = self.lookup(url)
+        if entry is None:
+            return None
+        return self.read(entry["segment"], entry["offset"], entry["length"])
+
+    def load(self, url: str):
+        """
+        Construye una requests.Response con la descarga archivada de url.
+
+        Retorna:
+            requests.Response (con from_archive=True y fetched_at) o None.
+        """
+        record = self.get(url)
+        if record is None:
+            return None
+
+        resp = requests.Response()
+        resp.status_code = record["status"]
+        resp.reason = record["reason"]
+        resp._content = record["content"]
+        resp._content_consumed = True
+        resp.headers = record["headers"]
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp.url = record["url"]
+        resp.from_archive = True
+        resp.fetched_at = record["fetched_at"]
+        return resp
+
+    def urls(self, medio: str = None, stage: str = None, status: int = 200):
+        """
+        URLs archivadas (una por url_key, en orden de primera descarga).
+
+        Recibe:
+            medio, stage (str): filtrar por medio y etapa (None = todos).
+            status (int): código de la descarga más reciente (None = todos).
+        """
+        conditions, params = [], []
+        if medio is not None:
+            conditions.append("r.medio = ?")
+            params.append(medio)
+        if stage is not None:
+            conditions.append("r.stage = ?")
+            params.append(stage)
+        query = f"""
+            SELECT r.url, r.status FROM records r
+            JOIN (SELECT key, MIN(rowid) AS first, MAX(rowid) AS last FROM records GROUP BY key) k
+                ON r.rowid = k.last
+            {"WHERE " + " AND ".join(conditions) if conditions else ""}
+            ORDER BY k.first
+        """
+
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [url for url, code in rows if status is None or code == status]
+
+    def stats(self):
+        """
+        Resumen del archivo: {segments, bytes, records, urls, by_medio}.
+        """
+        with self._lock:
+            records, urls = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT key) FROM records"
+            ).fetchone()
+            by_medio = self._db.execute(
+                """
+                SELECT COALESCE(medio, '-'), COALESCE(stage, '-'), COUNT(*), COUNT(DISTINCT key), SUM(length)
+                FROM records GROUP BY 1, 2 ORDER BY 1, 2
+                """
+            ).fetchall()
+        segments = self.segments()
+        return {
+            "segments": len(segments),
+            "bytes": sum(os.path.getsize(self._path(s)) for s in segments),
+            "records": records,
+            "urls": urls,
+            "by_medio": [
+                {"medio": m, "stage": s, "records": n, "urls": u, "bytes": b}
+                for m, s, n, u, b in by_medio
+            ],
+        }
+
+    def rebuild_index(self):
+        """
+        Reconstruye el índice completo leyendo todos los segmentos.
+
+        Retorna:
+            int: registros indexados.
+        """
+        with self._lock:
+            self._file.flush()
+            self._db.execute("DELETE FROM records")
+            n = 0
+            for segment in self.segments():
+                for offset, length, record in _scan(self._path(segment)):
+                    self._insert(segment, offset, length, record)
+                    n += 1
+            self._commit()
+        return n
+
+
+class ArchiveSession:
+    """
+    Sesión que responde desde un HTMLArchive en lugar de la red (para
+    re-extraer con http_client.set_session). Las URLs que no están en el
+    archivo responden 404.
+    """
+
+    def __init__(self, archive: HTMLArchive):
+        self.archive = archive
+
+    def get(self, url, headers=None, **kwargs):
+        resp = self.archive.load(url)
+        if resp is not None:
+            return resp
+        resp = requests.Response()
+        resp.status_code = 404
+        resp._content = b""
+        resp.url = url
+        resp.from_archive = True
+        return resp
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta un archivo de HTML crudo")
+    parser.add_argument("directory", help="carpeta del archivo (HTML_ARCHIVE_DIR)")
+    parser.add_argument("--url", help="mostrar la descarga archivada de esta URL")
+    parser.add_argument("--output", help="con --url, guardar el cuerpo en este archivo")
+    parser.add_argument("--rebuild", action="store_true", help="reconstruir el índice desde los segmentos")
+    args = parser.parse_args(argv)
+
+    with HTMLArchive(args.directory) as archive:
+        if args.rebuild:
+            print(f"🗄️ {archive.rebuild_index()} registros indexados")
+
+        if args.url:
+            entry = archive.lookup(args.url)
+            if entry is None:
+                print(f"❌ {args.url} no está en el archivo")
+                return 1
+            record = archive.read(entry["segment"], entry["offset"], entry["length"])
+            print(f"{record['url']}  HTTP {record['status']}  {_warc_date(record['fetched_at'])}  "
+                  f"{entry['segment']}@{entry['offset']}")
+            for name, value in record["headers"].items():
+                print(f"   {name}: {value}")
+            if args.output:
+                with open(args.output, "wb") as f:
+                    f.write(record["content"])
+                print(f"Cuerpo ({len(record['content'])} bytes) guardado en {args.output}")
+            return 0
+
+        stats = archive.stats()
+        print(f"🗄️ {stats['urls']} URLs, {stats['records']} registros en {stats['segments']} "
+              f"segmentos ({stats['bytes'] / 2 ** 20:.1f} MB)")
+        for row in stats["by_medio"]:
+            print(f"   {row['medio']:<16}{row['stage']:<9}{row['urls']:>8} URLs{row['records']:>8} registros"
+                  f"{row['bytes'] / 2 ** 20:>9.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
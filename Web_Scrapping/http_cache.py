@@ -0,0 +1,232 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import requests
+from requests.structures import CaseInsensitiveDict
+
+'''
+Caché HTTP persistente en disco con revalidación condicional.
+
+Guarda el cuerpo de cada respuesta 200 que traiga ETag o Last-Modified,
+junto con esos validadores. En la siguiente corrida http_client envía
+If-None-Match / If-Modified-Since y, si el servidor responde 304, se
+reutiliza el cuerpo guardado sin volver a descargarlo.
+
+Estructura en disco:
+    <directorio>/index.sqlite   índice (url, validadores, tamaño, último acceso)
+    <directorio>/bodies/<sha1>  cuerpo de cada respuesta
+
+Las respuestas en streaming (stream=True) se guardan con tee(): el cuerpo
+se copia a medida que quien llama lo lee con iter_content y solo se guarda
+si lo lee hasta el final. Así un sitemap que se corta apenas se alcanza el
+límite no obliga a descargarlo completo.
+
+Cuando el tamaño total supera max_bytes se eliminan las entradas menos
+usadas recientemente (LRU).
+'''
+
+
+class HTTPCache:
+    """
+    Caché de respuestas HTTP con validadores y expulsión LRU.
+
+    Recibe:
+        directory (str): carpeta donde se guarda la caché.
+        max_bytes (int): tamaño máximo de los cuerpos guardados.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 500 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.bodies_dir = os.path.join(directory, "bodies")
+        os.makedirs(self.bodies_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(directory, "index.sqlite"),
+            check_same_thread=False
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                headers TEXT,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_access ON entries(last_access)")
+        self._db.commit()
+
+    def _body_path(self, key: str):
+        return os.path.join(self.bodies_dir, key)
+
+    def validators(self, url: str):
+        """
+        Retorna los headers condicionales para url (vacío si no está en caché).
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+
+        if row is None:
+            return {}
+
+        etag, last_modified = row
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def load(self, url: str):
+        """
+        Construye una requests.Response (status 200) con el cuerpo guardado.
+
+        Retorna:
+            requests.Response o None si la entrada no existe o está incompleta.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT key, headers FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE entries SET last_access = ? WHERE url = ?", (time.time(), url)
+            )
+            self._db.commit()
+
+        key, headers = row
+        try:
+            with open(self._body_path(key), "rb") as f:
+                content = f.read()
+        except OSError:
+            self.delete(url)
+            return None
+
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = content
+        resp._content_consumed = True
+        resp.headers = CaseInsensitiveDict(json.loads(headers))
+        resp.encoding = requests.utils.get_encoding_from_headers(resp.headers)
+        resp.url = url
+        resp.from_cache = True
+        return resp
+
+    def _cacheable(self, resp):
+        # Solo respuestas 200 con algún validador.
+        return resp.status_code == 200 and bool(
+            resp.headers.get("ETag") or resp.headers.get("Last-Modified")
+        )
+
+    def store(self, url: str, resp):
+        """
+        Guarda una respuesta 200 si trae ETag o Last-Modified. Una respuesta
+        en streaming cuyo cuerpo aún no se leyó se ignora (ver tee()).
+        """
+        if resp._content is False:
+            # stream=True sin leer: leerlo aquí descargaría el cuerpo entero.
+            return
+        if self._cacheable(resp):
+            self._write(url, resp, resp.content)
+
+    def tee(self, url: str, resp):
+        """
+        Prepara una respuesta en streaming para guardarse en la caché sin
+        leerla por adelantado: resp.iter_content copia los bloques que
+        entrega y, si se consumen todos, guarda el cuerpo (como store()).
+
+        Retorna:
+            requests.Response: la misma respuesta.
+        """
+        if not self._cacheable(resp):
+            return resp
+
+        iter_content = resp.iter_content
+
+        def tee_content(chunk_size=1, decode_unicode=False):
+            if decode_unicode:
+                yield from iter_content(chunk_size, decode_unicode=True)
+                return
+            chunks = []
+            for chunk in iter_content(chunk_size):
+                chunks.append(chunk)
+                yield chunk
+            self._write(url, resp, b"".join(chunks))
+
+        resp.iter_content = tee_content
+        return resp
+
+    def _write(self, url: str, resp, content: bytes):
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        headers = {
+            k: v for k, v in resp.headers.items()
+            if k.lower() in ("content-type", "etag", "last-modified")
+        }
+
+        tmp = f"{self._body_path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, self._body_path(key))
+
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO entries
+                    (url, key, etag, last_modified, headers, size, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (url, key, etag, last_modified, json.dumps(headers), len(content), time.time())
+            )
+            self._db.commit()
+            self._evict()
+
+    def delete(self, url: str):
+        """
+        Elimina una entrada de la caché.
+        """
+        with self._lock:
+            row = self._db.execute("SELECT key FROM entries WHERE url = ?", (url,)).fetchone()
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            self._db.commit()
+
+        if row:
+            try:
+                os.remove(self._body_path(row[0]))
+            except OSError:
+                pass
+
+    def _evict(self):
+        # Se llama con self._lock tomado.
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT url, key, size FROM entries ORDER BY last_access ASC"
+        ).fetchall()
+
+        for url, key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE url = ?", (url,))
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+            total -= size
+
+        self._db.commit()
@@ -0,0 +1,547 @@
+import os
+import time
+import random
+import threading
+import functools
+import requests
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from http_cache import HTTPCache
+from html_archive import HTMLArchive
+from canonical_urls import url_key
+import rate_limit
+import metrics
+
+load_dotenv()
+
+'''
+Capa HTTP compartida por todos los scrapers.
+
+Todas las descargas (sitemaps, páginas de listado y artículos) pasan por
+get(), que usa una única requests.Session con keep-alive y un pool de
+conexiones por host. Así cada artículo reutiliza la conexión TCP/TLS ya
+abierta con el medio en lugar de repetir el handshake.
+
+Opcionalmente las respuestas se guardan en una caché en disco (http_cache)
+y se revalidan con If-None-Match / If-Modified-Since. La caché se activa con
+set_cache() o con la variable de entorno HTTP_CACHE_DIR.
+
+Archivo de HTML crudo (html_archive): con set_archive() o HTML_ARCHIVE_DIR
+cada respuesta leída completa (sin stream) se anexa al archivo comprimido
+con su URL, código, headers, fecha y el medio y etapa de metrics.context
+(los 429/5xx transitorios no se archivan). Las respuestas que ya
+vienen del archivo (re-extracción) no se vuelven a escribir.
+
+Reintentos por petición: los errores transitorios (429, 5xx de gateway,
+conexión reiniciada, timeout) se reintentan dentro de get() con backoff
+exponencial con jitter, respetando Retry-After en 429/503. Cada host
+(es decir, cada medio) tiene su propio presupuesto de reintentos por
+corrida (HTTP_RETRY_BUDGET), para que un medio caído no consuma la corrida
+entera esperando.
+
+Control de tráfico: si el host tiene un limitador (rate_limit.configure,
+que get_all_news arma desde SITEMAPS), cada intento espera un token del
+bucket del host (sin pasarse del plazo del hilo) y reporta su código y
+latencia para el ajuste AIMD.
+
+Timeouts y plazos: toda petición lleva un timeout de conexión y de lectura
+(HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT) salvo que quien llama pase el
+suyo, así un socket detenido nunca bloquea un hilo para siempre. Además un
+hilo puede fijar un plazo de reloj con `with deadline(t):`; dentro del
+bloque cada petición acota su timeout al tiempo restante, no se reintenta
+si la espera pasaría del plazo y, una vez vencido, get() lanza
+DeadlineExceeded.
+
+Peticiones en vuelo: si varios hilos piden a la vez la misma URL
+(canonical_urls.url_key, conservando la query) sin stream, solo el primero
+la descarga y los demás esperan y reciben la misma respuesta (o la misma
+excepción). Se desactiva con HTTP_COALESCE=0.
+'''
+
+POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "16"))
+POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+CACHE_DIR = os.getenv("HTTP_CACHE_DIR")
+CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "500"))
+ARCHIVE_DIR = os.getenv("HTML_ARCHIVE_DIR")
+
+RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+RETRY_AFTER_MAX = float(os.getenv("HTTP_RETRY_AFTER_MAX", "120"))
+RETRY_BUDGET = int(os.getenv("HTTP_RETRY_BUDGET", "100"))
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+
+COALESCE = os.getenv("HTTP_COALESCE", "1") != "0"
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_EXCEPTIONS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+_archive = None
+_archive_lock = threading.Lock()
+
+_budgets = {}
+_budget_lock = threading.Lock()
+
+# Plazo (time.monotonic) del hilo actual, fijado con deadline().
+_local = threading.local()
+
+# Descargas en curso por url_key: {key: _Flight}.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+class DeadlineExceeded(requests.Timeout):
+    """
+    Se venció el plazo de reloj fijado con deadline().
+    """
+
+
+class _Flight:
+    # Resultado compartido de una descarga en curso.
+    __slots__ = ("done", "resp", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.resp = None
+        self.error = None
+
+
+def create_session(pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE):
+    """
+    Crea una requests.Session con un pool de conexiones por host.
+
+    Recibe:
+        pool_connections (int): número de hosts distintos que se mantienen en caché.
+        pool_maxsize (int): conexiones abiertas simultáneas por host
+            (debe ser >= número de hilos que descargan del mismo medio).
+
+    Retorna:
+        requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Retorna la sesión compartida, creándola la primera vez.
+
+    El pool de urllib3 es seguro entre hilos, por lo que la misma sesión
+    se usa desde todos los hilos de get_all_news.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def set_session(session):
+    """
+    Punto único de inyección: reemplaza la sesión usada por todos los scrapers.
+
+    Recibe:
+        session (requests.Session o None): sesión a usar. Con None se vuelve
+            a crear una sesión por defecto en la siguiente petición.
+    """
+    global _session
+    with _session_lock:
+        _session = session
+
+
+def get_cache():
+    """
+    Retorna la caché HTTP activa, o None si no hay caché.
+
+    La primera vez la crea a partir de HTTP_CACHE_DIR si está definida.
+    """
+    global _cache
+    if _cache is None and CACHE_DIR:
+        with _cache_lock:
+            if _cache is None:
+                _cache = HTTPCache(CACHE_DIR, max_bytes=CACHE_MAX_MB * 1024 * 1024)
+    return _cache
+
+
+def set_cache(cache):
+    """
+    Activa (o desactiva con None) la caché HTTP usada por get().
+
+    Recibe:
+        cache (HTTPCache o None)
+    """
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def get_archive():
+    """
+    Retorna el archivo de HTML crudo activo, o None si no hay archivo.
+
+    La primera vez lo crea a partir de HTML_ARCHIVE_DIR si está definida.
+    """
+    global _archive
+    if _archive is None and ARCHIVE_DIR:
+        with _archive_lock:
+            if _archive is None:
+                _archive = HTMLArchive(ARCHIVE_DIR)
+    return _archive
+
+
+def set_archive(archive):
+    """
+    Activa (o desactiva con None) el archivo de HTML crudo usado por get().
+
+    Recibe:
+        archive (HTMLArchive o None)
+    """
+    global _archive
+    with _archive_lock:
+        _archive = archive
+
+
+def set_retry_budget(host: str, retries: int):
+    """
+    Fija el presupuesto de reintentos de un host para la corrida. El host
+    se normaliza con rate_limit.host_key, como en el limitador.
+    """
+    with _budget_lock:
+        _budgets[rate_limit.host_key(host)] = retries
+
+
+def reset_retry_budgets():
+    """
+    Restaura el presupuesto por defecto de todos los hosts (al inicio de
+    cada corrida de get_all_news).
+    """
+    with _budget_lock:
+        _budgets.clear()
+
+
+def _take_retry(host: str):
+    # Consume un reintento del presupuesto del host; False si se agotó.
+    with _budget_lock:
+        left = _budgets.get(host, RETRY_BUDGET)
+        if left <= 0:
+            if left == 0:
+                print(f"Presupuesto de reintentos agotado para {host}")
+                _budgets[host] = -1
+            return False
+        _budgets[host] = left - 1
+        return True
+
+
+@contextmanager
+def deadline(at: float = None):
+    """
+    Fija un plazo para las peticiones del hilo actual dentro del bloque.
+
+    Recibe:
+        at (float): instante límite en time.monotonic(). None no agrega
+            plazo. Si ya hay un plazo más cercano, se conserva ese.
+    """
+    previous = getattr(_local, "deadline", None)
+    if at is not None and (previous is None or at < previous):
+        _local.deadline = at
+    try:
+        yield
+    finally:
+        _local.deadline = previous
+
+
+def current_deadline():
+    """
+    Plazo vigente en el hilo actual (time.monotonic) o None.
+    """
+    return getattr(_local, "deadline", None)
+
+
+def remaining():
+    """
+    Segundos que faltan para el plazo del hilo actual (None sin plazo).
+    """
+    at = current_deadline()
+    return None if at is None else at - time.monotonic()
+
+
+def check_deadline():
+    """
+    Lanza DeadlineExceeded si el plazo del hilo actual ya se venció (para
+    lecturas largas en streaming).
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Plazo agotado")
+
+
+def bind_deadline(func):
+    """
+    Envuelve func para que corra con el plazo del hilo que la envuelve
+    (para tareas enviadas a otro hilo, p. ej. un ThreadPoolExecutor).
+    """
+    at = current_deadline()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with deadline(at):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _timeout(timeout=None):
+    # Timeout (conexión, lectura) de un intento, acotado por el plazo.
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("Plazo agotado")
+    if isinstance(timeout, tuple):
+        return tuple(min(t, left) if t is not None else left for t in timeout)
+    return left if timeout is None else min(timeout, left)
+
+
+def retry_after(resp):
+    """
+    Segundos indicados por el header Retry-After (número o fecha HTTP).
+
+    Retorna:
+        float o None si no hay header o no se puede interpretar.
+    """
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff(attempt: int):
+    """
+    Espera antes del reintento número `attempt` (desde 0): backoff
+    exponencial con jitter completo, acotado por BACKOFF_MAX.
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def get(url: str, headers: dict = None, retries: int = None, **kwargs):
+    """
+    Hace un GET usando la sesión compartida.
+
+    Si hay caché activa se envían los validadores guardados; ante un 304
+    se retorna el cuerpo de la caché como una respuesta 200 (con el
+    atributo from_cache=True).
+
+    Los errores transitorios (RETRYABLE_STATUS y RETRYABLE_EXCEPTIONS) se
+    reintentan hasta `retries` veces mientras quede presupuesto para el
+    host. En 429/503 se espera lo que pida Retry-After (si supera
+    HTTP_RETRY_AFTER_MAX no se reintenta); en los demás casos, backoff().
+
+    Sin `timeout` explícito se usa (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT).
+    Con un plazo activo (deadline()) el timeout se acota al tiempo restante
+    y no se reintenta si la espera no cabe en el plazo.
+
+    Si otro hilo ya está descargando la misma URL (sin stream), se espera
+    su resultado en lugar de repetir la descarga.
+
+    Recibe:
+        url (str): URL a descargar.
+        headers (dict): Headers para la petición HTTP.
+        retries (int): reintentos máximos (HTTP_RETRIES por defecto).
+        **kwargs: argumentos adicionales de requests (timeout, params, ...).
+
+    Retorna:
+        requests.Response (la última, si se agotaron los reintentos).
+
+    Lanza:
+        DeadlineExceeded si el plazo del hilo se venció.
+    """
+    if not COALESCE or kwargs.get("stream"):
+        # Un cuerpo en streaming solo lo puede leer quien lo pidió.
+        return _get(url, headers, retries, **kwargs)
+
+    key = url_key(url, keep_query=True)
+    with _inflight_lock:
+        flight = _inflight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _inflight[key] = _Flight()
+
+    if not leader:
+        metrics.add(metrics.current_context()[0], "coalesced")
+        if not flight.done.wait(remaining()):
+            raise DeadlineExceeded(f"Plazo agotado esperando {url}")
+        if flight.error is not None:
+            raise flight.error
+        return flight.resp
+
+    try:
+        flight.resp = _get(url, headers, retries, **kwargs)
+        return flight.resp
+    except BaseException as e:
+        flight.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        flight.done.set()
+
+
+def _get(url: str, headers: dict = None, retries: int = None, **kwargs):
+    # get() sin coalescencia: intentos, reintentos y plazo.
+    retries = RETRIES if retries is None else retries
+    # Misma clave que el limitador: con y sin "www." es el mismo host.
+    host = rate_limit.host_key(url)
+    limiter = rate_limit.get_limiter(host)
+    timeout = kwargs.pop("timeout", None)
+    attempt = 0
+
+    while True:
+        try:
+            resp = _limited_get(limiter, url, headers, timeout, **kwargs)
+        except DeadlineExceeded:
+            raise
+        except RETRYABLE_EXCEPTIONS as e:
+            # Un timeout recortado por el plazo se reporta como plazo vencido.
+            check_deadline()
+            if attempt >= retries or not _take_retry(host):
+                raise
+            wait = backoff(attempt)
+            if not _fits(wait):
+                raise
+            print(f"Reintento {attempt + 1}/{retries} de {url} en {wait:.1f}s ({type(e).__name__})")
+        else:
+            if resp.status_code not in RETRYABLE_STATUS or attempt >= retries:
+                return resp
+
+            wait = retry_after(resp) if resp.status_code in (429, 503) else None
+            if wait is not None and wait > RETRY_AFTER_MAX:
+                return resp
+            if wait is None:
+                wait = backoff(attempt)
+            if not _fits(wait) or not _take_retry(host):
+                return resp
+            resp.close()
+            print(f"Reintento {attempt + 1}/{retries} de {url} en {wait:.1f}s (HTTP {resp.status_code})")
+
+        time.sleep(wait)
+        attempt += 1
+
+
+def _fits(wait: float):
+    # Si la espera del reintento cabe en el plazo del hilo.
+    left = remaining()
+    return left is None or wait < left
+
+
+def _limited_get(limiter, url: str, headers: dict = None, timeout=None, **kwargs):
+    # Un intento pasando por el limitador del host (si hay). El timeout se
+    # calcula después de esperar el token, con el plazo que quede. Cada
+    # intento se reporta a metrics.
+    if limiter is not None and not limiter.acquire(current_deadline()):
+        raise DeadlineExceeded(f"Plazo agotado esperando turno para {url}")
+    start = time.monotonic()
+    try:
+        resp = _get_once(url, headers, timeout=_timeout(timeout), **kwargs)
+    except DeadlineExceeded:
+        raise
+    except requests.Timeout as e:
+        latency = time.monotonic() - start
+        metrics.observe_request(latency=latency, error=type(e).__name__)
+        if limiter is not None:
+            # Un timeout recortado por el plazo no es culpa del host.
+            left = remaining()
+            limiter.record(timeout=left is None or left > 0)
+        raise
+    except requests.RequestException as e:
+        metrics.observe_request(latency=time.monotonic() - start, error=type(e).__name__)
+        if limiter is not None:
+            limiter.record()
+        raise
+
+    latency = time.monotonic() - start
+    if limiter is not None:
+        limiter.record(resp.status_code, latency)
+    metrics.observe_request(
+        304 if getattr(resp, "from_cache", False) else resp.status_code,
+        latency,
+        _body_size(resp, kwargs.get("stream", False)),
+    )
+    if not kwargs.get("stream"):
+        _archive_response(url, resp)
+    return resp
+
+
+def _archive_response(url: str, resp):
+    # Anexa la respuesta al archivo de HTML crudo, si hay uno activo.
+    archive = get_archive()
+    if archive is None or resp.status_code in RETRYABLE_STATUS or getattr(resp, "from_archive", False):
+        return
+    medio, http_stage = metrics.current_context()
+    try:
+        archive.store(url, resp, medio, http_stage)
+    except OSError as e:
+        print(f"Error archivando {url}: {e}")
+
+
+def _body_size(resp, stream: bool):
+    # En streaming el cuerpo aún no se leyó: se usa Content-Length.
+    if not stream:
+        return len(resp.content or b"")
+    try:
+        return int(resp.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+def _get_once(url: str, headers: dict = None, **kwargs):
+    # Un intento, con la caché condicional si está activa.
+    cache = get_cache()
+    if cache is None:
+        return get_session().get(url, headers=headers, **kwargs)
+
+    conditional = cache.validators(url)
+    if conditional:
+        headers = {**(headers or {}), **conditional}
+
+    resp = get_session().get(url, headers=headers, **kwargs)
+
+    if resp.status_code == 304 and conditional:
+        cached = cache.load(url)
+        if cached is not None:
+            return cached
+        # La entrada desapareció: se pide de nuevo sin validadores.
+        headers = {k: v for k, v in headers.items() if k not in conditional}
+        resp = get_session().get(url, headers=headers, **kwargs)
+
+    if kwargs.get("stream"):
+        # Se guarda solo si quien llama lee el cuerpo completo.
+        return cache.tee(url, resp)
+    cache.store(url, resp)
+    return resp
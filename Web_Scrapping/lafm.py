@@ -1,6 +1,10 @@
-import requests
+import http_client
+from scheduler import run_outlet
 import pandas as pd
-from bs4 import BeautifulSoup
+from parsing import make_soup
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
+from canonical_urls import unique_urls
 import os
 from dotenv import load_dotenv
 
@@ -13,12 +17,12 @@ def get_urls_politica_LaFM(url_base: str, headers: dict):
     """
     Obtiene todas las URLs de noticias de política de La FM desde la página principal.
     """
-    resp = requests.get(url_base, headers=headers)
+    resp = http_client.get(url_base, headers=headers)
     if resp.status_code != 200:
         print(f"Error HTTP {resp.status_code} al acceder a {url_base}")
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = make_soup(resp.text)
     links = soup.find_all("a", href=True)
 
     urls = []
@@ -27,79 +31,55 @@ def get_urls_politica_LaFM(url_base: str, headers: dict):
         if href.startswith("/politica/"):
             urls.append(url_LaFM + href)
 
-    # Quitar duplicados
-    urls = list(dict.fromkeys(urls))
+    # Forma canónica y sin duplicados (variantes con query, #, barra final)
+    urls = unique_urls(urls)
     return urls
 
 
-def get_article_info_LaFM(url: str, headers: dict):
-    """
-    Descarga un artículo de La FM y extrae:
-    title, subtitle, body, date_published, author, section, tags.
-    """
-    resp = requests.get(url, headers=headers)
-    if resp.status_code != 200:
-        print(f"Error {resp.status_code} al acceder a {url}")
-        return None
-
-    soup = BeautifulSoup(resp.text, "html.parser")
+# Parser de artículos: la spec del medio en article_specs.py, la misma que
+# usa get_all_news (ver extractors.make_article_parser).
+get_article_info_LaFM = make_article_parser(EXTRACTORS["LaFM"])
 
-    # Título
-    title_tag = soup.find("h1")
-    title = title_tag.get_text(strip=True) if title_tag else None
 
-    # Subtítulo (no existe)
-    subtitle = None
+def get_news_urls_LaFM(
+    url_base: str,
+    headers: dict,
+    limit: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    on_url=None
+    ):
+    """
+    Obtiene las URLs de artículos que procesa get_news_LaFM:
+    descubrimiento, filtros y límite.
 
-    # Autor
-    autor_box = soup.find("div", class_="author")
-    author = autor_box.get_text(strip=True) if autor_box else None
+    La página de listado no trae fechas de modificación, por lo que
+    since/until no aplican a este medio y se ignoran. En modo pipeline
+    (on_url) las URLs se entregan apenas se lee la página de listado.
+    """
 
-    # Fecha
-    fecha_tag = soup.find("meta", {"property": "article:published_time"})
-    date_published = fecha_tag["content"] if fecha_tag else None
+    urls = get_urls_politica_LaFM(url_base, headers)
 
-    # Tags
-    tags_container = soup.find("div", class_="tags")
-    tags = [a.get_text(strip=True) for a in tags_container.find_all("a")] if tags_container else None
+    # Modo incremental: descartar URLs ya procesadas
+    if seen_store is not None:
+        urls = seen_store.filter_new(urls)
 
-    # Cuerpo
-    body_container = soup.find("article", class_="news-content")
-    if body_container:
-        parrafos = [p.get_text(strip=True) for p in body_container.find_all("p")]
-        body = "\n\n".join(parrafos) if parrafos else None
-    else:
-        body = None
+    if limit:
+        urls = urls[:limit]
 
-    # Sección fija
-    section = "politica"
+    # Modo pipeline: entregar las URLs a la descarga de artículos
+    if on_url is not None:
+        for u in urls:
+            on_url(u)
 
-    return {
-        "url": url,
-        "title": title,
-        "subtitle": subtitle,
-        "body": body,
-        "date_published": date_published,
-        "author": author,
-        "section": section,
-        "tags": tags,
-    }
+    return urls
 
 
-def get_news_LaFM(url_base: str, headers: dict, limit: int = None):
+def to_dataframe_LaFM(data: list):
     """
-    Obtiene un DataFrame con los artículos de política de La FM.
+    Convierte los registros de get_article_info_LaFM en un DataFrame limpio.
     """
-    urls = get_urls_politica_LaFM(url_base, headers)
-
-    if limit:
-        urls = urls[:limit]
-
-    data = []
-    for url in urls:
-        info = get_article_info_LaFM(url, headers)
-        if info:
-            data.append(info)
 
     df = pd.DataFrame(data)
 
@@ -111,3 +91,52 @@ def get_news_LaFM(url_base: str, headers: dict, limit: int = None):
         df["body"] = df["body"].apply(lambda x: x.replace("\n", " ") if isinstance(x, str) else "")
 
     return df
+
+
+def get_news_LaFM(
+    url_base: str,
+    headers: dict,
+    limit: int = None,
+    concurrency: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    pipeline: bool = False
+    ):
+    """
+    Obtiene un DataFrame con los artículos de política de La FM.
+    """
+
+    if pipeline:
+        # Descubrimiento y descarga de artículos solapados (cola acotada)
+        data = run_outlet(
+            "LaFM",
+            get_article_info_LaFM,
+            headers,
+            discover=lambda on_url: get_news_urls_LaFM(
+                url_base,
+                headers,
+                limit=limit,
+                seen_store=seen_store,
+                since=since,
+                until=until,
+                on_url=on_url
+            ),
+            concurrency=concurrency
+        )
+    else:
+        urls = get_news_urls_LaFM(
+            url_base,
+            headers,
+            limit=limit,
+            seen_store=seen_store,
+            since=since,
+            until=until
+        )
+
+        data = run_outlet("LaFM", get_article_info_LaFM, headers, urls=urls, concurrency=concurrency)
+
+    if seen_store is not None:
+        seen_store.add_many([r["url"] for r in data], "LaFM")
+
+    return to_dataframe_LaFM(data)
@@ -1,195 +1,108 @@
-import requests
+from scheduler import run_outlet
 import pandas as pd
-from bs4 import BeautifulSoup
-import xml.etree.ElementTree as ET
-import os
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
 from dotenv import load_dotenv
 
-load_dotenv()
+from sitemaps import get_sitemap_entries
 
-namespace = os.getenv('URL_ElPACIFISTA')
+load_dotenv()
 
 
 
-def get_urls_LaSilla(sitemap_index_url: str, headers: dict):
+def get_urls_LaSilla(
+    sitemap_index_url: str,
+    headers: dict,
+    since=None,
+    until=None,
+    url_filter=None,
+    limit: int = None,
+    on_url=None
+    ):
     """
     Descarga el sitemap_index.xml de La Silla Vacía y extrae todos los sitemaps.
-    Luego descarga uno por uno y obtiene las URLs de artículos.
-
-    Retorna:
-        list[str]: lista de URLs limpias de artículos.
-    """
-
-    resp = requests.get(sitemap_index_url, headers=headers)
-    if resp.status_code != 200:
-        print(f"Error HTTP {resp.status_code} al acceder a {sitemap_index_url}")
-        return []
+    Luego los lee en streaming, varios a la vez (SITEMAP_PARALLELISM), y
+    obtiene las URLs de artículos.
 
-    try:
-        root = ET.fromstring(resp.content)
-    except Exception as e:
-        print("Error parseando XML:", e)
-        return []
+    Los sitemaps hijos cuyo lastmod es anterior a `since` no se descargan, y
+    una vez reunidas `limit` URLs que pasan `url_filter` no se piden hijos
+    que ya no pueden aportar artículos más recientes.
 
-    # Namespace estándar
-#   ns = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+    Con on_url (modo pipeline) cada URL se entrega apenas se lee.
 
-    # Extraer URLs de sitemaps
-    sitemap_urls = [
-        sm.find(f"{namespace}loc").text
-        for sm in root.findall(f"{namespace}sitemap")
-    ]
-
-    all_urls = []
-
-    for sm_url in sitemap_urls:
-        resp_sm = requests.get(sm_url, headers=headers)
-        if resp_sm.status_code != 200:
-            continue
-
-        try:
-            root_sm = ET.fromstring(resp_sm.content)
-        except Exception:
-            continue
+    Retorna:
+        list[tuple[str, datetime]]: pares (url, lastmod) de artículos,
+        del más reciente al más antiguo.
+    """
 
-        urls = [
-            tag.find(f"{namespace}loc").text
-            for tag in root_sm.findall(f"{namespace}url")
-        ]
+    # Filtrar imágenes y basura
+    def es_articulo(u):
+        u_l = u.lower()
+        return (
+            "/wp-content/" not in u_l
+            and not u_l.endswith((".jpg", ".png", ".jpeg", ".gif"))
+            and (url_filter is None or url_filter(u))
+        )
 
-        # Filtrar imágenes y basura
-        clean = [
-            u for u in urls
-            if "/wp-content/" not in u.lower()
-            and not u.lower().endswith((".jpg", ".png", ".jpeg", ".gif"))
-        ]
+    return get_sitemap_entries(
+        sitemap_index_url,
+        headers,
+        since=since,
+        until=until,
+        url_filter=es_articulo,
+        limit=limit,
+        on_url=on_url
+    )
 
-        all_urls.extend(clean)
 
-    return all_urls
+# Parser de artículos: la spec del medio en article_specs.py, la misma que
+# usa get_all_news (ver extractors.make_article_parser).
+get_article_info_LaSilla = make_article_parser(EXTRACTORS["LaSillaVacia"])
 
 
-def get_article_info_LaSilla(url: str, headers: dict):
+def get_news_urls_LaSilla(
+    sitemap_index_url: str,
+    headers: dict,
+    limit: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    on_url=None
+    ):
     """
-    Descarga y parsea un artículo de La Silla Vacía.
-
-    Extrae:
-        - title
-        - subtitle
-        - date_published
-        - body
-        - author
-        - tags
-        - section (siempre 'politica' o según URL)
+    Obtiene las URLs de artículos que procesa get_news_LaSilla:
+    descubrimiento, filtros y límite (los más recientes primero).
     """
 
-    resp = requests.get(url, headers=headers)
-    if resp.status_code != 200:
-        print(f"Error HTTP {resp.status_code} al acceder a {url}")
-        return None
-
-    soup = BeautifulSoup(resp.text, "html.parser")
+    # Filtrar política (y en modo incremental, descartar URLs ya procesadas);
+    # se aplica mientras se lee el sitemap para cortar apenas hay `limit`.
+    def es_politica(u):
+        return (
+            "politica" in u.lower()
+            and "/podcasts/" not in u.lower()
+            and (seen_store is None or u not in seen_store)
+        )
 
-    # TÍTULO
-    title_tag = (
-        soup.select_one("h1.title")
-        or soup.find("h1")
-        or soup.title
+    entries = get_urls_LaSilla(
+        sitemap_index_url,
+        headers,
+        since=since,
+        until=until,
+        url_filter=es_politica,
+        limit=limit,
+        on_url=on_url
     )
-    title = title_tag.get_text(strip=True) if title_tag else None
-
-    # SUBTÍTULO
-    subtitle = None
-
-    meta_desc = soup.find("meta", attrs={"name": "description"})
-    if meta_desc and meta_desc.get("content"):
-        subtitle = meta_desc["content"].strip()
 
-    # FECHA
-    date_published = None
+    urls = [u for u, _ in entries]
 
-    # 1) <meta property="article:published_time">
-    meta_date = soup.find("meta", attrs={"property": "article:published_time"})
-    if meta_date and meta_date.get("content"):
-        date_published = meta_date["content"]
+    return urls
 
-    # 2) <time datetime="...">
-    if not date_published:
-        time_tag = soup.find("time", attrs={"datetime": True})
-        if time_tag:
-            date_published = time_tag["datetime"]
-
-    # AUTOR
-    author = None
-
-    # Ejemplo: <span class="article__author-name">Nombre</span>
-    tag_author = soup.select_one(".article__author-name")
-    if tag_author:
-        author = tag_author.get_text(strip=True)
-
-    # CUERPO
-    body = None
-
-    container = (
-        soup.select_one(".entry-content")
-        or soup.select_one(".article__body")
-        or soup.find("article")
-    )
 
-    if container:
-        paragraphs = [
-            p.get_text(" ", strip=True)
-            for p in container.find_all("p")
-            if p.get_text(strip=True)
-        ]
-        body = "\n".join(paragraphs) if paragraphs else None
-
-    # TAGS
-    tags_container = soup.select_one("div.field--name-field-tags")
-    if tags_container:
-        tags = [
-            a.get_text(strip=True)
-            for a in tags_container.select("a")
-        ]
-    else:
-        tags = None
-
-    # SECCIÓN (se deduce del URL)
-    section = "politica"
-    
-    # RETORNO
-    return {
-        "url": url,
-        "title": title,
-        "subtitle": subtitle,
-        "date_published": date_published,
-        "body": body,
-        "author": author,
-        "section": section,
-        "tags": tags,
-    }
-
-def get_news_LaSilla(sitemap_index_url: str, headers: dict, limit: int = None):
+def to_dataframe_LaSilla(data: list):
     """
-    Descarga el sitemap general, obtiene URLs, filtra política,
-    procesa cada artículo y retorna un DataFrame limpio.
+    Convierte los registros de get_article_info_LaSilla en un DataFrame limpio.
     """
 
-    urls = get_urls_LaSilla(sitemap_index_url, headers)
-
-    # Filtrar política
-    urls = [u for u in urls if "politica" in u.lower() and "/podcasts/" not in u.lower()]
-
-    if limit:
-        urls = urls[:limit]
-
-    data = []
-
-    for url in urls:
-        info = get_article_info_LaSilla(url, headers)
-        if info:
-            data.append(info)
-
     df = pd.DataFrame(data)
 
     # Normalización igual al código de Pacifista
@@ -204,3 +117,53 @@ def get_news_LaSilla(sitemap_index_url: str, headers: dict, limit: int = None):
         )
 
     return df
+
+
+def get_news_LaSilla(
+    sitemap_index_url: str,
+    headers: dict,
+    limit: int = None,
+    concurrency: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    pipeline: bool = False
+    ):
+    """
+    Descarga el sitemap general, obtiene URLs, filtra política,
+    procesa cada artículo y retorna un DataFrame limpio.
+    """
+
+    if pipeline:
+        # Descubrimiento y descarga de artículos solapados (cola acotada)
+        data = run_outlet(
+            "LaSillaVacia",
+            get_article_info_LaSilla,
+            headers,
+            discover=lambda on_url: get_news_urls_LaSilla(
+                sitemap_index_url,
+                headers,
+                limit=limit,
+                seen_store=seen_store,
+                since=since,
+                until=until,
+                on_url=on_url
+            ),
+            concurrency=concurrency
+        )
+    else:
+        urls = get_news_urls_LaSilla(
+            sitemap_index_url,
+            headers,
+            limit=limit,
+            seen_store=seen_store,
+            since=since,
+            until=until
+        )
+
+        data = run_outlet("LaSillaVacia", get_article_info_LaSilla, headers, urls=urls, concurrency=concurrency)
+
+    if seen_store is not None:
+        seen_store.add_many([r["url"] for r in data], "LaSillaVacia")
+
+    return to_dataframe_LaSilla(data)
@@ -1,98 +1,90 @@
-import requests
+from scheduler import run_outlet
 import pandas as pd
-from bs4 import BeautifulSoup
-
-def get_urls_politica_LaVoragine(sitemap_url: str, headers: dict = None):
-    """
-    Obtiene todas las URLs de noticias de política de La Vóragine desde el sitemap de posts.
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
+
+from sitemaps import get_sitemap_entries
+
+def get_urls_politica_LaVoragine(
+    sitemap_url: str,
+    headers: dict = None,
+    since=None,
+    until=None,
+    url_filter=None,
+    limit: int = None,
+    on_url=None
+    ):
     """
+    Obtiene las URLs de noticias de política de La Vóragine desde el sitemap de posts.
 
-    resp = requests.get(sitemap_url, headers=headers)
-    if resp.status_code != 200:
-        print(f"Error HTTP {resp.status_code} al acceder a {sitemap_url}")
-        return []
+    El sitemap se lee en streaming y el filtro de política (más url_filter,
+    si se pasa) se aplica mientras se lee; se conservan como máximo `limit`
+    URLs, sin duplicados.
 
-    soup = BeautifulSoup(resp.text, "xml")
-    urls = [loc.get_text(strip=True) for loc in soup.find_all("loc") if "/politica/" in loc.get_text(strip=True)]
-
-    # Quitar duplicados
-    urls = list(dict.fromkeys(urls))
-    return urls
+    Con on_url (modo pipeline) cada URL se entrega apenas se lee.
 
-def get_article_info_LaVoragine(url: str, headers: dict):
+    Retorna:
+        list[tuple[str, datetime]]: pares (url, lastmod), del más reciente
+        al más antiguo (ventana since/until opcional).
     """
-    Descarga un artículo de La Vorágine y extrae:
-    title, subtitle, body, date_published, author, section, tags.
-    """
-    resp = requests.get(url, headers=headers)
-    if resp.status_code != 200:
-        print(f"Error {resp.status_code} al acceder a {url}")
-        return None
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    def es_politica(u):
+        return "/politica/" in u and (url_filter is None or url_filter(u))
+
+    urls = get_sitemap_entries(
+        sitemap_url,
+        headers,
+        since=since,
+        until=until,
+        url_filter=es_politica,
+        limit=limit,
+        on_url=on_url
+    )
+    return urls
 
-    # ---------- Título ----------
-    title_tag = soup.find("h1")
-    title = title_tag.get_text(strip=True) if title_tag else None
 
-    # ---------- Subtítulo ----------
-    subtitle_tag = soup.find("h2", class_="subtitle")
-    subtitle = subtitle_tag.get_text(strip=True) if subtitle_tag else None
+# Parser de artículos: la spec del medio en article_specs.py, la misma que
+# usa get_all_news (ver extractors.make_article_parser).
+get_article_info_LaVoragine = make_article_parser(EXTRACTORS["LaVoragine"])
 
-    # ---------- Autor ----------
-    autor_meta = soup.find("meta", {"name": "author"})
-    if autor_meta:
-        author = autor_meta.get("content")
-    else:
-        autor_tag = soup.find("span", class_="author-name")  # ajuste si existe
-        author = autor_tag.get_text(strip=True) if autor_tag else None
 
-    # ---------- Fecha ----------
-    fecha_tag = soup.find("meta", {"property": "article:published_time"})
-    date_published = fecha_tag["content"] if fecha_tag else None
+def get_news_urls_LaVoragine(
+    sitemap_url: str,
+    headers: dict = None,
+    limit: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    on_url=None
+    ):
+    """
+    Obtiene las URLs de artículos que procesa get_news_LaVoragine:
+    descubrimiento, filtros y límite (los más recientes primero).
+    """
 
-    # ---------- Sección ----------
-    section = "politica"
+    # Modo incremental: descartar URLs ya procesadas mientras se lee el sitemap
+    def es_nueva(u):
+        return seen_store is None or u not in seen_store
 
-    # ---------- Tags ----------
-    tags_container = soup.find("div", class_="tags")
-    tags = [a.get_text(strip=True) for a in tags_container.find_all("a")] if tags_container else None
+    entries = get_urls_politica_LaVoragine(
+        sitemap_url,
+        headers=headers,
+        since=since,
+        until=until,
+        url_filter=es_nueva,
+        limit=limit,
+        on_url=on_url
+    )
 
-    # ---------- Body ----------
-    article_tag = soup.find("article")
-    if article_tag:
-        parrafos = [p.get_text(strip=True) for p in article_tag.find_all("p")]
-        body = "\n\n".join(parrafos) if parrafos else None
-    else:
-        body = None
+    urls = [u for u, _ in entries]
 
-    return {
-        "url": url,
-        "title": title,
-        "subtitle": subtitle,
-        "body": body,
-        "date_published": date_published,
-        "author": author,
-        "section": section,
-        "tags": tags,
-    }
+    return urls
 
 
-def get_news_LaVoragine(sitemap_url: str, headers: dict = None, limit: int = None):
+def to_dataframe_LaVoragine(data: list):
     """
-    Obtiene un DataFrame con los artículos de política de La Vóragine.
+    Convierte los registros de get_article_info_LaVoragine en un DataFrame limpio.
     """
-    urls = get_urls_politica_LaVoragine(sitemap_url, headers=headers)
-
-
-    if limit:
-        urls = urls[:limit]
-
-    data = []
-    for url in urls:
-        info = get_article_info_LaVoragine(url, headers=headers)
-        if info:
-            data.append(info)
 
     df = pd.DataFrame(data)
 
@@ -104,3 +96,52 @@ def get_news_LaVoragine(sitemap_url: str, headers: dict = None, limit: int = Non
         df["body"] = df["body"].apply(lambda x: x.replace("\n", " ") if isinstance(x, str) else "")
 
     return df
+
+
+def get_news_LaVoragine(
+    sitemap_url: str,
+    headers: dict = None,
+    limit: int = None,
+    concurrency: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    pipeline: bool = False
+    ):
+    """
+    Obtiene un DataFrame con los artículos de política de La Vóragine.
+    """
+
+    if pipeline:
+        # Descubrimiento y descarga de artículos solapados (cola acotada)
+        data = run_outlet(
+            "LaVoragine",
+            get_article_info_LaVoragine,
+            headers,
+            discover=lambda on_url: get_news_urls_LaVoragine(
+                sitemap_url,
+                headers,
+                limit=limit,
+                seen_store=seen_store,
+                since=since,
+                until=until,
+                on_url=on_url
+            ),
+            concurrency=concurrency
+        )
+    else:
+        urls = get_news_urls_LaVoragine(
+            sitemap_url,
+            headers,
+            limit=limit,
+            seen_store=seen_store,
+            since=since,
+            until=until
+        )
+
+        data = run_outlet("LaVoragine", get_article_info_LaVoragine, headers, urls=urls, concurrency=concurrency)
+
+    if seen_store is not None:
+        seen_store.add_many([r["url"] for r in data], "LaVoragine")
+
+    return to_dataframe_LaVoragine(data)
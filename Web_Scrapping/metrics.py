@@ -0,0 +1,377 @@
+import os
+import json
+import math
+import time
+import random
+import threading
+import functools
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from dotenv import load_dotenv
+
+import profiling
+
+load_dotenv()
+
+'''
+Métricas por medio y por etapa de una corrida de get_all_news.
+
+Etapas:
+    - "sitemap":   peticiones HTTP del descubrimiento (sitemaps, listados).
+    - "discover":  descubrimiento completo del medio: lectura de sitemaps y
+                   filtrado de URLs (sección, ventana, vistas, límite).
+    - "fetch":     peticiones HTTP de artículos (cada intento, con sus
+                   reintentos).
+    - "parse":     decodificación del HTML, BeautifulSoup y extracción.
+    - "normalize": limpieza del registro y escritura (sink o to_df_*).
+
+Por cada (medio, etapa) se guardan: cantidad, errores, bytes, tiempo de
+reloj, tiempo de CPU del hilo, latencias (percentiles p50/p90/p99) y el
+histograma de códigos HTTP. La suma, la cantidad y el máximo de las
+latencias son exactos; los percentiles salen de una muestra uniforme de a
+lo sumo CRAWL_LATENCY_SAMPLES latencias por etapa (reservoir sampling), así
+la memoria no crece con la corrida.
+
+El medio y la etapa de cada hilo se fijan con `with context(medio,
+"fetch"):` (lo hacen el planificador y get_all_news); http_client reporta
+cada petición con observe_request() y los parsers miden con `with
+stage("parse"):`, sin conocer el medio. Si no hay una corrida activa
+(set_active) todas estas llamadas no hacen nada.
+
+Si está definida la variable de entorno CRAWL_METRICS_PATH (o el argumento
+metrics_path de get_all_news), al final de la corrida se escriben
+"<CRAWL_METRICS_PATH>.json" (resumen) y "<CRAWL_METRICS_PATH>.prom"
+(formato de texto de Prometheus, para el textfile collector de
+node_exporter o para comparar corridas); sin ella no se escribe nada. Las
+latencias van a Prometheus como summary: percentiles, _sum y _count.
+'''
+
+METRICS_PATH = os.getenv("CRAWL_METRICS_PATH")
+
+QUANTILES = (0.5, 0.9, 0.99)
+LATENCY_SAMPLES = int(os.getenv("CRAWL_LATENCY_SAMPLES", "4096"))
+
+_active = None
+_local = threading.local()
+
+
+def _percentile(values: list, q: float):
+    # values ya ordenados; percentil por el rango más cercano.
+    if not values:
+        return None
+    return values[max(0, math.ceil(q * len(values)) - 1)]
+
+
+class _Stage:
+    # Acumuladores de una etapa de un medio.
+    __slots__ = ("count", "errors", "bytes", "wall", "cpu", "latencies", "latency_count",
+                 "latency_sum", "latency_max", "status")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.latencies = []
+        self.latency_count = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.status = {}
+
+    def observe_latency(self, latency: float):
+        self.latency_count += 1
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        # Reservoir sampling (algoritmo R): cada latencia queda en la
+        # muestra con probabilidad LATENCY_SAMPLES / latency_count.
+        if len(self.latencies) < LATENCY_SAMPLES:
+            self.latencies.append(latency)
+        else:
+            slot = random.randrange(self.latency_count)
+            if slot < LATENCY_SAMPLES:
+                self.latencies[slot] = latency
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        summary = {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "wall_s": round(self.wall, 4),
+            "cpu_s": round(self.cpu, 4),
+        }
+        if latencies:
+            summary["latency_s"] = {
+                **{f"p{int(q * 100)}": round(_percentile(latencies, q), 4) for q in QUANTILES},
+                "max": round(self.latency_max, 4),
+                "mean": round(self.latency_sum / self.latency_count, 4),
+                "sum": round(self.latency_sum, 4),
+                "count": self.latency_count,
+            }
+        if self.status:
+            summary["status"] = dict(sorted(self.status.items()))
+        return summary
+
+
+class CrawlMetrics:
+    """
+    Colector de métricas de una corrida (seguro entre hilos).
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._start = time.monotonic()
+        self.duration = None
+        self.articles = {}
+        self.extra = {}
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, medio, name):
+        # Se llama con self._lock tomado.
+        key = (medio or "otros", name)
+        stage = self._stages.get(key)
+        if stage is None:
+            stage = self._stages[key] = _Stage()
+        return stage
+
+    def add(self, medio: str, name: str, items: int = 1, errors: int = 0, nbytes: int = 0,
+            wall: float = 0.0, cpu: float = 0.0, latency: float = None, status=None):
+        """
+        Suma una observación a la etapa `name` del medio.
+        """
+        with self._lock:
+            stage = self._stage(medio, name)
+            stage.count += items
+            stage.errors += errors
+            stage.bytes += nbytes
+            stage.wall += wall
+            stage.cpu += cpu
+            if latency is not None:
+                stage.observe_latency(latency)
+            if status is not None:
+                stage.status[str(status)] = stage.status.get(str(status), 0) + 1
+
+    def article(self, medio: str, n: int = 1):
+        """
+        Cuenta artículos entregados (escritos o retornados) del medio.
+        """
+        with self._lock:
+            self.articles[medio] = self.articles.get(medio, 0) + n
+
+    def finish(self):
+        self.duration = time.monotonic() - self._start
+
+    def summary(self):
+        """
+        Resumen de la corrida como dict (lo que se escribe en el JSON).
+        """
+        duration = self.duration if self.duration is not None else time.monotonic() - self._start
+        with self._lock:
+            outlets = {}
+            for (medio, name), stage in sorted(self._stages.items()):
+                outlets.setdefault(medio, {"articles": self.articles.get(medio, 0), "stages": {}})
+                outlets[medio]["stages"][name] = stage.summary()
+            for medio, n in self.articles.items():
+                outlets.setdefault(medio, {"articles": n, "stages": {}})
+            total = sum(self.articles.values())
+
+        return {
+            "started_at": self.started_at,
+            "duration_s": round(duration, 3),
+            "articles": total,
+            "articles_per_sec": round(total / duration, 3) if duration > 0 else None,
+            **self.extra,
+            "outlets": outlets,
+        }
+
+    def prometheus(self):
+        """
+        Métricas en formato de texto de Prometheus.
+        """
+        summary = self.summary()
+        lines = []
+
+        def sample(name, labels, value):
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is not None:
+                    sample(name, labels, value)
+
+        stages = [
+            (medio, name, data)
+            for medio, outlet in summary["outlets"].items()
+            for name, data in outlet["stages"].items()
+        ]
+
+        metric("crawl_duration_seconds", "gauge", "Duración de la corrida.",
+               [({}, summary["duration_s"])])
+        metric("crawl_articles_per_second", "gauge", "Artículos entregados por segundo.",
+               [({}, summary["articles_per_sec"])])
+        metric("crawl_articles_total", "counter", "Artículos entregados por medio.",
+               [({"medio": m}, o["articles"]) for m, o in summary["outlets"].items()])
+        metric("crawl_stage_items_total", "counter", "Elementos procesados por etapa.",
+               [({"medio": m, "stage": s}, d["count"]) for m, s, d in stages])
+        metric("crawl_stage_errors_total", "counter", "Errores por etapa.",
+               [({"medio": m, "stage": s}, d["errors"]) for m, s, d in stages])
+        metric("crawl_stage_bytes_total", "counter", "Bytes descargados por etapa.",
+               [({"medio": m, "stage": s}, d["bytes"]) for m, s, d in stages if d["bytes"]])
+        metric("crawl_stage_seconds_total", "counter", "Tiempo de reloj acumulado por etapa.",
+               [({"medio": m, "stage": s}, d["wall_s"]) for m, s, d in stages])
+        metric("crawl_stage_cpu_seconds_total", "counter", "Tiempo de CPU acumulado por etapa.",
+               [({"medio": m, "stage": s}, d["cpu_s"]) for m, s, d in stages])
+        metric("crawl_http_responses_total", "counter", "Respuestas HTTP por código.",
+               [({"medio": m, "stage": s, "status": code}, n)
+                for m, s, d in stages for code, n in d.get("status", {}).items()])
+
+        name = "crawl_stage_latency_seconds"
+        metric(name, "summary", "Latencia por etapa.", [])
+        for m, s, d in stages:
+            latency = d.get("latency_s")
+            if not latency:
+                continue
+            for q in QUANTILES:
+                sample(name, {"medio": m, "stage": s, "quantile": str(q)}, latency[f"p{int(q * 100)}"])
+            sample(f"{name}_sum", {"medio": m, "stage": s}, latency["sum"])
+            sample(f"{name}_count", {"medio": m, "stage": s}, latency["count"])
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """
+        Escribe "<path>.json" y "<path>.prom".
+
+        Retorna:
+            tuple[str, str]: rutas escritas.
+        """
+        json_path, prom_path = f"{path}.json", f"{path}.prom"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, ensure_ascii=False, indent=2)
+        # Reemplazo atómico: el collector de Prometheus no lee archivos a medias.
+        with open(f"{prom_path}.tmp", "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(f"{prom_path}.tmp", prom_path)
+        return json_path, prom_path
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ---------- Corrida activa y contexto por hilo ----------
+
+def set_active(collector):
+    """
+    Activa (o desactiva con None) el colector que reciben las llamadas de
+    este módulo.
+    """
+    global _active
+    _active = collector
+
+
+def get_active():
+    return _active
+
+
+@contextmanager
+def context(medio: str = None, http_stage: str = None):
+    """
+    Fija el medio y la etapa de las peticiones HTTP del hilo actual.
+    """
+    previous = getattr(_local, "context", (None, None))
+    _local.context = (medio or previous[0], http_stage or previous[1])
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+def current_context():
+    return getattr(_local, "context", (None, None))
+
+
+def bind(func):
+    """
+    Envuelve func para que corra con el contexto del hilo que la envuelve.
+    """
+    medio, http_stage = current_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with context(medio, http_stage):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def stage(name: str, items: int = 1, medio: str = None):
+    """
+    Mide tiempo de reloj y de CPU del bloque como etapa `name` del medio
+    del contexto. Si el bloque lanza una excepción cuenta como error.
+    Con el perfilado activo (profiling.py) el bloque también se perfila
+    como "<name>-<medio>".
+    """
+    collector = _active
+    if collector is None and profiling.get_active() is None:
+        yield
+        return
+
+    medio = medio or current_context()[0]
+    with profiling.stage(name, medio):
+        if collector is None:
+            yield
+            return
+
+        start, cpu = time.perf_counter(), time.thread_time()
+        error = 0
+        try:
+            yield
+        except BaseException:
+            error = 1
+            raise
+        finally:
+            wall = time.perf_counter() - start
+            collector.add(
+                medio, name, items=items, errors=error, wall=wall,
+                cpu=time.thread_time() - cpu, latency=wall if items else None
+            )
+
+
+def add(medio: str, name: str, **kwargs):
+    """
+    CrawlMetrics.add sobre la corrida activa (no hace nada sin corrida).
+    """
+    collector = _active
+    if collector is not None:
+        collector.add(medio, name, **kwargs)
+
+
+def article(medio: str, n: int = 1):
+    """
+    CrawlMetrics.article sobre la corrida activa.
+    """
+    collector = _active
+    if collector is not None:
+        collector.article(medio, n)
+
+
+def observe_request(status=None, latency: float = None, nbytes: int = 0, error: str = None):
+    """
+    Registra un intento HTTP en la etapa HTTP del contexto (por defecto
+    "fetch"). status es el código, o el nombre de la excepción si falló.
+    """
+    collector = _active
+    if collector is None:
+        return
+    medio, http_stage = current_context()
+    collector.add(
+        medio, http_stage or "fetch",
+        errors=1 if error or (status is not None and status >= 400) else 0,
+        nbytes=nbytes, wall=latency or 0.0, latency=latency, status=error or status
+    )
@@ -0,0 +1,620 @@
+import os
+import re
+import sys
+import json
+import glob
+import math
+import hashlib
+import time
+import random
+import argparse
+import threading
+import requests
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from dotenv import load_dotenv
+
+load_dotenv()
+
+'''
+Servidor local que imita a los ocho medios de SITEMAPS, para pruebas de
+carga de punta a punta sin red y sin golpear los sitios reales.
+
+Cada medio se sirve con la misma forma de descubrimiento que usa su
+scraper:
+    - ElNuevoSiglo: dos páginas de sitemap (sitemap.xml?page=1 y 2).
+    - LaVoragine y Pacifista: un post-sitemap.xml con todo el corpus.
+    - CuestionPublica y LaSillaVacia: sitemap_index.xml con hijos de
+      MOCK_SITEMAP_SIZE URLs (más un hijo de páginas que no son artículos).
+    - LaFM, CeroSetenta y SemanarioVoz: una página de listado con el
+      marcado que lee su scraper.
+Los sitemaps y listados intercalan URLs de otras secciones (una de cada
+MOCK_NOISE_EVERY) para que los filtros de cada medio trabajen. Los
+sitemaps se generan al vuelo y se envían por bloques (chunked), así un
+corpus de cientos de miles de URLs no ocupa memoria en el servidor.
+
+Los artículos son las páginas de fixtures/<medio>/ (sintéticas o grabadas
+con `benchmark_extractors.py --record`), rotadas por número de artículo y
+con el número agregado al <h1> para que cada página sea distinta.
+
+Fallas configurables (argumentos o variables MOCK_*):
+    - latencia log-normal (mediana y sigma) por petición, con mediana
+      propia por medio (--outlet-latency LaFM=200),
+    - una fracción de respuestas lentas (cola larga),
+    - errores 5xx y conexiones cortadas sin respuesta,
+    - capacidad por host en peticiones por segundo: lo que la supera
+      recibe 429 con Retry-After; además 429 aleatorios opcionales.
+
+Cada respuesta 200 lleva un ETag (el mismo mientras no cambie el corpus)
+y una petición con If-None-Match que coincide recibe 304 sin cuerpo, para
+probar la caché condicional (http_cache).
+
+Los scrapers piden las URLs reales (https://www.lafm.com.co/...); la
+MockSession de este módulo, inyectada con http_client.set_session, las
+reescribe a http://127.0.0.1:<puerto>/<host>/<ruta>. Así el limitador por
+host, la caché y las métricas ven los mismos hosts que en producción.
+GET /_stats retorna las peticiones servidas por medio y código.
+
+Uso:
+    python mock_sites.py --port 8800 --articles 100000 --latency 80 --capacity 20
+    (o con benchmark_crawl.py, que lo levanta en otro proceso)
+'''
+
+MOCK_PORT = int(os.getenv("MOCK_PORT", "8800"))
+MOCK_ARTICLES = int(os.getenv("MOCK_ARTICLES", "1000"))
+MOCK_SITEMAP_SIZE = int(os.getenv("MOCK_SITEMAP_SIZE", "1000"))
+MOCK_NOISE_EVERY = int(os.getenv("MOCK_NOISE_EVERY", "10"))
+MOCK_LATENCY_MS = float(os.getenv("MOCK_LATENCY_MS", "50"))
+MOCK_LATENCY_SIGMA = float(os.getenv("MOCK_LATENCY_SIGMA", "0.5"))
+MOCK_SLOW_RATE = float(os.getenv("MOCK_SLOW_RATE", "0"))
+MOCK_SLOW_S = float(os.getenv("MOCK_SLOW_S", "2"))
+MOCK_ERROR_RATE = float(os.getenv("MOCK_ERROR_RATE", "0"))
+MOCK_DROP_RATE = float(os.getenv("MOCK_DROP_RATE", "0"))
+MOCK_CAPACITY = float(os.getenv("MOCK_CAPACITY", "0"))
+MOCK_THROTTLE_RATE = float(os.getenv("MOCK_THROTTLE_RATE", "0"))
+
+FIXTURES_DIR = os.getenv(
+    "EXTRACTOR_FIXTURES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+)
+
+STATS_PATH = "/_stats"
+
+# Forma de cada medio: cómo se descubre ("pages", "urlset", "index" o
+# "listing"), la ruta de sus artículos y la de las URLs que su filtro
+# debe descartar (None si el medio no filtra). {i} es el número de
+# artículo (0 = el más reciente).
+SITES = {
+    "www.elnuevosiglo.com.co": {
+        "medio": "ElNuevoSiglo", "kind": "pages", "path": "/sitemap.xml", "pages": 2,
+        "article": "/politica/nota-{i}", "noise": "/economia/nota-{i}",
+    },
+    "www.lafm.com.co": {
+        "medio": "LaFM", "kind": "listing", "path": "/politica",
+        "article": "/politica/nota-{i}", "noise": "/deportes/nota-{i}",
+    },
+    "voragine.co": {
+        "medio": "LaVoragine", "kind": "urlset", "path": "/post-sitemap.xml",
+        "article": "/politica/historia-{i}/", "noise": "/cultura/historia-{i}/",
+    },
+    "cerosetenta.uniandes.edu.co": {
+        "medio": "CeroSetenta", "kind": "listing", "path": "/tema/politica/",
+        "article": "/nota-{i}/", "noise": "/autor/autor-{i}/",
+    },
+    "semanariovoz.com": {
+        "medio": "SemanarioVoz", "kind": "listing", "path": "/category/politica/",
+        "article": "/nota-{i}/", "noise": "/category/cultura/pagina-{i}/",
+    },
+    "cuestionpublica.com": {
+        "medio": "CuestionPublica", "kind": "index", "path": "/sitemap_index.xml",
+        "article": "/investigacion-{i}/", "noise": None,
+    },
+    "pacifista.tv": {
+        "medio": "Pacifista", "kind": "urlset", "path": "/post-sitemap.xml",
+        "article": "/actualidad/nota-{i}/", "noise": "/wp-content/uploads/foto-{i}.jpg",
+    },
+    "www.lasillavacia.com": {
+        "medio": "LaSillaVacia", "kind": "index", "path": "/sitemap_index.xml",
+        "article": "/silla-nacional/politica/nota-{i}/", "noise": "/podcasts/politica/episodio-{i}/",
+    },
+}
+
+# Fecha del artículo 0; cada artículo siguiente es 30 minutos más antiguo.
+_EPOCH = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+_CHUNK = 64 * 1024
+
+
+def lastmod(i: int):
+    return (_EPOCH - timedelta(minutes=30 * i)).isoformat()
+
+
+def _path_regex(template: str):
+    return re.compile("^" + re.escape(template).replace(re.escape("{i}"), r"(\d+)") + "$")
+
+
+class MockSites:
+    """
+    Estado del servidor: corpus, plantillas de artículo, fallas y conteos.
+
+    Recibe:
+        articles (int): artículos por medio.
+        sitemap_size (int): URLs por sitemap hijo de un índice.
+        latency_ms (float): mediana de la latencia por petición.
+        sigma (float): dispersión de la latencia log-normal (0 = fija).
+        outlet_latency (dict): {medio: mediana en ms} que reemplaza latency_ms.
+        slow_rate (float): fracción de peticiones con slow_s segundos extra.
+        slow_s (float): demora de las peticiones lentas.
+        error_rate (float): fracción de respuestas 5xx.
+        drop_rate (float): fracción de conexiones cortadas sin respuesta.
+        capacity (float): peticiones por segundo por host (0 = sin tope);
+            el exceso recibe 429.
+        throttle_rate (float): fracción de 429 aleatorios.
+        fixtures_dir (str): carpeta con las páginas de artículo por medio.
+        seed (int): semilla de las fallas (reproducibles por corrida).
+    """
+
+    def __init__(
+        self,
+        articles: int = MOCK_ARTICLES,
+        sitemap_size: int = MOCK_SITEMAP_SIZE,
+        latency_ms: float = MOCK_LATENCY_MS,
+        sigma: float = MOCK_LATENCY_SIGMA,
+        outlet_latency: dict = None,
+        slow_rate: float = MOCK_SLOW_RATE,
+        slow_s: float = MOCK_SLOW_S,
+        error_rate: float = MOCK_ERROR_RATE,
+        drop_rate: float = MOCK_DROP_RATE,
+        capacity: float = MOCK_CAPACITY,
+        throttle_rate: float = MOCK_THROTTLE_RATE,
+        fixtures_dir: str = FIXTURES_DIR,
+        seed: int = None
+        ):
+        self.articles = articles
+        self.sitemap_size = max(1, sitemap_size)
+        self.latency_ms = latency_ms
+        self.sigma = sigma
+        self.outlet_latency = outlet_latency or {}
+        self.slow_rate = slow_rate
+        self.slow_s = slow_s
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.capacity = capacity
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.templates = {site["medio"]: _load_templates(fixtures_dir, site["medio"]) for site in SITES.values()}
+        self.article_paths = {host: _path_regex(site["article"]) for host, site in SITES.items()}
+        self.stats = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    # ---------- Fallas ----------
+
+    def roll(self, rate: float):
+        """
+        True con probabilidad rate.
+        """
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self.random.random() < rate
+
+    def error_status(self):
+        with self._lock:
+            return self.random.choice((500, 502, 503, 504))
+
+    def latency(self, medio: str):
+        """
+        Segundos de espera antes de responder.
+        """
+        median = self.outlet_latency.get(medio, self.latency_ms) / 1000
+        with self._lock:
+            seconds = self.random.lognormvariate(math.log(median), self.sigma) if median > 0 and self.sigma > 0 else median
+            if self.slow_rate > 0 and self.random.random() < self.slow_rate:
+                seconds += self.slow_s
+        return seconds
+
+    def throttled(self, host: str):
+        """
+        Indica si la petición supera la capacidad del host (token bucket
+        con ráfaga de un segundo) o cae en un 429 aleatorio.
+        """
+        if self.roll(self.throttle_rate):
+            return True
+        if self.capacity <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            tokens, refilled = self._buckets.get(host, (self.capacity, now))
+            tokens = min(max(1.0, self.capacity), tokens + (now - refilled) * self.capacity)
+            if tokens < 1:
+                self._buckets[host] = (tokens, now)
+                return True
+            self._buckets[host] = (tokens - 1, now)
+            return False
+
+    def count(self, medio: str, status, nbytes: int = 0):
+        with self._lock:
+            outlet = self.stats.setdefault(medio, {"requests": 0, "bytes": 0, "status": {}})
+            outlet["requests"] += 1
+            outlet["bytes"] += nbytes
+            outlet["status"][str(status)] = outlet["status"].get(str(status), 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return json.loads(json.dumps(self.stats))
+
+    # ---------- Contenido ----------
+
+    def _urls(self, host: str, start: int, stop: int):
+        # (url, lastmod) de los artículos [start, stop), con ruido intercalado.
+        site = SITES[host]
+        for i in range(start, min(stop, self.articles)):
+            yield f"https://{host}{site['article'].format(i=i)}", lastmod(i)
+            if site["noise"] and MOCK_NOISE_EVERY and i % MOCK_NOISE_EVERY == MOCK_NOISE_EVERY - 1:
+                yield f"https://{host}{site['noise'].format(i=i)}", lastmod(i)
+
+    def urlset(self, host: str, start: int, stop: int):
+        """
+        Generador de bloques de un <urlset> con los artículos [start, stop).
+        """
+        yield (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        ).encode()
+        lines = []
+        size = 0
+        for url, mod in self._urls(host, start, stop):
+            line = f"<url><loc>{url}</loc><lastmod>{mod}</lastmod></url>\n"
+            lines.append(line)
+            size += len(line)
+            if size >= _CHUNK:
+                yield "".join(lines).encode()
+                lines, size = [], 0
+        lines.append("</urlset>\n")
+        yield "".join(lines).encode()
+
+    def sitemap_index(self, host: str):
+        children = math.ceil(self.articles / self.sitemap_size)
+        entries = [
+            f"<sitemap><loc>https://{host}/post-sitemap{k + 1}.xml</loc>"
+            f"<lastmod>{lastmod(k * self.sitemap_size)}</lastmod></sitemap>\n"
+            for k in range(children)
+        ]
+        # Hijo que no aporta artículos (páginas institucionales).
+        entries.append(f"<sitemap><loc>https://{host}/page-sitemap.xml</loc><lastmod>{lastmod(0)}</lastmod></sitemap>\n")
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            + "".join(entries) + "</sitemapindex>\n"
+        ).encode()
+
+    def page_sitemap(self, host: str):
+        pages = "".join(
+            f"<url><loc>https://{host}/{slug}/</loc><lastmod>{lastmod(0)}</lastmod></url>\n"
+            for slug in ("quienes-somos", "contacto", "terminos", "wp-content/uploads/logo.png")
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+            + pages + "</urlset>\n"
+        ).encode()
+
+    def listing(self, host: str):
+        """
+        Generador de bloques de la página de listado del medio, con el
+        marcado que lee su scraper.
+        """
+        site = SITES[host]
+        medio = site["medio"]
+        yield f"<!DOCTYPE html><html lang='es'><head><meta charset='utf-8'><title>{medio}</title></head><body><main>".encode()
+        parts = []
+        size = 0
+        noise = _path_regex(site["noise"]) if site["noise"] else None
+        for url, _ in self._urls(host, 0, self.articles):
+            path = urlsplit(url).path
+            if noise is not None and noise.match(path):
+                # Enlaces de menú y autores: el scraper no los toma.
+                item = f"<div class='menu'><a href='{url}'>{path}</a></div>"
+            elif medio == "LaFM":
+                item = f"<div class='card'><a href='{path}'><h3>{path}</h3></a></div>"
+            elif medio == "CeroSetenta":
+                item = f"<article><a href='{url}'><h2>{path}</h2></a></article>"
+            else:
+                item = f"<div class='td-module-container'><a href='{url}'>{path}</a></div>"
+            parts.append(item)
+            size += len(item)
+            if size >= _CHUNK:
+                yield "".join(parts).encode()
+                parts, size = [], 0
+        parts.append("</main></body></html>")
+        yield "".join(parts).encode()
+
+    def article(self, host: str, path: str):
+        """
+        Página del artículo, o None si la ruta no es un artículo del corpus.
+        """
+        match = self.article_paths[host].match(path)
+        templates = self.templates[SITES[host]["medio"]]
+        if match is None or not templates:
+            return None
+        i = int(match.group(1))
+        if i >= self.articles:
+            return None
+        head, tail = templates[i % len(templates)]
+        return head + f" #{i}".encode() + tail
+
+    def etag(self, host: str, path: str, query: str):
+        """
+        Validador de una ruta: cambia solo si cambia el tamaño del corpus.
+        """
+        key = f"{host}/{path}?{query}#{self.articles}/{self.sitemap_size}"
+        return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16] + '"'
+
+    def route(self, host: str, path: str, query: str):
+        """
+        Resuelve una ruta de un medio.
+
+        Retorna:
+            tuple[str, bytes | generador] | None: (content-type, cuerpo).
+        """
+        site = SITES[host]
+        xml = "application/xml; charset=UTF-8"
+        html = "text/html; charset=UTF-8"
+
+        if path == site["path"]:
+            if site["kind"] == "pages":
+                page = int(parse_qs(query).get("page", ["1"])[0])
+                per_page = math.ceil(self.articles / site["pages"])
+                return xml, self.urlset(host, (page - 1) * per_page, page * per_page)
+            if site["kind"] == "urlset":
+                return xml, self.urlset(host, 0, self.articles)
+            if site["kind"] == "index":
+                return xml, self.sitemap_index(host)
+            return html, self.listing(host)
+
+        if site["kind"] == "index":
+            match = re.match(r"^/post-sitemap(\d+)\.xml$", path)
+            if match:
+                k = int(match.group(1)) - 1
+                return xml, self.urlset(host, k * self.sitemap_size, (k + 1) * self.sitemap_size)
+            if path == "/page-sitemap.xml":
+                return xml, self.page_sitemap(host)
+
+        body = self.article(host, path)
+        return (html, body) if body is not None else None
+
+
+def _load_templates(fixtures_dir: str, medio: str):
+    # Páginas del medio partidas en el primer </h1>: (antes, desde </h1>).
+    templates = []
+    for path in sorted(glob.glob(os.path.join(fixtures_dir, medio, "*.html"))):
+        with open(path, "rb") as f:
+            html = f.read()
+        cut = html.find(b"</h1>")
+        if cut < 0:
+            cut = len(html)
+        templates.append((html[:cut], html[cut:]))
+    if not templates:
+        print(f"⚠️ Sin páginas de artículo para {medio} en {fixtures_dir}")
+    return templates
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    sites = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == STATS_PATH:
+            self._send(200, "application/json", json.dumps(self.sites.snapshot()).encode())
+            return
+
+        host, _, path = parts.path.lstrip("/").partition("/")
+        site = SITES.get(host)
+        if site is None:
+            self._send(404, "text/plain", b"host desconocido")
+            return
+        medio = site["medio"]
+
+        if self.sites.throttled(host):
+            self.sites.count(medio, 429)
+            self._send(429, "text/plain", b"Too Many Requests", {"Retry-After": "1"})
+            return
+
+        time.sleep(self.sites.latency(medio))
+
+        if self.sites.roll(self.sites.drop_rate):
+            self.sites.count(medio, "drop")
+            self.close_connection = True
+            return
+        if self.sites.roll(self.sites.error_rate):
+            status = self.sites.error_status()
+            self.sites.count(medio, status)
+            self._send(status, "text/plain", b"error simulado")
+            return
+
+        found = self.sites.route(host, "/" + path, parts.query)
+        if found is None:
+            self.sites.count(medio, 404)
+            self._send(404, "text/html", b"<html><body>No encontrado</body></html>")
+            return
+
+        content_type, body = found
+        etag = self.sites.etag(host, path, parts.query)
+        if self.headers.get("If-None-Match") == etag:
+            self.sites.count(medio, 304)
+            self._send(304, content_type, b"", {"ETag": etag})
+            return
+        nbytes = self._send(200, content_type, body, {"ETag": etag})
+        self.sites.count(medio, 200, nbytes)
+
+    def _send(self, status: int, content_type: str, body, headers: dict = None):
+        # Cuerpos en bytes con Content-Length; generadores en chunked.
+        # Retorna los bytes de cuerpo enviados.
+        nbytes = 0
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if isinstance(body, bytes):
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return len(body)
+
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for chunk in body:
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                nbytes += len(chunk)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # El cliente cortó la lectura (un sitemap leído hasta el límite,
+            # un plazo vencido): es lo esperado, no un error del servidor.
+            self.close_connection = True
+        return nbytes
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def make_server(sites: MockSites, port: int = MOCK_PORT, host: str = "127.0.0.1"):
+    """
+    Crea el servidor HTTP de los medios simulados (serve_forever() lo
+    atiende; cada conexión en su propio hilo).
+    """
+    handler = type("MockSitesHandler", (_Handler,), {"sites": sites})
+    return _Server((host, port), handler)
+
+
+class MockSession:
+    """
+    Sesión que redirige las URLs de los medios al servidor simulado.
+
+    Se inyecta con http_client.set_session(MockSession(base_url)). La
+    respuesta conserva la URL original en resp.url. Registra la latencia
+    de cada petición (hasta los headers) en `latencies`.
+
+    Recibe:
+        base_url (str): "http://127.0.0.1:8800".
+        pool_maxsize (int): conexiones simultáneas al servidor (todos los
+            medios comparten el mismo host real).
+    """
+
+    def __init__(self, base_url: str, pool_maxsize: int = 64):
+        # Import local: el servidor corre sin la capa HTTP del scraping.
+        import http_client
+
+        self.base_url = base_url.rstrip("/")
+        self.session = http_client.create_session(pool_maxsize=pool_maxsize)
+        self.latencies = []
+
+    def rewrite(self, url: str):
+        parts = urlsplit(url)
+        target = f"{self.base_url}/{parts.netloc}{parts.path or '/'}"
+        return f"{target}?{parts.query}" if parts.query else target
+
+    def get(self, url: str, **kwargs):
+        start = time.perf_counter()
+        resp = self.session.get(self.rewrite(url), **kwargs)
+        self.latencies.append(time.perf_counter() - start)
+        resp.url = url
+        return resp
+
+    def server_stats(self):
+        """
+        Conteos del servidor (GET /_stats).
+        """
+        return requests.get(self.base_url + STATS_PATH, timeout=5).json()
+
+
+def _parse_outlet_latency(values):
+    latency = {}
+    for value in values or []:
+        medio, _, ms = value.partition("=")
+        latency[medio] = float(ms)
+    return latency
+
+
+def add_fault_arguments(parser):
+    """
+    Argumentos de corpus y fallas (los comparte benchmark_crawl.py).
+    """
+    parser.add_argument("--articles", type=int, default=MOCK_ARTICLES, help="artículos por medio")
+    parser.add_argument("--sitemap-size", type=int, default=MOCK_SITEMAP_SIZE, help="URLs por sitemap hijo")
+    parser.add_argument("--latency", type=float, default=MOCK_LATENCY_MS, help="mediana de latencia (ms)")
+    parser.add_argument("--sigma", type=float, default=MOCK_LATENCY_SIGMA, help="dispersión log-normal de la latencia")
+    parser.add_argument("--outlet-latency", action="append", metavar="MEDIO=MS", help="mediana propia de un medio")
+    parser.add_argument("--slow-rate", type=float, default=MOCK_SLOW_RATE, help="fracción de respuestas lentas")
+    parser.add_argument("--slow", type=float, default=MOCK_SLOW_S, help="segundos extra de una respuesta lenta")
+    parser.add_argument("--error-rate", type=float, default=MOCK_ERROR_RATE, help="fracción de respuestas 5xx")
+    parser.add_argument("--drop-rate", type=float, default=MOCK_DROP_RATE, help="fracción de conexiones cortadas")
+    parser.add_argument("--capacity", type=float, default=MOCK_CAPACITY, help="peticiones/s por host (0 = sin tope)")
+    parser.add_argument("--throttle-rate", type=float, default=MOCK_THROTTLE_RATE, help="fracción de 429 aleatorios")
+    parser.add_argument("--seed", type=int, help="semilla de las fallas")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="carpeta de páginas de artículo")
+
+
+def fault_argv(args):
+    """
+    Lista de argumentos de add_fault_arguments para relanzar el servidor.
+    """
+    argv = [
+        "--articles", str(args.articles), "--sitemap-size", str(args.sitemap_size),
+        "--latency", str(args.latency), "--sigma", str(args.sigma),
+        "--slow-rate", str(args.slow_rate), "--slow", str(args.slow),
+        "--error-rate", str(args.error_rate), "--drop-rate", str(args.drop_rate),
+        "--capacity", str(args.capacity), "--throttle-rate", str(args.throttle_rate),
+        "--fixtures", args.fixtures,
+    ]
+    for value in args.outlet_latency or []:
+        argv += ["--outlet-latency", value]
+    if args.seed is not None:
+        argv += ["--seed", str(args.seed)]
+    return argv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Medios simulados para pruebas de carga")
+    parser.add_argument("--port", type=int, default=MOCK_PORT)
+    parser.add_argument("--host", default="127.0.0.1")
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    sites = MockSites(
+        articles=args.articles,
+        sitemap_size=args.sitemap_size,
+        latency_ms=args.latency,
+        sigma=args.sigma,
+        outlet_latency=_parse_outlet_latency(args.outlet_latency),
+        slow_rate=args.slow_rate,
+        slow_s=args.slow,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        capacity=args.capacity,
+        throttle_rate=args.throttle_rate,
+        fixtures_dir=args.fixtures,
+        seed=args.seed,
+    )
+    server = make_server(sites, args.port, args.host)
+    print(f"🧪 Medios simulados en http://{args.host}:{server.server_port} "
+          f"({args.articles} artículos por medio)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+'''
+Control de tráfico de cada medio: host, tasa y concurrencia de descarga.
+
+Es la única definición de estos topes: SITEMAPS (datos.py) los incorpora
+en la entrada de cada medio para get_all_news, y los get_news_* de cada
+módulo los usan a través de scheduler.run_outlet, así un medio se descarga
+con los mismos límites solo o dentro de la corrida completa.
+
+    - "host":        host de los artículos del medio (clave del limitador).
+    - "rate":        peticiones por segundo iniciales al host (token bucket).
+    - "concurrency": descargas de artículos simultáneas iniciales (tope
+                     del medio en el planificador).
+    - "max_rate", "max_concurrency": techos hasta donde el control AIMD
+                     (rate_limit.py) sube la tasa y la concurrencia mientras
+                     el medio responde bien; ante 429/503 o picos de
+                     latencia baja.
+'''
+
+TRAFFIC = {
+    "ElNuevoSiglo": {
+        "host": "www.elnuevosiglo.com.co",
+        "rate": 4,
+        "max_rate": 12,
+        "concurrency": 6,
+        "max_concurrency": 10,
+    },
+
+    "LaFM": {
+        "host": "www.lafm.com.co",
+        "rate": 8,
+        "max_rate": 30,
+        "concurrency": 8,
+        "max_concurrency": 16,
+    },
+
+    "LaVoragine": {
+        "host": "voragine.co",
+        "rate": 2,
+        "max_rate": 6,
+        "concurrency": 4,
+        "max_concurrency": 6,
+    },
+
+    "CeroSetenta": {
+        "host": "cerosetenta.uniandes.edu.co",
+        "rate": 2,
+        "max_rate": 6,
+        "concurrency": 4,
+        "max_concurrency": 6,
+    },
+
+    "SemanarioVoz": {
+        "host": "semanariovoz.com",
+        "rate": 2,
+        "max_rate": 6,
+        "concurrency": 4,
+        "max_concurrency": 6,
+    },
+
+    "CuestionPublica": {
+        "host": "cuestionpublica.com",
+        "rate": 2,
+        "max_rate": 6,
+        "concurrency": 4,
+        "max_concurrency": 6,
+    },
+
+    "Pacifista": {
+        "host": "pacifista.tv",
+        "rate": 2,
+        "max_rate": 6,
+        "concurrency": 4,
+        "max_concurrency": 6,
+    },
+
+    "LaSillaVacia": {
+        "host": "www.lasillavacia.com",
+        "rate": 4,
+        "max_rate": 10,
+        "concurrency": 6,
+        "max_concurrency": 10,
+    },
+}
@@ -0,0 +1,152 @@
+import os
+from bs4 import BeautifulSoup
+from bs4.filter import ElementFilter
+from dotenv import load_dotenv
+
+load_dotenv()
+
+'''
+Parseo de HTML compartido por los extractores de artículos.
+
+El backend se elige con la variable de entorno HTML_PARSER:
+    - "auto" (por defecto): lxml si está instalado, si no html.parser.
+    - "lxml": parser en C, varias veces más rápido que html.parser.
+    - "html.parser": parser de la librería estándar (sin dependencias).
+
+Además cada extractor declara las partes de la página que realmente lee
+(título, metas, contenedor del cuerpo, tags, ...). Con make_soup(html,
+only=...) solo se construyen esos subárboles: el menú, los comentarios,
+los scripts de publicidad y el pie de página se saltan sin crear objetos
+Tag, que es donde se va la mayor parte del tiempo de BeautifulSoup. Con
+HTML_PARSE_SUBTREE=0 se vuelve a construir el documento completo.
+'''
+
+HTML_PARSER = os.getenv("HTML_PARSER", "auto")
+HTML_PARSE_SUBTREE = os.getenv("HTML_PARSE_SUBTREE", "1") != "0"
+
+
+def resolve_parser(name: str = HTML_PARSER):
+    """
+    Traduce el nombre de backend a uno que BeautifulSoup pueda usar.
+
+    Recibe:
+        name (str): "auto", "lxml", "html.parser" o cualquier otro
+            backend soportado por BeautifulSoup.
+
+    Retorna:
+        str: nombre del backend.
+    """
+    if name != "auto":
+        return name
+    try:
+        import lxml  # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+PARSER = resolve_parser()
+
+
+_MULTI_VALUED = ("class", "rel")
+
+
+def _compile_check(attr: str, expected):
+    if expected is not True:
+        expected = frozenset([expected] if isinstance(expected, str) else expected)
+    return (attr, expected, attr in _MULTI_VALUED)
+
+
+def _check(attrs: dict, attr: str, expected, multi: bool):
+    value = attrs.get(attr)
+    if value is None:
+        return False
+    if expected is True:
+        return True
+    if multi:
+        tokens = value.split() if isinstance(value, str) else value
+        return not expected.isdisjoint(tokens)
+    return value in expected
+
+
+class SubtreeStrainer(ElementFilter):
+    """
+    Filtro de parseo que solo crea los elementos descritos por `rules`
+    (y todo lo que contienen).
+
+    Recibe:
+        rules (list[tuple]): pares (nombre, atributos). nombre es un str,
+            una lista de str o None (cualquier etiqueta); atributos es un
+            dict {atributo: valor} donde valor puede ser un str, una lista
+            de str (cualquiera sirve) o True (basta con que exista). Para
+            "class" y "rel" se compara contra cada valor del atributo.
+    """
+
+    def __init__(self, rules: list):
+        super().__init__()
+        # Las reglas se agrupan por nombre de etiqueta: cada elemento del
+        # documento solo se compara con las reglas que le pueden aplicar.
+        # Las reglas que solo piden una clase se funden en una sola por
+        # etiqueta (basta con que el elemento tenga alguna de las clases).
+        self.rules = rules
+        self.by_name = {}
+        self.any_name = []
+        classes = {}
+        for name, attrs in rules:
+            attrs = attrs or {}
+            names = [name] if name is None or isinstance(name, str) else name
+            if list(attrs) == ["class"]:
+                expected = attrs["class"]
+                for n in names:
+                    classes.setdefault(n, set()).update(
+                        [expected] if isinstance(expected, str) else expected
+                    )
+                continue
+            checks = tuple(_compile_check(a, e) for a, e in attrs.items())
+            for n in names:
+                self._add(n, checks)
+        for n, expected in classes.items():
+            self._add(n, (_compile_check("class", expected),))
+
+    def _add(self, name, checks):
+        if name is None:
+            self.any_name.append(checks)
+        else:
+            self.by_name.setdefault(name, []).append(checks)
+
+    @property
+    def includes_everything(self):
+        return False
+
+    @property
+    def excludes_everything(self):
+        return not self.rules
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        attrs = attrs or {}
+        for candidates in (self.by_name.get(name, ()), self.any_name):
+            for checks in candidates:
+                if all(_check(attrs, *c) for c in checks):
+                    return True
+        return False
+
+    def allow_string_creation(self, string):
+        # Solo se evalúa para texto fuera de los subárboles aceptados.
+        return False
+
+
+def make_soup(html: str, only: list = None, parser: str = None):
+    """
+    Parsea HTML con el backend configurado.
+
+    Recibe:
+        html (str): documento.
+        only (list): reglas de SubtreeStrainer con las partes que lee el
+            extractor. None construye el documento completo.
+        parser (str): backend a usar en lugar de HTML_PARSER.
+
+    Retorna:
+        BeautifulSoup
+    """
+    parse_only = SubtreeStrainer(only) if only and HTML_PARSE_SUBTREE else None
+    return BeautifulSoup(html, parser or PARSER, parse_only=parse_only)
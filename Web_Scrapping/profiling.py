@@ -0,0 +1,347 @@
+import os
+import sys
+import json
+import time
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from dotenv import load_dotenv
+
+load_dotenv()
+
+'''
+Perfilado opcional de las etapas pesadas del scraping, la limpieza y la
+tokenización.
+
+Se activa con la variable de entorno PROFILE_DIR (o con el argumento
+profile_dir de get_all_news); sin ella todas las funciones de este módulo
+no hacen nada. Cada corrida perfilada crea una carpeta
+"<PROFILE_DIR>/<nombre>-<fecha>/" con:
+
+    - "<etapa>[-<medio>].prof": perfil de cada fase, de cada etapa y de
+      cada extractor, sumando todos los hilos. Se abre con
+      `python -m pstats archivo.prof`, snakeviz o gprof2dot. En el perfil
+      de "parse-<medio>" se ve por separado cuánto se va en resp.text
+      (detección del charset), en BeautifulSoup y en la extracción.
+    - "<fase>.snap": instantánea de tracemalloc al final de cada fase
+      (tracemalloc.Snapshot.load) y "<fase>-memoria.txt" con las líneas
+      que más memoria retienen.
+    - "resumen.json": por fase, tiempo de reloj y de CPU, pico de memoria
+      de Python (tracemalloc) y pico de RSS del proceso; por etapa, las
+      muestras y las funciones con más tiempo propio.
+
+Los perfiles son por muestreo: un único hilo toma la pila de cada hilo que
+está dentro de una etapa o fase cada PROFILE_INTERVAL_MS y la asigna al
+bloque más interno de ese hilo. Así las etapas de todos los hilos se
+perfilan a la vez (cProfile no lo permite desde Python 3.12: solo admite un
+perfil activo por proceso) y el costo no depende de cuántas funciones se
+llamen. En los .prof los tiempos son muestras × intervalo (tiempo de
+pared dentro del bloque, incluida la espera por red o por el GIL) y las
+"llamadas" son muestras.
+
+Las fases (phase) son secuenciales, en el hilo que las abre; la memoria
+solo se mide por fase porque tracemalloc es global al proceso. tracemalloc
+hace más lento el parseo (~2x): con PROFILE_MEMORY=0 se mide solo CPU y
+RSS, y con PROFILE_FRAMES > 1 las instantáneas guardan trazas más largas.
+'''
+
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+PROFILE_MEMORY = os.getenv("PROFILE_MEMORY", "1") != "0"
+PROFILE_FRAMES = int(os.getenv("PROFILE_FRAMES", "1"))
+PROFILE_TOP = int(os.getenv("PROFILE_TOP", "25"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+
+_active = None
+
+
+def peak_rss_mb():
+    """
+    Pico de memoria residente del proceso en MB (None si el sistema no lo
+    expone; en Windows no existe el módulo resource).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux lo reporta en KB, macOS en bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Profiler:
+    """
+    Perfilador de una corrida.
+
+    Recibe:
+        out_dir (str): carpeta base; la corrida escribe en una subcarpeta.
+        name (str): nombre de la corrida ("scraping", "limpieza", ...).
+        memory (bool): activar tracemalloc (más lento; PROFILE_MEMORY).
+    """
+
+    def __init__(self, out_dir: str, name: str = "scraping", memory: bool = PROFILE_MEMORY):
+        self.name = name
+        self.path = os.path.join(out_dir, f"{name}-{datetime.now():%Y%m%d-%H%M%S}")
+        os.makedirs(self.path, exist_ok=True)
+        self.memory = memory
+        self.phases = []
+        self._started_tracemalloc = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_FRAMES)
+            self._started_tracemalloc = True
+        self._sampler = _Sampler(PROFILE_INTERVAL_MS / 1000)
+
+    @contextmanager
+    def stage(self, name: str, label: str = None):
+        """
+        Perfila el bloque como etapa `name` (por ejemplo "parse") del
+        medio `label`. Dentro de otra etapa del mismo hilo, las muestras
+        van a la más interna.
+        """
+        self._sampler.enter(f"{name}-{label}" if label else name)
+        try:
+            yield
+        finally:
+            self._sampler.exit()
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Fase secuencial de la corrida: además del perfil por muestreo del hilo,
+        mide tiempos, pico de memoria y guarda una instantánea al final.
+        """
+        if self.memory:
+            tracemalloc.reset_peak()
+        start, cpu = time.perf_counter(), time.process_time()
+        try:
+            with self.stage(name):
+                yield
+        finally:
+            info = {
+                "name": name,
+                "wall_s": round(time.perf_counter() - start, 3),
+                "cpu_s": round(time.process_time() - cpu, 3),
+                "rss_peak_mb": peak_rss_mb(),
+            }
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                info["python_current_mb"] = round(current / 2 ** 20, 1)
+                info["python_peak_mb"] = round(peak / 2 ** 20, 1)
+                info["top_allocations"] = self._snapshot(name)
+            self.phases.append(info)
+
+    def _snapshot(self, name: str):
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        snapshot.dump(os.path.join(self.path, f"{name}.snap"))
+        top = snapshot.statistics("lineno")[:PROFILE_TOP]
+        with open(os.path.join(self.path, f"{name}-memoria.txt"), "w", encoding="utf-8") as f:
+            for stat in top:
+                f.write(f"{stat}\n")
+        return [
+            {"where": str(stat.traceback[0]), "mb": round(stat.size / 2 ** 20, 2), "count": stat.count}
+            for stat in top[:10]
+        ]
+
+    def stop(self):
+        """
+        Escribe los perfiles y el resumen.
+
+        Retorna:
+            str: carpeta de la corrida.
+        """
+        self._sampler.stop()
+        stages = {}
+        for key, stacks in self._sampler.stacks().items():
+            stats = pstats.Stats(_SampledProfile(stacks, self._sampler.interval))
+            stats.dump_stats(os.path.join(self.path, f"{key}.prof"))
+            stages[key] = {
+                "samples": sum(stacks.values()),
+                "sampled_s": round(stats.total_tt, 3),
+                "top": _top_functions(stats),
+            }
+
+        summary = {
+            "name": self.name,
+            "python": sys.version.split()[0],
+            "phases": self.phases,
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "stages": stages,
+        }
+        with open(os.path.join(self.path, "resumen.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+        return self.path
+
+
+class _Sampler:
+    """
+    Hilo que muestrea las pilas de los hilos dentro de un bloque perfilado.
+
+    Cada hilo registra (enter/exit) la pila de bloques que tiene abiertos;
+    cada `interval` segundos se toma sys._current_frames() y la pila de
+    cada hilo registrado se cuenta en su bloque más interno.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._blocks = {}
+        self._stacks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+        self._thread.start()
+
+    def enter(self, key: str):
+        with self._lock:
+            self._blocks.setdefault(threading.get_ident(), []).append(key)
+
+    def exit(self):
+        ident = threading.get_ident()
+        with self._lock:
+            blocks = self._blocks[ident]
+            blocks.pop()
+            if not blocks:
+                del self._blocks[ident]
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = {ident: blocks[-1] for ident, blocks in self._blocks.items()}
+            if not active:
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, key in active.items():
+                    frame = frames.get(ident)
+                    stack = []
+                    while frame is not None:
+                        stack.append(frame.f_code)
+                        frame = frame.f_back
+                    if stack:
+                        counts = self._stacks.setdefault(key, {})
+                        stack = tuple(reversed(stack))
+                        counts[stack] = counts.get(stack, 0) + 1
+            del frames
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def stacks(self):
+        """
+        {bloque: {pila (tupla de code objects, de la raíz a la hoja): muestras}}
+        """
+        with self._lock:
+            return {key: dict(counts) for key, counts in self._stacks.items()}
+
+
+class _SampledProfile:
+    # Muestras de un bloque en el formato que lee pstats.Stats (como un
+    # cProfile.Profile): {func: (llamadas, llamadas, propio, acumulado, callers)}.
+
+    def __init__(self, stacks: dict, interval: float):
+        self.stacks = stacks
+        self.interval = interval
+        self.stats = {}
+
+    def create_stats(self):
+        own, total, callers = {}, {}, {}
+        for stack, n in self.stacks.items():
+            funcs = [(c.co_filename, c.co_firstlineno, c.co_name) for c in stack]
+            own[funcs[-1]] = own.get(funcs[-1], 0) + n
+            for func in set(funcs):
+                total[func] = total.get(func, 0) + n
+            for caller, callee in set(zip(funcs, funcs[1:])):
+                edges = callers.setdefault(callee, {})
+                edges[caller] = edges.get(caller, 0) + n
+
+        t = self.interval
+        self.stats = {
+            func: (
+                count, count, own.get(func, 0) * t, count * t,
+                {caller: (m, m, 0.0, m * t) for caller, m in callers.get(func, {}).items()},
+            )
+            for func, count in total.items()
+        }
+
+
+def _top_functions(stats, n: int = 10):
+    # Funciones con más tiempo propio (tottime) de un pstats.Stats.
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:n]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({func})",
+            "calls": calls,
+            "tottime_s": round(tottime, 4),
+            "cumtime_s": round(cumtime, 4),
+        }
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in rows
+    ]
+
+
+# ---------- Perfilador activo ----------
+
+def start(out_dir: str = PROFILE_DIR, name: str = "scraping", memory: bool = PROFILE_MEMORY):
+    """
+    Activa el perfilado si out_dir está definido (PROFILE_DIR por defecto).
+
+    Retorna:
+        Profiler o None si el perfilado está desactivado.
+    """
+    global _active
+    if not out_dir:
+        return None
+    _active = Profiler(out_dir, name, memory)
+    return _active
+
+
+def stop():
+    """
+    Termina el perfilado activo y escribe sus archivos.
+
+    Retorna:
+        str: carpeta con los resultados, o None si no había perfilado.
+    """
+    global _active
+    profiler, _active = _active, None
+    if profiler is None:
+        return None
+    path = profiler.stop()
+    print(f"🔬 Perfiles de {profiler.name} en {path}")
+    return path
+
+
+def get_active():
+    return _active
+
+
+@contextmanager
+def stage(name: str, label: str = None):
+    """
+    Profiler.stage sobre el perfilador activo (no hace nada sin él).
+    """
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name, label):
+        yield
+
+
+@contextmanager
+def phase(name: str):
+    """
+    Profiler.phase sobre el perfilador activo (no hace nada sin él).
+    """
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
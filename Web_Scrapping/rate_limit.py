@@ -0,0 +1,202 @@
+import os
+import time
+import threading
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+load_dotenv()
+
+'''
+Control de tráfico por host: token bucket + concurrencia adaptativa (AIMD).
+
+Cada medio configurado en SITEMAPS ("rate", "max_rate", "concurrency",
+"max_concurrency") tiene un HostLimiter:
+
+    - Token bucket: http_client.get toma un token antes de cada petición al
+      host, así las peticiones por segundo nunca superan la tasa actual
+      (incluye sitemaps, listados y reintentos). La espera respeta el plazo
+      del hilo: si el token no llega a tiempo la petición se corta.
+    - AIMD: cada respuesta se reporta con record(). Mientras las respuestas
+      son sanas y la latencia se mantiene cerca de su línea base, la tasa y
+      la concurrencia suben de forma aditiva (≈ +1 por cada ventana de
+      respuestas) hasta su techo. Un 429, un 503, un timeout o un pico de
+      latencia (más de RATE_LATENCY_FACTOR veces la línea base y más de
+      RATE_LATENCY_FLOOR segundos) las multiplica por RATE_DECREASE, como
+      mucho una vez por RATE_COOLDOWN segundos para que una ráfaga de
+      errores no las lleve al mínimo.
+
+La concurrencia la aplica el planificador (scheduler.run_url_scheduler):
+el "cap" de cada medio es limiter.concurrency_limit, que se consulta cada
+vez que un hilo busca trabajo.
+'''
+
+RATE_DECREASE = float(os.getenv("RATE_DECREASE", "0.5"))
+RATE_INCREASE = float(os.getenv("RATE_INCREASE", "1.0"))
+RATE_MIN = float(os.getenv("RATE_MIN", "0.2"))
+RATE_COOLDOWN = float(os.getenv("RATE_COOLDOWN", "2.0"))
+RATE_LATENCY_FACTOR = float(os.getenv("RATE_LATENCY_FACTOR", "3.0"))
+RATE_LATENCY_FLOOR = float(os.getenv("RATE_LATENCY_FLOOR", "1.0"))
+
+# Respuestas que indican que el servidor pide bajar el ritmo.
+THROTTLE_STATUS = {429, 503}
+
+# Muestras necesarias antes de juzgar picos de latencia.
+_BASELINE_SAMPLES = 5
+_BASELINE_ALPHA = 0.1
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def host_key(url_or_host: str):
+    """
+    Nombre de host normalizado (en minúsculas y sin "www.").
+    """
+    host = urlsplit(url_or_host).netloc if "//" in url_or_host else url_or_host
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class HostLimiter:
+    """
+    Token bucket y límite de concurrencia AIMD de un host.
+
+    Recibe:
+        rate (float): peticiones por segundo iniciales.
+        max_rate (float): techo de la tasa.
+        concurrency (int): artículos simultáneos iniciales.
+        max_concurrency (int): techo de la concurrencia.
+    """
+
+    def __init__(self, rate: float, max_rate: float = None, concurrency: int = 1, max_concurrency: int = None):
+        self.max_rate = max(rate, max_rate or rate)
+        self.max_concurrency = max(concurrency, max_concurrency or concurrency)
+        self.rate = float(rate)
+        self.limit = float(max(1, concurrency))
+        self.baseline = None
+        self.decreases = 0
+        self._samples = 0
+        self._tokens = 1.0
+        self._refilled = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: float = None):
+        """
+        Bloquea hasta que haya un token para hacer una petición.
+
+        Recibe:
+            deadline (float): plazo en time.monotonic() (el de
+                http_client.deadline). Si el token no llega antes del plazo
+                no se espera ni se consume.
+
+        Retorna:
+            bool: True si se tomó el token, False si se venció el plazo.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # La ráfaga máxima es un segundo de tráfico a la tasa actual.
+                self._tokens = min(
+                    max(1.0, self.rate),
+                    self._tokens + (now - self._refilled) * self.rate
+                )
+                self._refilled = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait >= deadline:
+                return False
+            time.sleep(wait)
+
+    def concurrency_limit(self):
+        """
+        Artículos simultáneos permitidos en este momento.
+        """
+        return int(self.limit)
+
+    def record(self, status: int = None, latency: float = None, timeout: bool = False):
+        """
+        Reporta el resultado de una petición al host.
+
+        Recibe:
+            status (int): código HTTP (None si no hubo respuesta).
+            latency (float): segundos hasta la respuesta.
+            timeout (bool): la petición expiró.
+        """
+        with self._lock:
+            spike = (
+                latency is not None
+                and self._samples >= _BASELINE_SAMPLES
+                and latency > max(RATE_LATENCY_FACTOR * self.baseline, RATE_LATENCY_FLOOR)
+            )
+            if timeout or status in THROTTLE_STATUS or spike:
+                self._decrease()
+                return
+            if status is None or status >= 500:
+                return
+
+            if latency is not None:
+                self._samples += 1
+                if self.baseline is None:
+                    self.baseline = latency
+                else:
+                    self.baseline += _BASELINE_ALPHA * (latency - self.baseline)
+            self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.rate = min(self.max_rate, self.rate + RATE_INCREASE / max(1.0, self.rate))
+
+    def _decrease(self):
+        # Se llama con self._lock tomado.
+        now = time.monotonic()
+        if now - self._last_decrease < RATE_COOLDOWN:
+            return
+        self._last_decrease = now
+        self.decreases += 1
+        self.limit = max(1.0, self.limit * RATE_DECREASE)
+        self.rate = max(RATE_MIN, self.rate * RATE_DECREASE)
+        self._tokens = min(self._tokens, 1.0)
+
+    def stats(self):
+        return {
+            "rate": round(self.rate, 2),
+            "concurrency": self.concurrency_limit(),
+            "baseline_latency": None if self.baseline is None else round(self.baseline, 3),
+            "decreases": self.decreases,
+        }
+
+
+def configure(host: str, rate: float, max_rate: float = None, concurrency: int = 1, max_concurrency: int = None):
+    """
+    Crea (o reemplaza) el limitador de un host.
+
+    Retorna:
+        HostLimiter
+    """
+    limiter = HostLimiter(rate, max_rate, concurrency, max_concurrency)
+    with _limiters_lock:
+        _limiters[host_key(host)] = limiter
+    return limiter
+
+
+def get_limiter(url_or_host: str):
+    """
+    Limitador del host de una URL, o None si el host no está configurado.
+    """
+    return _limiters.get(host_key(url_or_host))
+
+
+def reset():
+    """
+    Elimina todos los limitadores (sin límite de tasa).
+    """
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def stats():
+    """
+    Estado actual de cada limitador: {host: {rate, concurrency, ...}}.
+    """
+    with _limiters_lock:
+        return {host: limiter.stats() for host, limiter in _limiters.items()}
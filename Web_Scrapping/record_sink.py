@@ -0,0 +1,377 @@
+import os
+import csv
+import json
+import shutil
+import threading
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+'''
+Escritura en streaming del corpus consolidado.
+
+En lugar de acumular los registros de todos los medios en DataFrames y
+concatenarlos al final, get_all_news entrega cada artículo a un RecordSink
+apenas se parsea. El sink lo normaliza (la misma limpieza que los
+to_dataframe_*) y lo escribe de inmediato, así la memoria no crece con el
+tamaño del corpus.
+
+Formatos: CSV (.csv), JSON Lines (.jsonl) y Parquet (.parquet). Mientras
+la corrida está en curso las filas se escriben en "<archivo>.part";
+close() lo mueve al destino de forma atómica. En modo append el corpus
+existente y el .part se copian a "<archivo>.tmp", que reemplaza al destino
+también de forma atómica: un corte o un disco lleno a mitad de la copia
+no toca el corpus anterior.
+Si el proceso muere, el .part queda en disco con todo lo que alcanzó a
+escribirse (en Parquet el .part no es legible sin el pie del archivo).
+
+Parquet (requiere pyarrow) es el formato recomendado para el corpus: es
+columnar y comprimido, se escribe por grupos de filas
+(PARQUET_ROW_GROUP_SIZE) y las columnas de pocos valores (medio,
+espectro_politico, section) van con codificación de diccionario. Con
+read_corpus(path, columns=[...]) la etapa de limpieza lee solo las
+columnas que usa.
+'''
+
+PARQUET_ROW_GROUP_SIZE = int(os.getenv("PARQUET_ROW_GROUP_SIZE", "2000"))
+PARQUET_COMPRESSION = os.getenv("PARQUET_COMPRESSION", "zstd")
+
+# Columnas del CSV consolidado, en el orden que generaba pd.concat.
+COLUMNS = [
+    "url",
+    "title",
+    "subtitle",
+    "body",
+    "date_published",
+    "author",
+    "image",
+    "section",
+    "tags",
+    "medio",
+    "espectro_politico",
+]
+
+# Columnas con pocos valores distintos: diccionario en Parquet.
+DICTIONARY_COLUMNS = ["medio", "espectro_politico", "section"]
+
+
+def _format_for(path: str):
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if path.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+def _parquet_schema(columns: list):
+    import pyarrow as pa
+
+    return pa.schema([
+        (c, pa.dictionary(pa.int32(), pa.string()) if c in DICTIONARY_COLUMNS else pa.string())
+        for c in columns
+    ])
+
+
+def _parquet_writer(path: str, schema):
+    import pyarrow.parquet as pq
+
+    return pq.ParquetWriter(
+        path,
+        schema,
+        compression=PARQUET_COMPRESSION,
+        use_dictionary=[c for c in schema.names if c in DICTIONARY_COLUMNS],
+    )
+
+
+def read_corpus(path: str, columns: list = None):
+    """
+    Lee el corpus consolidado (CSV, JSON Lines o Parquet).
+
+    Recibe:
+        path (str): archivo escrito por RecordSink.
+        columns (list[str]): columnas a cargar. En Parquet solo se leen
+            esas columnas del disco; en CSV se descartan al parsear.
+
+    Retorna:
+        pd.DataFrame
+    """
+    fmt = _format_for(path)
+    if fmt == "parquet":
+        return pd.read_parquet(path, columns=columns)
+    if fmt == "jsonl":
+        df = pd.read_json(path, lines=True, dtype=False)
+        return df[columns] if columns else df
+    return pd.read_csv(path, usecols=columns)
+
+
+def normalize_record(record: dict):
+    """
+    Limpieza de un registro para el archivo consolidado.
+
+    Igual que los to_dataframe_*: las listas (tags, autores) se unen con
+    ", " y los saltos de línea del cuerpo se reemplazan por espacios.
+    """
+    clean = {}
+    for key, value in record.items():
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        elif key == "body" and isinstance(value, str):
+            value = value.replace("\n", " ")
+        clean[key] = value
+    return clean
+
+
+def convert_corpus(src: str, dst: str, chunksize: int = PARQUET_ROW_GROUP_SIZE):
+    """
+    Convierte un corpus existente (p. ej. el CSV consolidado) a otro
+    formato, por bloques para no cargarlo completo.
+
+    Recibe:
+        src (str): archivo de origen (.csv, .jsonl o .parquet).
+        dst (str): archivo de destino; el formato sale de la extensión.
+        chunksize (int): filas por bloque (solo para CSV).
+
+    Retorna:
+        int: filas escritas.
+    """
+    if _format_for(src) == "csv":
+        chunks = pd.read_csv(src, chunksize=chunksize, dtype=str, keep_default_na=False)
+    else:
+        chunks = [read_corpus(src)]
+
+    with RecordSink(dst) as sink:
+        for chunk in chunks:
+            for record in chunk.to_dict("records"):
+                sink.write({k: (None if v == "" else v) for k, v in record.items()})
+    return sink.count
+
+
+def _drop_partial_line(path: str):
+    # Si el proceso murió a mitad de una fila, se descarta ese fragmento.
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        pos = size
+        while pos > 0:
+            step = min(pos, 64 * 1024)
+            f.seek(pos - step)
+            block = f.read(step)
+            cut = block.rfind(b"\n")
+            if cut != -1:
+                pos = pos - step + cut + 1
+                break
+            pos -= step
+        if pos != size:
+            f.truncate(pos)
+
+
+def _as_str(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, float) and value != value:
+        return None
+    return str(value)
+
+
+class RecordSink:
+    """
+    Escribe registros uno a uno en CSV, JSON Lines o Parquet.
+
+    Recibe:
+        path (str): archivo de salida.
+        fmt (str): "csv", "jsonl" o "parquet". Por defecto se deduce de la
+            extensión.
+        columns (list[str]): columnas a escribir (COLUMNS por defecto).
+        append (bool): anexar al archivo si ya existe (modo incremental).
+            En CSV y Parquet se respetan las columnas del archivo
+            existente. En Parquet el archivo se reescribe grupo a grupo al
+            cerrar (no se carga completo en memoria).
+        resume (bool): si quedó un .part de una corrida interrumpida, se
+            sigue escribiendo sobre él en lugar de empezar de cero (para
+            usar con checkpoint.CrawlCheckpoint). Solo CSV y JSON Lines: un
+            .part de Parquet sin cerrar no se puede recuperar.
+
+    Se puede usar como context manager: si el bloque termina con una
+    excepción, el .part se conserva y el destino no se toca.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fmt: str = None,
+        columns: list = None,
+        append: bool = False,
+        resume: bool = False
+        ):
+        self.path = path
+        self.fmt = fmt or _format_for(path)
+        self.columns = list(columns or COLUMNS)
+        self.append = append and os.path.exists(path)
+        self.part_path = f"{path}.part"
+        self.count = 0
+        self.counts = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+        if self.fmt == "csv" and self.append:
+            with open(path, newline="", encoding="utf-8") as f:
+                header = next(csv.reader(f), None)
+            if header:
+                self.columns = header
+
+        resuming = resume and os.path.exists(self.part_path)
+
+        if self.fmt == "parquet":
+            if resuming:
+                raise ValueError(
+                    f"No se puede reanudar {self.part_path}: use .csv o .jsonl "
+                    "para corridas reanudables (y convert_corpus al final)"
+                )
+            if self.append:
+                import pyarrow.parquet as pq
+                self.schema = pq.read_schema(path)
+                self.columns = self.schema.names
+            else:
+                self.schema = _parquet_schema(self.columns)
+            self._rows = []
+            self._file = _parquet_writer(self.part_path, self.schema)
+            return
+
+        # URLs que ya están en el .part (para no repetirlas al reanudar).
+        self.resumed_urls = set()
+        if resuming:
+            _drop_partial_line(self.part_path)
+            resuming = os.path.getsize(self.part_path) > 0
+        if resuming:
+            self.resumed_urls = self._read_part_urls()
+        self._file = open(self.part_path, "a" if resuming else "w", newline="", encoding="utf-8")
+        if self.fmt == "csv":
+            self._writer = csv.writer(self._file, lineterminator="\n")
+            if not self.append and not resuming:
+                self._writer.writerow(self.columns)
+                self._file.flush()
+
+    def _read_part_urls(self):
+        urls = set()
+        with open(self.part_path, newline="", encoding="utf-8") as f:
+            if self.fmt == "jsonl":
+                for line in f:
+                    urls.add(json.loads(line).get("url"))
+            else:
+                rows = csv.reader(f)
+                if not self.append:
+                    next(rows, None)
+                i = self.columns.index("url")
+                urls.update(row[i] for row in rows if len(row) > i)
+        return urls
+
+    def write(self, record: dict):
+        """
+        Normaliza y escribe un registro (seguro entre hilos).
+        """
+        record = normalize_record(record)
+        row = {c: record.get(c) for c in self.columns}
+
+        with self._lock:
+            if self.fmt == "parquet":
+                self._rows.append(row)
+                if len(self._rows) >= PARQUET_ROW_GROUP_SIZE:
+                    self._flush_row_group()
+            elif self.fmt == "csv":
+                self._writer.writerow([row[c] for c in self.columns])
+            else:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            if self.fmt != "parquet":
+                # Cada fila queda en disco aunque el proceso muera después.
+                self._file.flush()
+            self.count += 1
+            medio = record.get("medio")
+            self.counts[medio] = self.counts.get(medio, 0) + 1
+
+    def _flush_row_group(self):
+        # Se llama con self._lock tomado.
+        import pyarrow as pa
+
+        if not self._rows:
+            return
+        table = pa.Table.from_pylist(
+            [{c: _as_str(r[c]) for c in self.columns} for r in self._rows],
+            schema=self.schema,
+        )
+        self._file.write_table(table, row_group_size=len(self._rows))
+        self._rows = []
+
+    def _close_parquet(self):
+        import pyarrow.parquet as pq
+
+        self._flush_row_group()
+        self._file.close()
+        self._closed = True
+
+        if not self.append:
+            os.replace(self.part_path, self.path)
+            return
+
+        # Parquet no admite anexar: se copia grupo a grupo el corpus
+        # existente y luego el delta a un archivo nuevo.
+        tmp = f"{self.path}.tmp"
+        writer = _parquet_writer(tmp, self.schema)
+        try:
+            for source in (self.path, self.part_path):
+                pf = pq.ParquetFile(source)
+                for i in range(pf.num_row_groups):
+                    writer.write_table(pf.read_row_group(i).cast(self.schema))
+        finally:
+            writer.close()
+        os.replace(tmp, self.path)
+        os.remove(self.part_path)
+
+    def close(self):
+        """
+        Finaliza la escritura: mueve el .part al destino (en modo append,
+        reemplaza el destino por el corpus existente más el .part).
+        """
+        with self._lock:
+            if self.fmt == "parquet":
+                if not self._closed:
+                    self._close_parquet()
+                return
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+            if not self.append:
+                os.replace(self.part_path, self.path)
+                return
+
+            tmp = f"{self.path}.tmp"
+            try:
+                with open(tmp, "wb") as dst:
+                    for source in (self.path, self.part_path):
+                        with open(source, "rb") as src:
+                            shutil.copyfileobj(src, dst)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            os.replace(tmp, self.path)
+            os.remove(self.part_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self.fmt == "parquet":
+            with self._lock:
+                self._flush_row_group()
+                self._file.close()
+                self._closed = True
+        else:
+            self._file.close()
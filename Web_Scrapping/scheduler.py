@@ -0,0 +1,308 @@
+import os
+import time
+import threading
+from collections import deque
+from dotenv import load_dotenv
+
+import http_client
+import metrics
+import rate_limit
+from canonical_urls import url_key
+from outlet_traffic import TRAFFIC
+
+load_dotenv()
+
+'''
+Planificador global de URLs para get_all_news.
+
+En lugar de un hilo por medio, las URLs de artículos de todos los medios se
+reparten entre un único presupuesto de hilos. Cada hilo tiene un medio
+"propio" del que toma URLs por la cabeza de la cola; cuando ese medio se
+vacía (o llegó a su tope) roba por la cola al medio con más trabajo
+pendiente. El tope por medio ("concurrency" en SITEMAPS) evita que un solo
+medio acapare los hilos y reparte la carga entre los servidores. El tope
+puede ser una función (rate_limit.HostLimiter.concurrency_limit) que se
+consulta cada vez que un hilo busca trabajo, así la concurrencia de cada
+medio sube y baja con el control AIMD.
+
+Modo pipeline: en vez de una lista de URLs, un medio puede traer una función
+"discover" que va entregando URLs mientras lee su sitemap. Esas URLs entran
+a una cola acotada (PIPELINE_QUEUE_SIZE) y los hilos las descargan de
+inmediato; si la cola está llena el descubrimiento espera (contrapresión),
+así la memoria se mantiene plana.
+
+Plazos: cada medio puede tener un "deadline" (instante en time.monotonic)
+y la corrida completa otro. Las descargas y el descubrimiento del medio
+corren con ese plazo (http_client.deadline); al vencerse se descartan sus
+URLs pendientes, se corta su descubrimiento y los hilos pasan a los demás
+medios. Los artículos ya obtenidos se conservan.
+'''
+
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+
+
+def run_url_scheduler(
+    jobs: dict,
+    workers: int = 5,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    on_record=None,
+    on_error=None,
+    deadline: float = None,
+    on_skip=None
+    ):
+    """
+    Descarga y parsea las URLs de todos los medios con un pool compartido.
+
+    Recibe:
+        jobs (dict): {medio: {"urls": list[str],
+                              "parse": callable(url, headers),
+                              "headers": dict,
+                              "cap": int}}
+            "cap" es el máximo de artículos del medio en vuelo a la vez
+            (int, o callable sin argumentos que retorna el tope actual).
+            En lugar de "urls" se puede pasar "discover": callable(on_url)
+            que llama on_url(url) por cada URL descubierta (modo pipeline).
+            "deadline" (opcional) es el plazo del medio en time.monotonic().
+        workers (int): número total de hilos de descarga.
+        queue_size (int): máximo de URLs pendientes por medio en modo
+            pipeline; on_url bloquea mientras la cola esté llena.
+        on_record (callable): on_record(medio, record) por cada artículo
+            apenas se parsea (desde el hilo que lo descargó). Con on_record
+            los registros no se acumulan en memoria.
+        on_error (callable): on_error(medio, url, error) por cada artículo
+            que falla (excepción o parser sin registro).
+        deadline (float): plazo de toda la corrida en time.monotonic().
+        on_skip (callable): on_skip(medio, urls) cuando se vence el plazo
+            de un medio, con las URLs que no se alcanzaron a descargar
+            (puede ser una lista vacía).
+
+    Retorna:
+        dict: {medio: list[dict]} con los registros de cada medio en el
+        orden en que se descubrieron sus URLs (los artículos fallidos y los
+        que quedaron fuera de plazo se omiten). Con on_record las listas
+        quedan vacías.
+    """
+    outlets = [m for m, job in jobs.items() if job.get("urls") or job.get("discover")]
+    results = {m: {} for m in jobs}
+
+    if not outlets:
+        return {m: [] for m in jobs}
+
+    queues = {m: deque(enumerate(_unique(jobs[m].get("urls") or []))) for m in outlets}
+    caps = {m: jobs[m].get("cap") or 1 for m in outlets}
+    in_flight = {m: 0 for m in outlets}
+    producing = {m for m in outlets if jobs[m].get("discover")}
+    deadlines = {
+        m: min(
+            (d for d in (jobs[m].get("deadline"), deadline) if d is not None),
+            default=None
+        )
+        for m in outlets
+    }
+    expired = set()
+    cond = threading.Condition()
+
+    def check_expired():
+        # Se llama con cond tomado: descarta las URLs de los medios vencidos.
+        now = time.monotonic()
+        for m in outlets:
+            if m in expired or deadlines[m] is None or now < deadlines[m]:
+                continue
+            if not (queues[m] or m in producing or in_flight[m]):
+                continue  # El medio ya terminó a tiempo.
+            expired.add(m)
+            skipped = [url for _, url in queues[m]]
+            queues[m].clear()
+            print(f"⏱️ Plazo agotado para {m}: {len(skipped)} URLs sin descargar")
+            if on_skip is not None:
+                try:
+                    on_skip(m, skipped)
+                except Exception as e:
+                    print(f"Error registrando URLs omitidas de {m}: {e}")
+            cond.notify_all()
+
+    def wait_timeout():
+        # Despertar a tiempo para el próximo plazo que se vence.
+        pending = [deadlines[m] for m in outlets if m not in expired and deadlines[m] is not None]
+        return max(0.0, min(pending) - time.monotonic()) if pending else None
+
+    def producer(medio):
+        vistas = set()
+        next_idx = [0]
+
+        def on_url(url):
+            with cond:
+                # Un reintento del descubrimiento puede repetir URLs (o
+                # variantes de la misma: canonical_urls.url_key)
+                key = url_key(url)
+                if key in vistas:
+                    return
+                vistas.add(key)
+                while len(queues[medio]) >= queue_size and medio not in expired:
+                    cond.wait(wait_timeout())
+                    check_expired()
+                if medio in expired:
+                    raise http_client.DeadlineExceeded("Plazo agotado")
+                queues[medio].append((next_idx[0], url))
+                next_idx[0] += 1
+                cond.notify_all()
+
+        try:
+            with http_client.deadline(deadlines[medio]), metrics.context(medio, "sitemap"):
+                with metrics.stage("discover", items=0):
+                    jobs[medio]["discover"](on_url)
+        except http_client.DeadlineExceeded:
+            print(f"⏱️ Descubrimiento de {medio} cortado por plazo")
+        except Exception as e:
+            print(f"Error descubriendo URLs de {medio}: {e}")
+        finally:
+            metrics.add(medio, "discover", items=next_idx[0])
+            with cond:
+                producing.discard(medio)
+                cond.notify_all()
+
+    def cap(medio):
+        limit = caps[medio]
+        return max(1, limit() if callable(limit) else limit)
+
+    def next_task(home):
+        # Primero el medio propio (cabeza de la cola) y luego se roba
+        # al medio con más URLs pendientes (cola de la cola).
+        victims = sorted(
+            (m for m in outlets if m != home),
+            key=lambda m: len(queues[m]),
+            reverse=True
+        )
+        for m in [home] + victims:
+            if queues[m] and in_flight[m] < cap(m):
+                idx, url = queues[m].popleft() if m == home else queues[m].pop()
+                return m, idx, url
+        return None
+
+    def worker(n):
+        home = outlets[n % len(outlets)]
+        while True:
+            with cond:
+                check_expired()
+                task = next_task(home)
+                while task is None:
+                    if not producing and not any(queues.values()):
+                        return
+                    cond.wait(wait_timeout())
+                    check_expired()
+                    task = next_task(home)
+                medio, idx, url = task
+                in_flight[medio] += 1
+                cond.notify_all()
+
+            job = jobs[medio]
+            late = False
+            try:
+                with http_client.deadline(deadlines[medio]), metrics.context(medio, "fetch"):
+                    record = job["parse"](url, job["headers"])
+            except http_client.DeadlineExceeded:
+                # No es una falla de la URL: quedó fuera de plazo.
+                record, error, late = None, None, True
+            except Exception as e:
+                print(f"Error procesando {url}: {e}")
+                record, error = None, str(e) or type(e).__name__
+            else:
+                error = None if record else "sin registro"
+
+            try:
+                if record and on_record is not None:
+                    on_record(medio, record)
+                elif record:
+                    results[medio][idx] = record
+                elif late:
+                    if on_skip is not None:
+                        on_skip(medio, [url])
+                elif on_error is not None:
+                    on_error(medio, url, error)
+            except Exception as e:
+                print(f"Error guardando {url}: {e}")
+            finally:
+                with cond:
+                    in_flight[medio] -= 1
+                    cond.notify_all()
+
+    threads = [
+        threading.Thread(target=producer, args=(m,), daemon=True)
+        for m in producing
+    ] + [
+        threading.Thread(target=worker, args=(n,), daemon=True)
+        for n in range(max(1, workers))
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    return {m: [records[i] for i in sorted(records)] for m, records in results.items()}
+
+
+def _unique(urls: list):
+    # Las URLs de la lista sin variantes repetidas del mismo artículo.
+    seen = set()
+    unique = []
+    for url in urls:
+        key = url_key(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+
+def run_outlet(
+    medio: str,
+    parse_func,
+    headers: dict = None,
+    urls: list = None,
+    discover=None,
+    concurrency: int = None,
+    queue_size: int = PIPELINE_QUEUE_SIZE
+    ):
+    """
+    Descarga y parsea los artículos de un solo medio (get_news_*) con el
+    mismo planificador y los mismos topes que get_all_news.
+
+    Sin `concurrency` se usa el control de tráfico del medio (TRAFFIC en
+    outlet_traffic.py): si su host aún no tiene limitador se crea uno, y el
+    tope de artículos en vuelo sigue su concurrencia AIMD hasta
+    "max_concurrency".
+
+    Recibe:
+        medio (str): clave del medio en TRAFFIC.
+        parse_func (callable): get_article_info_* del medio.
+        headers (dict): Headers para la petición HTTP.
+        urls (list[str]): URLs de artículos ya descubiertas.
+        discover (callable): en lugar de urls, discover(on_url), que llama
+            on_url(url) por cada URL encontrada (modo pipeline).
+        concurrency (int): tope fijo de descargas simultáneas (opcional).
+        queue_size (int): máximo de URLs descubiertas pendientes.
+
+    Retorna:
+        list[dict]: registros en el orden de las URLs (o de descubrimiento).
+    """
+    traffic = TRAFFIC.get(medio, {})
+    if concurrency:
+        cap = workers = concurrency
+    else:
+        limiter = rate_limit.get_limiter(traffic["host"]) if traffic.get("host") else None
+        if limiter is None and traffic.get("rate"):
+            limiter = rate_limit.configure(
+                traffic["host"],
+                rate=traffic["rate"],
+                max_rate=traffic.get("max_rate"),
+                concurrency=traffic.get("concurrency", 1),
+                max_concurrency=traffic.get("max_concurrency"),
+            )
+        cap = limiter.concurrency_limit if limiter is not None else traffic.get("concurrency", 1)
+        workers = traffic.get("max_concurrency") or traffic.get("concurrency", 1)
+
+    job = {"parse": parse_func, "headers": headers, "cap": cap}
+    if discover is not None:
+        job["discover"] = discover
+    else:
+        job["urls"] = urls or []
+    return run_url_scheduler({medio: job}, workers=workers, queue_size=queue_size)[medio]
@@ -0,0 +1,78 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+'''
+Registro persistente de URLs ya procesadas (modo incremental).
+
+Cada artículo que se parsea con éxito se guarda con su medio y la fecha de
+descarga. En corridas siguientes los get_news_* y get_all_news descartan esas
+URLs antes de aplicar el límite, de modo que solo se descargan artículos
+nuevos y el resultado es un DataFrame "delta" que se puede anexar a
+noticias_consolidadas.csv.
+'''
+
+
+class SeenStore:
+    """
+    Almacén sqlite de URLs vistas.
+
+    Recibe:
+        path (str): ruta del archivo sqlite (se crea si no existe).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS seen (
+                url TEXT PRIMARY KEY,
+                medio TEXT,
+                fetched_at TEXT NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+
+    def __contains__(self, url: str):
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM seen WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+
+    def filter_new(self, urls: list):
+        """
+        Retorna las URLs que no están en el registro, conservando el orden.
+        """
+        if not urls:
+            return []
+
+        seen = set()
+        with self._lock:
+            # Consulta por bloques para no superar el límite de parámetros de sqlite.
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT url FROM seen WHERE url IN ({placeholders})", chunk
+                ).fetchall()
+                seen.update(r[0] for r in rows)
+
+        return [u for u in urls if u not in seen]
+
+    def add_many(self, urls: list, medio: str):
+        """
+        Marca las URLs como procesadas con éxito para el medio.
+        """
+        fetched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO seen (url, medio, fetched_at) VALUES (?, ?, ?)",
+                [(u, medio, fetched_at) for u in urls]
+            )
+            self._db.commit()
@@ -1,6 +1,10 @@
-import requests
+import http_client
+from scheduler import run_outlet
 import pandas as pd
-from bs4 import BeautifulSoup
+from parsing import make_soup
+from extractors import make_article_parser
+from article_specs import EXTRACTORS
+from canonical_urls import unique_urls
 import os
 from dotenv import load_dotenv
 
@@ -12,13 +16,13 @@ def get_urls_politica_SemanarioVoz(url_base: str, headers: dict):
     """
     Obtiene todas las URLs de noticias de política desde la página de Semanario Voz.
     """
-    resp = requests.get(url_base, headers=headers)
+    resp = http_client.get(url_base, headers=headers)
 
     if resp.status_code != 200:
         print(f"Error HTTP {resp.status_code} al acceder a {url_base}")
         return []
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = make_soup(resp.text)
 
     urls = []
 
@@ -30,112 +34,55 @@ def get_urls_politica_SemanarioVoz(url_base: str, headers: dict):
             if href.startswith(url_SemanarioVoz):
                 urls.append(href)
 
-    # Quitar duplicados
-    urls = list(dict.fromkeys(urls))
+    # Forma canónica y sin duplicados (variantes con query, #, barra final)
+    urls = unique_urls(urls)
     return urls
 
 
-def get_article_info_SemanarioVoz(url: str, headers: dict):
-    """
-    Descarga y parsea una noticia de Semanario Voz:
-    title, subtitle, date_published, body, author(None), section, tags.
-    """
-    resp = requests.get(url, headers=headers)
+# Parser de artículos: la spec del medio en article_specs.py, la misma que
+# usa get_all_news (ver extractors.make_article_parser).
+get_article_info_SemanarioVoz = make_article_parser(EXTRACTORS["SemanarioVoz"])
 
-    if resp.status_code != 200:
-        print(f"Error HTTP {resp.status_code} al acceder a {url}")
-        return None
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # -------------------------
-    # TÍTULO
-    # -------------------------
-    titulo_tag = soup.select_one(".tdb-title-text")
-    title = titulo_tag.get_text(strip=True) if titulo_tag else None
-
-    # -------------------------
-    # SUBTÍTULO
-    # -------------------------
-    subtitulo_tag = (
-        soup.select_one("p.td-post-sub-title")
-        or soup.select_one(".tdb-sub-title")
-        or soup.select_one(".td-post-sub-title")
-    )
-    subtitle = subtitulo_tag.get_text(strip=True) if subtitulo_tag else None
-
-    # -------------------------
-    # FECHA
-    # -------------------------
-    fecha_tag = soup.select_one("time.entry-date")
-
-    if fecha_tag:
-        date_published = fecha_tag.get_text(strip=True)
-    else:
-        meta_date = soup.select_one('meta[property="article:published_time"]')
-        date_published = meta_date["content"] if meta_date else None
-
-    # -------------------------
-    # CUERPO
-    # -------------------------
-    body_container = soup.select_one(".td-post-content")
-
-    if body_container:
-        parrafos = body_container.find_all("p")
-        body = "\n".join(
-            p.get_text(" ", strip=True) 
-            for p in parrafos if p.get_text(strip=True)
-        )
-    else:
-        body = None
-
-    # -------------------------
-    # TAGS
-    # -------------------------
-    tags_raw = (
-        soup.select(".td-post-tags a")
-        or soup.select("ul.td-tags a")
-        or soup.select(".tdb-tags a")
-    )
-
-    tags = [t.get_text(strip=True) for t in tags_raw] if tags_raw else None
-
-    # -------------------------
-    # NO HAY AUTOR EN SEMANARIO VOZ
-    # (si aparece en el futuro, se ajusta aquí)
-    # -------------------------
-    author = None
-
-    # Sección fija
-    section = "politica"
-
-    return {
-        "url": url,
-        "title": title,
-        "subtitle": subtitle,
-        "date_published": date_published,
-        "body": body,
-        "author": author,
-        "section": section,
-        "tags": tags,
-    }
-
-
-def get_news_SemanarioVoz(url_base: str, headers: dict, limit: int = None):
+
+def get_news_urls_SemanarioVoz(
+    url_base: str,
+    headers: dict,
+    limit: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    on_url=None
+    ):
     """
-    Descarga varias noticias de Semanario Voz (política) y retorna un DataFrame.
+    Obtiene las URLs de artículos que procesa get_news_SemanarioVoz:
+    descubrimiento, filtros y límite.
+
+    La página de listado no trae fechas de modificación, por lo que
+    since/until no aplican a este medio y se ignoran. En modo pipeline
+    (on_url) las URLs se entregan apenas se lee la página de listado.
     """
+
     urls = get_urls_politica_SemanarioVoz(url_base, headers)
 
+    # Modo incremental: descartar URLs ya procesadas
+    if seen_store is not None:
+        urls = seen_store.filter_new(urls)
+
     if limit:
         urls = urls[:limit]
 
-    data = []
+    # Modo pipeline: entregar las URLs a la descarga de artículos
+    if on_url is not None:
+        for u in urls:
+            on_url(u)
+
+    return urls
+
 
-    for url in urls:
-        info = get_article_info_SemanarioVoz(url, headers)
-        if info:
-            data.append(info)
+def to_dataframe_SemanarioVoz(data: list):
+    """
+    Convierte los registros de get_article_info_SemanarioVoz en un DataFrame limpio.
+    """
 
     df = pd.DataFrame(data)
 
@@ -149,3 +96,52 @@ def get_news_SemanarioVoz(url_base: str, headers: dict, limit: int = None):
         )
 
     return df
+
+
+def get_news_SemanarioVoz(
+    url_base: str,
+    headers: dict,
+    limit: int = None,
+    concurrency: int = None,
+    seen_store=None,
+    since=None,
+    until=None,
+    pipeline: bool = False
+    ):
+    """
+    Descarga varias noticias de Semanario Voz (política) y retorna un DataFrame.
+    """
+
+    if pipeline:
+        # Descubrimiento y descarga de artículos solapados (cola acotada)
+        data = run_outlet(
+            "SemanarioVoz",
+            get_article_info_SemanarioVoz,
+            headers,
+            discover=lambda on_url: get_news_urls_SemanarioVoz(
+                url_base,
+                headers,
+                limit=limit,
+                seen_store=seen_store,
+                since=since,
+                until=until,
+                on_url=on_url
+            ),
+            concurrency=concurrency
+        )
+    else:
+        urls = get_news_urls_SemanarioVoz(
+            url_base,
+            headers,
+            limit=limit,
+            seen_store=seen_store,
+            since=since,
+            until=until
+        )
+
+        data = run_outlet("SemanarioVoz", get_article_info_SemanarioVoz, headers, urls=urls, concurrency=concurrency)
+
+    if seen_store is not None:
+        seen_store.add_many([r["url"] for r in data], "SemanarioVoz")
+
+    return to_dataframe_SemanarioVoz(data)
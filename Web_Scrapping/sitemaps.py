@@ -0,0 +1,379 @@
+import os
+import heapq
+import xml.etree.ElementTree as ET
+from collections import deque
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+import http_client
+import metrics
+from canonical_urls import canonical_pair
+
+load_dotenv()
+
+'''
+Utilidades comunes para leer sitemaps XML (urlset y sitemap_index).
+
+Además de <loc> se lee <lastmod>, de modo que el descubrimiento devuelve
+pares (url, lastmod), se puede acotar a una ventana [since, until] y se
+ordena de lo más reciente a lo más antiguo para que `limit` tome los
+artículos más nuevos.
+
+Los sitemaps se leen en streaming y los filtros de cada medio se aplican
+mientras se lee, de modo que la memoria queda acotada por `limit` y no se
+piden sitemaps hijos que ya no pueden aportar URLs. Los hijos de un
+sitemap_index se descargan en paralelo (SITEMAP_PARALLELISM) y se fusionan
+en orden determinista.
+'''
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+SITEMAP_PARALLELISM = int(os.getenv("SITEMAP_PARALLELISM", "4"))
+
+
+def parse_lastmod(value):
+    """
+    Convierte un <lastmod> (W3C datetime) a datetime con zona horaria.
+
+    Acepta "2024-05-01", "2024-05-01T10:20:30+00:00" y "...Z". Las fechas
+    sin zona se asumen en UTC.
+
+    Retorna:
+        datetime o None si value está vacío o no se puede interpretar.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def to_datetime(value):
+    """
+    Normaliza un límite since/until: acepta datetime, date o str ISO.
+    """
+    if value is None or isinstance(value, datetime):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+    return parse_lastmod(str(value))
+
+
+def in_window(lastmod, since=None, until=None):
+    """
+    Indica si lastmod cae dentro de [since, until].
+
+    Las entradas sin lastmod se conservan (no hay cómo descartarlas).
+    """
+    if lastmod is None:
+        return True
+    if since is not None and lastmod < since:
+        return False
+    if until is not None and lastmod > until:
+        return False
+    return True
+
+
+def sort_newest_first(entries: list):
+    """
+    Ordena pares (url, lastmod) del más reciente al más antiguo.
+    Las entradas sin lastmod quedan al final, en su orden original.
+    """
+    dated = [e for e in entries if e[1] is not None]
+    undated = [e for e in entries if e[1] is None]
+    dated.sort(key=lambda e: e[1], reverse=True)
+    return dated + undated
+
+
+def iter_sitemap(url: str, headers: dict, chunk_size: int = 64 * 1024):
+    """
+    Lee un sitemap en streaming, sin construir el árbol XML completo.
+
+    El cuerpo se descarga por bloques y se pasa a un XMLPullParser; cada
+    <url> o <sitemap> se emite apenas se cierra y luego se descarta, así la
+    memoria no crece con el tamaño del archivo. Si quien consume el
+    generador deja de iterar, la descarga se corta ahí mismo.
+
+    Recibe:
+        url (str): URL del sitemap.
+        headers (dict): Headers para la petición HTTP.
+        chunk_size (int): tamaño de bloque de lectura.
+
+    Retorna:
+        generador de tuplas (tipo, loc, lastmod), con tipo "index" para
+        entradas de un <sitemapindex> y "urlset" para las de un <urlset>.
+    """
+    resp = http_client.get(url, headers=headers, stream=True)
+    try:
+        if resp.status_code != 200:
+            print(f"Error HTTP {resp.status_code} al acceder a {url}")
+            return
+
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root = None
+        kind = None
+
+        for chunk in resp.iter_content(chunk_size=chunk_size):
+            # Un sitemap que llega gota a gota no debe pasar del plazo.
+            http_client.check_deadline()
+            parser.feed(chunk)
+            for event, elem in parser.read_events():
+                if event == "start":
+                    if root is None:
+                        root = elem
+                        kind = "index" if elem.tag == f"{SITEMAP_NS}sitemapindex" else "urlset"
+                    continue
+
+                if elem.tag not in (f"{SITEMAP_NS}url", f"{SITEMAP_NS}sitemap"):
+                    continue
+
+                loc = elem.findtext(f"{SITEMAP_NS}loc")
+                lastmod = elem.findtext(f"{SITEMAP_NS}lastmod")
+                if loc:
+                    yield kind, loc.strip(), parse_lastmod(lastmod)
+
+                # Liberar lo ya procesado
+                root.clear()
+
+        parser.close()
+
+    except ET.ParseError as e:
+        print("Error parseando XML:", e)
+
+    finally:
+        resp.close()
+
+
+class _Collector:
+    """
+    Acumula pares (url, lastmod) respetando filtros, ventana y límite. Las
+    URLs se guardan en forma canónica (canonical_urls) y sin duplicados.
+
+    Con newest_first=False se conserva el orden del documento y se puede
+    parar apenas se llega a `limit`; cada entrada aceptada es definitiva y
+    se entrega de inmediato a `on_accept` si se pasa. Con newest_first=True
+    se mantiene un heap con las `limit` entradas más recientes (memoria
+    acotada).
+    """
+
+    def __init__(
+        self,
+        url_filter=None,
+        limit=None,
+        since=None,
+        until=None,
+        newest_first=True,
+        on_accept=None
+        ):
+        self.url_filter = url_filter
+        self.limit = limit
+        self.since = since
+        self.until = until
+        self.newest_first = newest_first
+        self.on_accept = on_accept
+        self.vistas = set()
+        self.items = []
+        self.seq = 0
+
+    def _key(self, lastmod):
+        # Las entradas sin lastmod cuentan como las más antiguas y, entre
+        # ellas, gana la que aparece primero en el documento.
+        if lastmod is None:
+            return (0, datetime.min.replace(tzinfo=timezone.utc), -self.seq)
+        return (1, lastmod, -self.seq)
+
+    def add(self, url, lastmod):
+        if not self.newest_first and self.full():
+            return
+        # Variantes del mismo artículo (http/https, barra final, query,
+        # fragmento) cuentan como una sola URL: la canónica.
+        url, key = canonical_pair(url)
+        if key in self.vistas or not in_window(lastmod, self.since, self.until):
+            return
+        if self.url_filter is not None and not self.url_filter(url):
+            return
+        self.vistas.add(key)
+        self.seq += 1
+
+        if not self.limit or not self.newest_first:
+            self.items.append((url, lastmod))
+            if self.on_accept is not None and not self.newest_first:
+                self.on_accept(url)
+            return
+
+        entry = (self._key(lastmod), url, lastmod)
+        if len(self.items) < self.limit:
+            heapq.heappush(self.items, entry)
+        elif entry[0] > self.items[0][0]:
+            heapq.heapreplace(self.items, entry)
+
+    def full(self):
+        return bool(self.limit) and len(self.items) >= self.limit
+
+    def done(self, next_lastmod=None):
+        """
+        Indica si ya no hace falta leer más.
+
+        En orden de documento basta con llegar al límite. En orden por
+        fecha, un sitemap hijo cuyo lastmod no supera la entrada más
+        antigua del heap no puede aportar nada más reciente.
+        """
+        if not self.full():
+            return False
+        if not self.newest_first:
+            return True
+        oldest = self.items[0][0]
+        return next_lastmod is not None and oldest[0] == 1 and next_lastmod <= oldest[1]
+
+    def result(self):
+        if not self.limit or not self.newest_first:
+            entries = self.items[:self.limit] if self.limit else self.items
+            return sort_newest_first(entries) if self.newest_first else entries
+        ordered = sorted(self.items, key=lambda e: e[0], reverse=True)
+        return [(url, lastmod) for _, url, lastmod in ordered]
+
+
+def get_sitemap_entries(
+    sitemap_url,
+    headers: dict,
+    since=None,
+    until=None,
+    index_filter=None,
+    url_filter=None,
+    limit: int = None,
+    newest_first: bool = True,
+    parallelism: int = SITEMAP_PARALLELISM,
+    on_url=None
+    ):
+    """
+    Obtiene los pares (url, lastmod) de uno o varios sitemaps o sitemap_index.
+
+    Los sitemaps se leen en streaming (iter_sitemap) y los filtros del medio
+    se aplican a medida que se lee. Si sitemap_url es un índice, sus hijos
+    se recorren del más reciente al más antiguo y:
+        - un hijo con lastmod anterior a `since` no se descarga: su lastmod
+          es la última modificación de todo lo que contiene. (Con `until`
+          no se puede descartar un hijo; sus URLs se filtran una a una.)
+        - una vez reunidas `limit` URLs, no se descargan los hijos que ya
+          no pueden aportar URLs más recientes (o ninguno más, si
+          newest_first=False).
+
+    Recibe:
+        sitemap_url (str | list[str]): URL del sitemap/índice, o varias.
+        headers (dict): Headers para la petición HTTP.
+        since, until (datetime | str): ventana de lastmod (opcionales).
+        index_filter (callable): filtro sobre la URL de cada sitemap hijo.
+        url_filter (callable): filtro del medio sobre cada URL de artículo.
+        limit (int): máximo de URLs a retornar.
+        newest_first (bool): ordenar por lastmod descendente (True) o
+            conservar el orden del documento y cortar la lectura apenas se
+            llega a `limit` (False).
+        parallelism (int): máximo de sitemaps hijos descargados a la vez
+            (SITEMAP_PARALLELISM por defecto). El resultado no depende de
+            este valor.
+        on_url (callable): modo pipeline. Cada URL aceptada se entrega a
+            on_url(url) apenas se lee, para que la descarga de artículos
+            empiece sin esperar al resto del sitemap. Implica
+            newest_first=False (los hijos del índice se siguen recorriendo
+            del más reciente al más antiguo). Si on_url bloquea, la lectura
+            se frena con él (contrapresión).
+
+    Retorna:
+        list[tuple[str, datetime | None]]: pares sin duplicados.
+    """
+    since, until = to_datetime(since), to_datetime(until)
+    sources = [sitemap_url] if isinstance(sitemap_url, str) else list(sitemap_url)
+    if on_url is not None:
+        newest_first = False
+    collector = _Collector(url_filter, limit, since, until, newest_first, on_accept=on_url)
+
+    for source in sources:
+        if collector.done():
+            break
+
+        children = []
+        stream = iter_sitemap(source, headers)
+        for kind, loc, lastmod in stream:
+            if kind == "index":
+                if (index_filter is None or index_filter(loc)) \
+                        and (since is None or lastmod is None or lastmod >= since):
+                    children.append((loc, lastmod))
+                continue
+
+            collector.add(loc, lastmod)
+            if collector.done():
+                stream.close()
+                break
+
+        children = sort_newest_first(children) if newest_first or on_url else children
+        _merge_children(
+            collector, children, headers, parallelism,
+            lambda: _Collector(url_filter, limit, since, until, newest_first)
+        )
+
+    return collector.result()
+
+
+def _read_child(child_url: str, headers: dict, collector):
+    """
+    Lee un sitemap hijo en streaming sobre su propio colector.
+    """
+    stream = iter_sitemap(child_url, headers)
+    for kind, loc, lastmod in stream:
+        if kind != "urlset":
+            continue
+        collector.add(loc, lastmod)
+        if collector.done():
+            stream.close()
+            break
+    return collector.result()
+
+
+def _merge_children(collector, children: list, headers: dict, parallelism: int, new_collector):
+    """
+    Descarga los sitemaps hijos en paralelo y los fusiona en orden.
+
+    Se mantienen como máximo `parallelism` hijos en vuelo. Los resultados
+    se incorporan al colector principal siempre en el orden de `children`
+    y la decisión de parar se toma en ese mismo orden, así el resultado es
+    idéntico al de una lectura secuencial (y `limit` es reproducible).
+    Los hijos que ya no hacen falta no se piden; a lo sumo se descartan
+    los que estaban en vuelo.
+    """
+    if not children:
+        return
+
+    executor = ThreadPoolExecutor(max_workers=max(1, parallelism))
+    # Los hijos se leen con el mismo plazo (y contexto de métricas) que el
+    # descubrimiento del medio.
+    read_child = metrics.bind(http_client.bind_deadline(_read_child))
+    pending = deque()
+    next_child = 0
+
+    try:
+        for child_url, child_lastmod in children:
+            while len(pending) < parallelism and next_child < len(children):
+                url, lastmod = children[next_child]
+                if collector.done(lastmod):
+                    break
+                pending.append(executor.submit(read_child, url, headers, new_collector()))
+                next_child += 1
+
+            if collector.done(child_lastmod) or not pending:
+                break
+
+            for url, lastmod in pending.popleft().result():
+                collector.add(url, lastmod)
+
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,35 @@
+from canonical_urls import canonicalize, url_key, unique_urls
+
+'''
+Forma canónica y clave de deduplicación de las URLs de artículos.
+'''
+
+
+def test_canonicalize_normalizes_scheme_host_path_and_drops_query():
+    url = "HTTP://WWW.LaFM.com.co:80/politica//./nota%7e1/../nota-2?utm_source=x&id=3#comentarios"
+    assert canonicalize(url) == "https://www.lafm.com.co/politica/nota-2"
+
+
+def test_canonicalize_keeps_non_tracking_query_sorted():
+    url = "https://voragine.co/buscar?q=paz&utm_medium=tw&fbclid=abc&a=1"
+    assert canonicalize(url, keep_query=True) == "https://voragine.co/buscar?a=1&q=paz"
+
+
+def test_canonicalize_resolves_relative_urls_and_keeps_other_schemes():
+    assert canonicalize("/politica/nota-1/", base="https://www.lafm.com.co/politica") == \
+        "https://www.lafm.com.co/politica/nota-1/"
+    assert canonicalize("mailto:redaccion@lafm.com.co") == "mailto:redaccion@lafm.com.co"
+
+
+def test_url_key_ignores_trailing_slash_but_not_the_root():
+    assert url_key("https://pacifista.tv/actualidad/nota-1/") == url_key("http://pacifista.tv/actualidad/nota-1")
+    assert url_key("https://pacifista.tv/") == "https://pacifista.tv/"
+
+
+def test_unique_urls_keeps_the_first_variant_in_order():
+    urls = [
+        "https://semanariovoz.com/nota-1/?utm_campaign=x",
+        "https://semanariovoz.com/nota-2/",
+        "http://semanariovoz.com/nota-1",
+    ]
+    assert unique_urls(urls) == ["https://semanariovoz.com/nota-1/", "https://semanariovoz.com/nota-2/"]
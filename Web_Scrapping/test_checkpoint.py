@@ -0,0 +1,49 @@
+import os
+
+import requests
+
+import mock_sites
+from record_sink import RecordSink
+
+'''
+Regresión de checkpoint + replay_failed: una pasada de replay no debe dejar
+progreso que haga saltar URLs en la siguiente corrida normal.
+'''
+
+
+class FlakySession(mock_sites.MockSession):
+    # Responde 404 a los artículos "-1" de cada medio mientras failing=True.
+    failing = True
+
+    def get(self, url: str, **kwargs):
+        if self.failing and url.rstrip("/").endswith("-1"):
+            resp = requests.Response()
+            resp.status_code = 404
+            resp._content = b""
+            resp.url = url
+            return resp
+        return super().get(url, **kwargs)
+
+
+def _run(datos, sink_path, checkpoint_path, replay_failed=False):
+    with RecordSink(sink_path, resume=True) as sink:
+        counts = datos.get_all_news(
+            limit=5, workers=8, sink=sink, checkpoint_path=checkpoint_path,
+            replay_failed=replay_failed, metrics_path=None
+        )
+    return sum(counts.values())
+
+
+def test_replay_failed_does_not_skip_urls_in_next_run(tmp_path, mock_sites_server, no_rate_limits):
+    import datos
+
+    session = mock_sites_server(FlakySession, articles=20)
+    checkpoint_path = os.path.join(tmp_path, "checkpoint.sqlite")
+
+    first = _run(datos, os.path.join(tmp_path, "a.jsonl"), checkpoint_path)
+    session.failing = False
+    recovered = _run(datos, os.path.join(tmp_path, "b.jsonl"), checkpoint_path, replay_failed=True)
+    second = _run(datos, os.path.join(tmp_path, "c.jsonl"), checkpoint_path)
+
+    assert recovered > 0
+    assert second == first + recovered
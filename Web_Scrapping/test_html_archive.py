@@ -0,0 +1,48 @@
+import threading
+
+import requests
+
+from html_archive import HTMLArchive
+
+'''
+HTMLArchive.store: una respuesta repetida se archiva una sola vez, también
+cuando varios hilos la guardan a la vez.
+'''
+
+
+def _response(body=b"<html>nota</html>", status=200):
+    resp = requests.Response()
+    resp.status_code = status
+    resp.reason = "OK"
+    resp._content = body
+    resp.headers["Content-Type"] = "text/html"
+    return resp
+
+
+def test_same_response_is_stored_once(tmp_path):
+    url = "https://www.lafm.com.co/politica/nota-1"
+    with HTMLArchive(str(tmp_path)) as archive:
+        assert archive.store(url, _response())
+        assert not archive.store(url, _response())
+        assert archive.store(url, _response(b"<html>corregida</html>"))
+        assert archive.stats()["records"] == 2
+
+
+def test_concurrent_stores_of_the_same_response_write_one_record(tmp_path):
+    url = "https://www.lafm.com.co/politica/nota-1"
+    start = threading.Barrier(8)
+    stored = []
+
+    def store(archive):
+        start.wait()
+        stored.append(archive.store(url, _response(b"x" * 200_000)))
+
+    with HTMLArchive(str(tmp_path)) as archive:
+        threads = [threading.Thread(target=store, args=(archive,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert stored.count(True) == 1
+        assert archive.stats()["records"] == 1
+        assert archive.get(url)["content"] == b"x" * 200_000
@@ -0,0 +1,56 @@
+import pytest
+
+import http_client
+from http_cache import HTTPCache
+
+'''
+Caché condicional contra mock_sites: revalidación con 304 y tee() de las
+respuestas en streaming.
+'''
+
+ARTICLE = "https://www.lafm.com.co/politica/nota-3"
+SITEMAP = "https://voragine.co/post-sitemap.xml"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    previous = http_client.get_cache()
+    cache = HTTPCache(str(tmp_path / "cache"))
+    http_client.set_cache(cache)
+    yield cache
+    http_client.set_cache(previous)
+
+
+def _status(session, medio):
+    return session.server_stats()[medio]["status"]
+
+
+def test_revalidation_reuses_cached_body_on_304(mock_sites_server, cache):
+    session = mock_sites_server(articles=10)
+
+    first = http_client.get(ARTICLE)
+    assert first.status_code == 200
+    assert "If-None-Match" in cache.validators(ARTICLE)
+
+    second = http_client.get(ARTICLE)
+    assert second.status_code == 200
+    assert second.from_cache
+    assert second.content == first.content
+    assert _status(session, "LaFM") == {"200": 1, "304": 1}
+
+
+def test_streamed_response_is_cached_only_when_read_to_the_end(mock_sites_server, cache):
+    mock_sites_server(articles=2000)
+
+    resp = http_client.get(SITEMAP, stream=True)
+    next(resp.iter_content(1024))
+    resp.close()
+    assert cache.validators(SITEMAP) == {}
+
+    resp = http_client.get(SITEMAP, stream=True)
+    body = b"".join(resp.iter_content(64 * 1024))
+    assert cache.validators(SITEMAP)
+
+    cached = http_client.get(SITEMAP, stream=True)
+    assert cached.from_cache
+    assert cached.content == body
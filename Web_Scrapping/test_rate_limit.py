@@ -0,0 +1,100 @@
+import time
+
+import pytest
+
+import http_client
+import rate_limit
+from rate_limit import HostLimiter
+
+'''
+Token bucket y control AIMD de rate_limit, y la espera del token contra el
+plazo del hilo (http_client.deadline).
+'''
+
+
+@pytest.fixture(autouse=True)
+def _reset_limiters():
+    yield
+    rate_limit.reset()
+
+
+def test_healthy_responses_raise_rate_and_concurrency_up_to_the_ceiling():
+    limiter = HostLimiter(rate=2, max_rate=4, concurrency=1, max_concurrency=3)
+    for _ in range(50):
+        limiter.record(200, 0.05)
+    assert limiter.rate == 4
+    assert limiter.concurrency_limit() == 3
+
+
+def test_throttle_halves_once_per_cooldown():
+    limiter = HostLimiter(rate=8, max_rate=8, concurrency=4, max_concurrency=4)
+    limiter.record(429)
+    limiter.record(503)
+    assert limiter.decreases == 1
+    assert limiter.rate == 8 * rate_limit.RATE_DECREASE
+    assert limiter.concurrency_limit() == 2
+
+
+def test_latency_spike_counts_as_throttle():
+    limiter = HostLimiter(rate=4, concurrency=2)
+    for _ in range(rate_limit._BASELINE_SAMPLES):
+        limiter.record(200, 0.1)
+    limiter.record(200, rate_limit.RATE_LATENCY_FLOOR + 1)
+    assert limiter.decreases == 1
+
+
+def test_token_bucket_spaces_requests():
+    limiter = HostLimiter(rate=10)
+    start = time.monotonic()
+    for _ in range(4):
+        assert limiter.acquire()
+    # Un token disponible al inicio; los otros tres a 10 por segundo.
+    assert time.monotonic() - start >= 0.25
+
+
+def test_acquire_gives_up_when_the_token_comes_after_the_deadline():
+    limiter = HostLimiter(rate=0.5)
+    limiter.acquire()
+    start = time.monotonic()
+    assert not limiter.acquire(deadline=time.monotonic() + 0.2)
+    assert time.monotonic() - start < 0.1
+
+
+def test_request_waiting_for_a_token_stops_at_the_deadline(mock_sites_server):
+    session = mock_sites_server(articles=5)
+    rate_limit.configure("www.lafm.com.co", rate=0.5)
+    url = "https://www.lafm.com.co/politica/nota-1"
+
+    assert http_client.get(url).status_code == 200
+    start = time.monotonic()
+    with pytest.raises(http_client.DeadlineExceeded):
+        with http_client.deadline(time.monotonic() + 0.3):
+            http_client.get(url)
+    assert time.monotonic() - start < 0.3
+    assert session.server_stats()["LaFM"]["requests"] == 1
+
+
+def test_retry_budget_is_shared_with_and_without_www(monkeypatch):
+    class DownSession:
+        def __init__(self):
+            self.requests = 0
+
+        def get(self, url, **kwargs):
+            self.requests += 1
+            raise http_client.requests.ConnectionError("caído")
+
+    session = DownSession()
+    previous = http_client.get_session()
+    http_client.set_session(session)
+    monkeypatch.setattr(http_client, "backoff", lambda attempt: 0)
+    http_client.set_retry_budget("www.lafm.com.co", 2)
+    try:
+        for url in ("https://www.lafm.com.co/politica/nota-1", "https://lafm.com.co/politica/nota-2"):
+            with pytest.raises(http_client.requests.ConnectionError):
+                http_client.get(url, retries=5)
+    finally:
+        http_client.set_session(previous)
+        http_client.reset_retry_budgets()
+
+    # Dos intentos iniciales más los dos reintentos del presupuesto común.
+    assert session.requests == 4
@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from record_sink import RecordSink, read_corpus
+
+'''
+Modo append de RecordSink (corpus incremental) en los tres formatos, y una
+corrida incremental de get_all_news contra mock_sites.
+'''
+
+
+def _record(i, medio="LaFM"):
+    return {"url": f"https://www.lafm.com.co/politica/nota-{i}", "title": f"Nota {i}",
+            "body": f"Cuerpo\n{i}", "tags": ["a", "b"], "medio": medio}
+
+
+def _write(path, records, **kwargs):
+    with RecordSink(path, **kwargs) as sink:
+        for record in records:
+            sink.write(record)
+    return sink
+
+
+@pytest.mark.parametrize("name", ["corpus.csv", "corpus.jsonl", "corpus.parquet"])
+def test_append_adds_rows_after_the_existing_corpus(tmp_path, name):
+    path = str(tmp_path / name)
+    _write(path, [_record(0), _record(1)])
+    _write(path, [_record(2)], append=True)
+
+    df = read_corpus(path)
+    assert list(df["url"]) == [_record(i)["url"] for i in range(3)]
+    assert list(df["body"]) == ["Cuerpo 0", "Cuerpo 1", "Cuerpo 2"]
+    assert not os.path.exists(path + ".part")
+
+
+def test_csv_append_keeps_the_existing_header(tmp_path):
+    path = str(tmp_path / "corpus.csv")
+    _write(path, [_record(0)], columns=["url", "title"])
+    _write(path, [_record(1)], append=True)
+
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "url,title"
+    assert lines[1:] == [f"{_record(i)['url']},Nota {i}" for i in range(2)]
+
+
+def test_failed_append_leaves_the_corpus_untouched(tmp_path):
+    path = str(tmp_path / "corpus.jsonl")
+    _write(path, [_record(0)])
+    with open(path, "rb") as f:
+        before = f.read()
+
+    with pytest.raises(RuntimeError):
+        with RecordSink(path, append=True) as sink:
+            sink.write(_record(1))
+            raise RuntimeError("corte")
+
+    with open(path, "rb") as f:
+        assert f.read() == before
+
+
+def test_incremental_runs_append_only_new_articles(tmp_path, mock_sites_server, no_rate_limits):
+    import datos
+
+    mock_sites_server(articles=20)
+    path = str(tmp_path / "corpus.csv")
+    seen_path = str(tmp_path / "vistas.sqlite")
+
+    with RecordSink(path) as sink:
+        first = datos.get_all_news(limit=3, sink=sink, seen_path=seen_path, metrics_path=None)
+    with RecordSink(path, append=True) as sink:
+        second = datos.get_all_news(limit=5, sink=sink, seen_path=seen_path, metrics_path=None)
+
+    df = read_corpus(path)
+    assert sum(second.values()) > 0
+    assert len(df) == sum(first.values()) + sum(second.values())
+    assert df["url"].is_unique
+
+
+def test_append_interrupted_while_copying_keeps_the_corpus(tmp_path, monkeypatch):
+    import record_sink
+
+    path = str(tmp_path / "corpus.jsonl")
+    _write(path, [_record(0), _record(1)])
+    with open(path, "rb") as f:
+        before = f.read()
+
+    copy = record_sink.shutil.copyfileobj
+    calls = []
+
+    def full_disk(src, dst):
+        calls.append(src.name)
+        if len(calls) == 2:
+            dst.write(src.read(10))
+            raise OSError(28, "No space left on device")
+        copy(src, dst)
+
+    monkeypatch.setattr(record_sink.shutil, "copyfileobj", full_disk)
+    sink = RecordSink(path, append=True)
+    sink.write(_record(2))
+    with pytest.raises(OSError):
+        sink.close()
+
+    with open(path, "rb") as f:
+        assert f.read() == before
+    assert os.path.exists(path + ".part")
+    assert not os.path.exists(path + ".tmp")
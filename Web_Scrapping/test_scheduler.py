@@ -0,0 +1,157 @@
+import time
+import threading
+
+import http_client
+import rate_limit
+from outlet_traffic import TRAFFIC
+from scheduler import run_url_scheduler, run_outlet
+
+'''
+Planificador global: robo de trabajo entre medios, tope por medio y plazos;
+run_outlet (get_news_* sueltos) con el control de tráfico del medio.
+'''
+
+
+class Recorder:
+    # parse_func de prueba: registra qué hilo atendió cada URL y cuántas
+    # URLs del medio hubo en vuelo a la vez.
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.threads = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, url, headers):
+        with self._lock:
+            self.threads.add(threading.current_thread().name)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return {"url": url}
+
+
+def _urls(medio, n):
+    return [f"https://{medio.lower()}.example/nota-{i}" for i in range(n)]
+
+
+def test_idle_workers_steal_from_the_busiest_outlet_within_its_cap():
+    busy, idle = Recorder(), Recorder()
+    jobs = {
+        "Grande": {"urls": _urls("Grande", 24), "parse": busy, "headers": {}, "cap": 3},
+        "Chico": {"urls": _urls("Chico", 1), "parse": idle, "headers": {}, "cap": 3},
+    }
+
+    records = run_url_scheduler(jobs, workers=4)
+
+    # Los hilos de "Chico" terminan su única URL y ayudan a "Grande".
+    assert len(busy.threads) == 3
+    assert busy.max_in_flight == 3
+    assert [r["url"] for r in records["Grande"]] == _urls("Grande", 24)
+    assert len(records["Chico"]) == 1
+
+
+def test_outlet_deadline_skips_pending_urls_and_keeps_the_rest_running():
+    slow, fast = Recorder(delay=0.05), Recorder(delay=0.01)
+    skipped = {}
+    jobs = {
+        "Lento": {
+            "urls": _urls("Lento", 40), "parse": slow, "headers": {}, "cap": 2,
+            "deadline": time.monotonic() + 0.2,
+        },
+        "Rapido": {"urls": _urls("Rapido", 10), "parse": fast, "headers": {}, "cap": 2},
+    }
+
+    records = run_url_scheduler(
+        jobs, workers=4,
+        on_skip=lambda medio, urls: skipped.setdefault(medio, []).extend(urls)
+    )
+
+    assert 0 < len(records["Lento"]) < 40
+    assert len(records["Lento"]) + len(skipped["Lento"]) <= 40
+    assert len(records["Rapido"]) == 10
+    assert "Rapido" not in skipped
+
+
+def test_parser_sees_the_outlet_deadline():
+    seen = []
+
+    def parse(url, headers):
+        seen.append(http_client.remaining())
+        return {"url": url}
+
+    jobs = {"Medio": {"urls": _urls("Medio", 3), "parse": parse, "headers": {}, "cap": 1,
+                      "deadline": time.monotonic() + 30}}
+    run_url_scheduler(jobs, workers=1)
+
+    assert all(left is not None and 0 < left <= 30 for left in seen)
+
+
+def test_pipeline_discovery_is_cut_at_the_run_deadline():
+    def discover(on_url):
+        for url in _urls("Medio", 1000):
+            on_url(url)
+            time.sleep(0.005)
+
+    jobs = {"Medio": {"discover": discover, "parse": Recorder(delay=0), "headers": {}, "cap": 2}}
+    start = time.monotonic()
+    records = run_url_scheduler(jobs, workers=2, deadline=time.monotonic() + 0.2)
+
+    assert time.monotonic() - start < 2
+    assert 0 < len(records["Medio"]) < 1000
+
+
+def test_slow_outlet_is_cut_by_its_deadline_against_mock_sites(mock_sites_server):
+    import datos
+
+    mock_sites_server(articles=30, outlet_latency={"LaFM": 150}, sigma=0)
+    lafm = [f"https://www.lafm.com.co/politica/nota-{i}" for i in range(30)]
+    pacifista = [f"https://pacifista.tv/actualidad/nota-{i}/" for i in range(10)]
+    skipped = {}
+    jobs = {
+        "LaFM": {"urls": lafm, "parse": datos.SITEMAPS["LaFM"]["article"], "headers": {}, "cap": 2,
+                 "deadline": time.monotonic() + 0.5},
+        "Pacifista": {"urls": pacifista, "parse": datos.SITEMAPS["Pacifista"]["article"], "headers": {}, "cap": 2},
+    }
+
+    records = run_url_scheduler(
+        jobs, workers=4,
+        on_skip=lambda medio, urls: skipped.setdefault(medio, []).extend(urls)
+    )
+
+    assert 0 < len(records["LaFM"]) < 30
+    assert all(r["title"] for r in records["LaFM"])
+    assert len(records["Pacifista"]) == 10
+    assert skipped.get("LaFM")
+
+
+def test_run_outlet_uses_the_outlet_traffic_settings():
+    recorder = Recorder()
+    try:
+        records = run_outlet("LaFM", recorder, urls=_urls("LaFM", 40))
+        limiter = rate_limit.get_limiter(TRAFFIC["LaFM"]["host"])
+    finally:
+        rate_limit.reset()
+
+    assert len(records) == 40
+    assert limiter is not None
+    assert recorder.max_in_flight == TRAFFIC["LaFM"]["concurrency"]
+
+
+def test_standalone_get_news_goes_through_the_scheduler(mock_sites_server, monkeypatch):
+    import lafm
+
+    mock_sites_server(articles=20)
+    calls = []
+    monkeypatch.setattr(lafm, "run_outlet", lambda *args, **kwargs: calls.append(kwargs) or run_outlet(*args, **kwargs))
+    try:
+        df = lafm.get_news_LaFM("https://www.lafm.com.co/politica", {}, limit=5)
+    finally:
+        rate_limit.reset()
+
+    assert len(df) == 5
+    assert calls and len(calls[0]["urls"]) == 5
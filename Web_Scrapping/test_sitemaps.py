@@ -0,0 +1,58 @@
+import mock_sites
+from sitemaps import get_sitemap_entries, parse_lastmod
+
+'''
+Descubrimiento por sitemap_index contra mock_sites: ventana de lastmod,
+orden por fecha y poda de los sitemaps hijos que no hace falta pedir.
+'''
+
+INDEX = "https://cuestionpublica.com/sitemap_index.xml"
+
+
+class RecordingSession(mock_sites.MockSession):
+    # Guarda las URLs pedidas, para ver qué sitemaps hijos se descargaron.
+    def __init__(self, base_url: str):
+        super().__init__(base_url)
+        self.requested = []
+
+    def get(self, url: str, **kwargs):
+        self.requested.append(url)
+        return super().get(url, **kwargs)
+
+
+def _children(session):
+    return sorted(u.rsplit("/", 1)[1] for u in session.requested if "post-sitemap" in u)
+
+
+def _posts(url):
+    return "post-sitemap" in url
+
+
+def test_since_skips_children_older_than_the_window(mock_sites_server):
+    session = mock_sites_server(RecordingSession, articles=50, sitemap_size=10)
+    since = mock_sites.lastmod(15)
+
+    entries = get_sitemap_entries(INDEX, {}, since=since, index_filter=_posts)
+
+    # Hijo k: artículos [10k, 10k + 10) con lastmod(10k) como <lastmod>.
+    assert len(entries) == 16
+    assert all(lastmod >= parse_lastmod(since) for _, lastmod in entries)
+    assert _children(session) == ["post-sitemap1.xml", "post-sitemap2.xml"]
+
+
+def test_limit_reads_only_the_newest_children(mock_sites_server):
+    session = mock_sites_server(RecordingSession, articles=50, sitemap_size=10)
+
+    entries = get_sitemap_entries(INDEX, {}, limit=5, index_filter=_posts, parallelism=1)
+
+    assert [url for url, _ in entries] == [f"https://cuestionpublica.com/investigacion-{i}/" for i in range(5)]
+    assert _children(session) == ["post-sitemap1.xml"]
+
+
+def test_result_does_not_depend_on_parallelism(mock_sites_server):
+    mock_sites_server(articles=50, sitemap_size=7)
+
+    sequential = get_sitemap_entries(INDEX, {}, limit=20, index_filter=_posts, parallelism=1)
+    parallel = get_sitemap_entries(INDEX, {}, limit=20, index_filter=_posts, parallelism=4)
+
+    assert parallel == sequential